@@ -0,0 +1,118 @@
+"""
+収録フォルダスキャンベンチマーク
+Recording-folder scanner benchmark: first scan, cached rescan and incremental updates.
+
+Usage:
+    python benchmarks/folder_scan.py [--files N] [--updates N]
+
+A temporary folder is filled with N empty files named like sample_videos/
+(plus a few unrelated files) and its mtime is moved into the past, as for
+a folder that has been idle for a while. The benchmark reports the cold
+first scan, restarts that reuse the on-disk cache (with the folder idle
+and with its mtime just touched, which forces a stat of every file), and
+the latency from creating a new file until the scanner reports it, with
+inotify and with polling.
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from cut_numbering_manager.storage.folder_scanner import RecordingFolderScanner  # noqa: E402
+
+
+def populate(folder, count):
+    """Create count take files and a few unrelated files"""
+    for i in range(count):
+        part = i // 10000 + 1
+        scene = i // 1000 % 10 + 1
+        cut = i % 1000 + 1
+        open(os.path.join(folder, f"Part{part}_Scene{scene}_{cut:03d}_v01.mp4"), "w").close()
+    for name in ("notes.txt", "thumbs.db"):
+        open(os.path.join(folder, name), "w").close()
+    idle = time.time() - 60
+    os.utime(folder, (idle, idle))
+
+
+def measure_restart(folder, cache_path):
+    """Time in ms to load the cache and scan, as on application start"""
+    scanner = RecordingFolderScanner(folder, cache_path=cache_path)
+    started = time.perf_counter()
+    scanner.load_cache()
+    scanner.scan()
+    return (time.perf_counter() - started) * 1000
+
+
+def measure_scans(folder, cache_path):
+    """Cold scan and cached restart times in ms"""
+    scanner = RecordingFolderScanner(folder, cache_path=cache_path)
+    started = time.perf_counter()
+    added, _ = scanner.scan()
+    cold_ms = (time.perf_counter() - started) * 1000
+    scanner.save_cache()
+    
+    idle_ms = measure_restart(folder, cache_path)
+    os.utime(folder)
+    touched_ms = measure_restart(folder, cache_path)
+    return len(added), cold_ms, idle_ms, touched_ms
+
+
+def measure_updates(folder, cache_path, updates, use_inotify):
+    """Latency in ms from creating a file until the scanner reports it"""
+    arrived = threading.Event()
+    scanner = RecordingFolderScanner(folder, cache_path=cache_path, use_inotify=use_inotify,
+                                     poll_interval=0.05, on_added=lambda takes: arrived.set())
+    scanner.start()
+    arrived.wait(30)
+    latencies = []
+    try:
+        for i in range(updates):
+            arrived.clear()
+            name = f"Part9_Scene9_{i + 1:03d}_v{99 - use_inotify:02d}.mp4"
+            started = time.perf_counter()
+            open(os.path.join(folder, name), "w").close()
+            if arrived.wait(5):
+                latencies.append((time.perf_counter() - started) * 1000)
+    finally:
+        scanner.stop()
+    return scanner.mode, latencies
+
+
+def main(argv=None):
+    """Run the folder scan benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[2])
+    parser.add_argument("--files", type=int, default=50000, help="number of take files")
+    parser.add_argument("--updates", type=int, default=50, help="number of incremental files")
+    args = parser.parse_args(argv)
+    
+    folder = tempfile.mkdtemp(prefix="cut_numbering_scan_")
+    cache_path = os.path.join(tempfile.mkdtemp(prefix="cut_numbering_cache_"), "scan.json")
+    try:
+        populate(folder, args.files)
+        takes, cold_ms, idle_ms, touched_ms = measure_scans(folder, cache_path)
+        print(f"first scan: {takes} takes in {cold_ms:.1f} ms")
+        print(f"restart with cache, folder idle: {idle_ms:.1f} ms")
+        print(f"restart with cache, folder touched: {touched_ms:.1f} ms")
+        for use_inotify in (True, False):
+            mode, latencies = measure_updates(folder, cache_path, args.updates, use_inotify)
+            if not latencies:
+                print(f"incremental ({mode}): no updates observed")
+                continue
+            print(f"incremental ({mode}): median {statistics.median(latencies):.2f} ms, "
+                  f"max {max(latencies):.2f} ms over {len(latencies)} files")
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+        shutil.rmtree(os.path.dirname(cache_path), ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
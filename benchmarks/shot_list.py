@@ -0,0 +1,140 @@
+"""
+ショットリストベンチマーク
+Shot list benchmark: streaming load of large CSV/TSV/XLSX lists, jump searches and STOP advancement.
+
+Usage:
+    python benchmarks/shot_list.py [--rows N] [--repeat N]
+
+A temporary shot list of N rows (default 50000) is written as CSV and TSV,
+and as XLSX when openpyxl is installed. Within each scene the cuts are
+shuffled and a few are left out, as in a real storyboard order. The
+benchmark reports the time to read each file into a ShotList and the
+memory the loaded list holds, then the time per jump query (cut only,
+scene and cut, part, scene and cut, scene name) and per STOP advance.
+"""
+
+import argparse
+import csv
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from cut_numbering_manager.storage.shot_list_reader import read_shot_list  # noqa: E402
+
+CUTS_PER_SCENE = 100
+SCENES_PER_PART = 100
+
+
+def make_rows(count, seed=1):
+    """Shot list rows in storyboard order: shuffled cuts with gaps per scene"""
+    rng = random.Random(seed)
+    rows = []
+    scene = 0
+    while len(rows) < count:
+        part = f"Part{scene // SCENES_PER_PART + 1}"
+        name = f"S{scene % SCENES_PER_PART + 1}"
+        cuts = [cut for cut in range(1, CUTS_PER_SCENE + 1) if rng.random() > 0.05]
+        rng.shuffle(cuts)
+        rows.extend((part, name, cut) for cut in cuts)
+        scene += 1
+    return rows[:count]
+
+
+def write_files(folder, rows):
+    """Write the rows as CSV, TSV and, with openpyxl, XLSX; returns {format: path}"""
+    paths = {}
+    for extension, delimiter in ((".csv", ","), (".tsv", "\t")):
+        path = os.path.join(folder, f"shots{extension}")
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f, delimiter=delimiter)
+            writer.writerow(["part", "scene", "cut"])
+            writer.writerows(rows)
+        paths[extension[1:]] = path
+    try:
+        from openpyxl import Workbook
+    except ImportError:
+        print("openpyxl is not installed; skipping XLSX")
+        return paths
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(["part", "scene", "cut"])
+    for row in rows:
+        sheet.append(list(row))
+    paths["xlsx"] = os.path.join(folder, "shots.xlsx")
+    workbook.save(paths["xlsx"])
+    return paths
+
+
+def measure_load(path, repeat):
+    """Median seconds to read a file into a ShotList, and the list's traced size in bytes"""
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        read_shot_list(path)
+        times.append(time.perf_counter() - started)
+    tracemalloc.start()
+    shot_list = read_shot_list(path)
+    size, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(times), size, peak, shot_list
+
+
+def time_per_call(func, args_list):
+    """Median microseconds per call over a list of argument tuples"""
+    times = []
+    for args in args_list:
+        started = time.perf_counter()
+        func(*args)
+        times.append(time.perf_counter() - started)
+    return statistics.median(times) * 1e6, max(times) * 1e6
+
+
+def main(argv=None):
+    """Run the shot list benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[2])
+    parser.add_argument("--rows", type=int, default=50000, help="rows in the generated shot list")
+    parser.add_argument("--repeat", type=int, default=5, help="loads per format")
+    args = parser.parse_args(argv)
+    
+    folder = tempfile.mkdtemp(prefix="cut_numbering_shots_")
+    try:
+        rows = make_rows(args.rows)
+        paths = write_files(folder, rows)
+        shot_list = None
+        print(f"{'format':<8}{'load':>10}{'rows/s':>12}{'held':>10}{'peak':>10}")
+        for name, path in paths.items():
+            seconds, size, peak, shot_list = measure_load(path, args.repeat)
+            print(f"{name:<8}{seconds * 1000:>8.1f}ms{len(shot_list) / seconds:>12,.0f}"
+                  f"{size / 1048576:>8.1f}MB{peak / 1048576:>8.1f}MB")
+        
+        rng = random.Random(2)
+        picks = [rows[rng.randrange(len(rows))] for _ in range(1000)]
+        queries = {
+            "cut": [(str(cut), rng.randrange(len(rows))) for _, _, cut in picks],
+            "scene cut": [(f"{scene} {cut}", rng.randrange(len(rows))) for _, scene, cut in picks],
+            "part scene cut": [(f"{part} {scene} {cut}", None) for part, scene, cut in picks],
+            "scene": [(scene, None) for _, scene, _ in picks]
+        }
+        print(f"\n{'jump query':<16}{'median':>10}{'max':>10}")
+        for name, args_list in queries.items():
+            median_us, max_us = time_per_call(shot_list.find, args_list)
+            print(f"{name:<16}{median_us:>8.1f}us{max_us:>8.1f}us")
+        
+        steps = [rows[index] for index in range(len(rows))]
+        median_us, max_us = time_per_call(shot_list.advance, steps)
+        print(f"{'advance':<16}{median_us:>8.1f}us{max_us:>8.1f}us  ({shot_list.shot_count()} rows shot)")
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,344 @@
+"""
+ソークテスト
+Scripted soak of thousands of REC→STOP takes against the bundled fake OBS, reporting lost commands, duplicate names and resource growth.
+
+Usage:
+    python benchmarks/soak.py [--takes N] [--mode ui|headless] [--transport osc|obs-websocket]
+                              [--drop RATE] [--delay SEC] [--jitter SEC] [--reorder RATE]
+                              [--sample-every N] [--settle SEC] [--tracemalloc]
+                              [--output DIR] [--json PATH]
+
+The ui mode drives MainWindow under QT_QPA_PLATFORM=offscreen exactly as
+a REC/STOP press would; the headless mode drives a HeadlessSession. Both
+talk to a FakeOBS on a free local port and wait (up to --settle seconds)
+for it to receive each take before pressing REC again, so losses are the
+network's and not an overrun of the fake's receive buffer. FakeOBS writes
+an empty file per recording into --output, which is also the recording
+folder, so the collision guard sees the takes as they land. HOME points
+at a temporary directory that is removed at exit, so the journal and the
+folder scanner's cache never touch the user's; without --output the
+recordings go there too.
+
+At the end the script compares the commands the app sent with the ones
+FakeOBS received, dropped on purpose and handled, lists takes that never
+became a recording and names that were recorded twice, and reports the
+growth of open file descriptors, RSS (which includes the message logs
+FakeOBS keeps in the same process) and, with --tracemalloc, traced
+Python memory excluding FakeOBS itself. Growth is measured from the
+sample after the first take, once persistent connections are open, to
+the last. Tracing slows every allocation several times over, so it is
+off by default. The script exits with status 1 when commands
+went missing outside the simulated drops, file descriptors grew beyond
+--fd-slack, or, with no impairment configured, any take was lost or
+duplicated.
+"""
+
+import argparse
+import atexit
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+OUTPUT_DIR = tempfile.mkdtemp(prefix="cut_numbering_soak_")
+atexit.register(shutil.rmtree, OUTPUT_DIR, ignore_errors=True)
+
+# Keep the soak away from the user's journal, scan cache, recording folder and console
+os.environ["HOME"] = os.environ["USERPROFILE"] = OUTPUT_DIR
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.environ.setdefault("CUT_NUMBERING_JOURNAL", os.path.join(OUTPUT_DIR, "takes.sqlite3"))
+os.environ.setdefault("CUT_NUMBERING_LOG_LEVEL", "WARNING")
+
+from cut_numbering_manager.config import (  # noqa: E402
+    OSC_FILENAME_COMMAND,
+    OSC_RECORDING_COMMAND,
+    TRANSPORT_OSC,
+    TRANSPORT_OBS_WEBSOCKET
+)
+from cut_numbering_manager.osc import fake_obs  # noqa: E402
+from cut_numbering_manager.osc.fake_obs import FakeOBS  # noqa: E402
+
+# filename, start and stop
+COMMANDS_PER_TAKE = 3
+
+# Deep enough to see FakeOBS under python-osc's parsing frames
+TRACEBACK_FRAMES = 6
+
+
+def open_fd_count():
+    """Number of open file descriptors of this process"""
+    try:
+        return len(os.listdir("/proc/self/fd"))
+    except OSError:
+        return None
+
+
+def rss_bytes():
+    """Resident set size of this process"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+def traced_bytes():
+    """Traced Python memory outside FakeOBS, whose message logs grow by design, or None"""
+    if not tracemalloc.is_tracing():
+        return None
+    snapshot = tracemalloc.take_snapshot().filter_traces([
+        tracemalloc.Filter(False, fake_obs.__file__, all_frames=True),
+        tracemalloc.Filter(False, tracemalloc.__file__)
+    ])
+    return sum(stat.size for stat in snapshot.statistics("filename"))
+
+
+def format_kib(value, sign=""):
+    """Byte count in KiB, or "-" when not measured"""
+    return "-" if value is None else f"{value / 1024:{sign}.0f} KiB"
+
+
+def sample(take):
+    """Resource usage after take takes"""
+    return {
+        "take": take,
+        "fds": open_fd_count(),
+        "traced_bytes": traced_bytes(),
+        "rss_bytes": rss_bytes()
+    }
+
+
+class UIDriver:
+    """REC/STOP presses on an offscreen MainWindow"""
+    def __init__(self, transport, timeout, output):
+        from PyQt5.QtWidgets import QApplication
+        from cut_numbering_manager.ui.main_window import MainWindow
+        
+        self.app = QApplication.instance() or QApplication([])
+        self.window = MainWindow()
+        self.window.show()
+        self.transport = transport
+        self.timeout = timeout
+        self.use_bundle = self.window.osc_settings.use_bundle
+        self.window._on_recording_folder_changed(output)
+        self._pump_until(lambda: self.window.osc_feedback is not None, 1.0, required=False)
+        self.feedback_port = self.window.osc_feedback.port if self.window.osc_feedback is not None else 0
+    
+    def connect(self, obs):
+        """Point the window at FakeOBS"""
+        transport = self.transport
+        self.window.osc_settings.port = obs.port
+        if transport == TRANSPORT_OBS_WEBSOCKET:
+            self.window.osc_settings.transport = transport
+            self.window.osc_settings.websocket_port = obs.websocket_port
+        self.window._on_transport_changed(transport)
+    
+    def _pump_until(self, condition, timeout, required=True):
+        """Process Qt events until condition() holds"""
+        deadline = time.perf_counter() + timeout
+        while not condition():
+            if time.perf_counter() > deadline:
+                if required:
+                    raise RuntimeError("timed out waiting for the UI")
+                return
+            self.app.processEvents()
+    
+    def take(self):
+        """One REC→STOP cycle; returns the filename the app rolled, or None"""
+        window = self.window
+        # The app's own state can be flipped by late feedback, so press REC and STOP explicitly
+        window.start_recording()
+        self._pump_until(lambda: window._pending_command is None, self.timeout)
+        filename = window._current_take["filename"] if window._current_take else None
+        window.stop_recording()
+        self._pump_until(lambda: window._pending_command is None, self.timeout)
+        return filename
+    
+    def close(self):
+        """Close the window and let Qt settle"""
+        self.window.close()
+        self.app.processEvents()
+
+
+class HeadlessDriver:
+    """rec/stop commands on a HeadlessSession"""
+    def __init__(self, transport, timeout, output):
+        from cut_numbering_manager.config import OSC_FEEDBACK_PORT, OSC_USE_BUNDLE
+        from cut_numbering_manager.headless import HeadlessSession
+        
+        if transport != TRANSPORT_OSC:
+            raise SystemExit("headless mode only speaks OSC")
+        self.session = HeadlessSession()
+        self.use_bundle = OSC_USE_BUNDLE
+        self.feedback_port = OSC_FEEDBACK_PORT
+    
+    def connect(self, obs):
+        """Point the session at FakeOBS"""
+        self.session.execute(f"target 127.0.0.1 {obs.port}")
+    
+    def take(self):
+        """One rec→stop cycle; returns the filename the session rolled, or None"""
+        response = self.session.execute("rec")
+        filename = response.split(" ", 2)[2] if response.startswith("OK recording ") else None
+        self.session.execute("stop")
+        return filename
+    
+    def close(self):
+        """Release the session's sockets"""
+        self.session.close()
+
+
+DRIVERS = {
+    "ui": UIDriver,
+    "headless": HeadlessDriver
+}
+
+
+def settle(obs, count, timeout):
+    """Wait until FakeOBS has seen count messages, as an operator never outpaces OBS"""
+    deadline = time.perf_counter() + timeout
+    while len(obs.received) < count and time.perf_counter() < deadline:
+        time.sleep(0.0005)
+
+
+def count_commands(entries):
+    """Counts of filename, start and stop commands in FakeOBS message entries"""
+    counts = {"filename": 0, "start": 0, "stop": 0}
+    for _, address, args in entries:
+        if address == OSC_FILENAME_COMMAND:
+            counts["filename"] += 1
+        elif address == OSC_RECORDING_COMMAND and args:
+            counts["start" if args[0] else "stop"] += 1
+    return counts
+
+
+def main(argv=None):
+    """Run the soak and report what went missing or grew"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[2])
+    parser.add_argument("--takes", type=int, default=10000, help="number of REC→STOP cycles")
+    parser.add_argument("--mode", choices=sorted(DRIVERS), default="ui", help="what drives the takes")
+    parser.add_argument("--transport", choices=(TRANSPORT_OSC, TRANSPORT_OBS_WEBSOCKET), default=TRANSPORT_OSC,
+                        help="how the app reaches FakeOBS (ui mode)")
+    parser.add_argument("--drop", type=float, default=0.0, help="fraction of OSC datagrams to drop")
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds to delay every command")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random delay in seconds")
+    parser.add_argument("--reorder", type=float, default=0.0, help="fraction of OSC datagrams to reorder")
+    parser.add_argument("--seed", type=int, default=1, help="seed for the impairments")
+    parser.add_argument("--sample-every", type=int, default=1000, help="takes between resource samples")
+    parser.add_argument("--fd-slack", type=int, default=2, help="file descriptor growth tolerated")
+    parser.add_argument("--timeout", type=float, default=5.0, help="seconds to wait for each command")
+    parser.add_argument("--settle", type=float, default=0.5,
+                        help="seconds to wait for FakeOBS to receive a take before the next one")
+    parser.add_argument("--output", default=os.path.join(OUTPUT_DIR, "recordings"),
+                        help="folder FakeOBS writes recordings to")
+    parser.add_argument("--tracemalloc", action="store_true", help="also measure traced Python memory")
+    parser.add_argument("--json", help="also write the report to this file")
+    args = parser.parse_args(argv)
+    
+    os.makedirs(args.output, exist_ok=True)
+    driver = DRIVERS[args.mode](args.transport, args.timeout, args.output)
+    obs = FakeOBS(feedback_port=driver.feedback_port, drop_rate=args.drop, delay=args.delay,
+                  jitter=args.jitter, reorder_rate=args.reorder, output_folder=args.output, seed=args.seed,
+                  websocket_port=0 if args.transport == TRANSPORT_OBS_WEBSOCKET else None).start()
+    driver.connect(obs)
+    
+    if args.tracemalloc:
+        tracemalloc.start(TRACEBACK_FRAMES)
+    samples = []
+    rolled = []
+    started = time.perf_counter()
+    try:
+        for take in range(1, args.takes + 1):
+            arrived = len(obs.received)
+            filename = driver.take()
+            if args.transport == TRANSPORT_OSC:
+                settle(obs, arrived + COMMANDS_PER_TAKE, args.settle)
+            if filename is not None:
+                rolled.append(filename)
+            # The first take opens persistent connections, so growth is measured from after it
+            if take == 1 or take % args.sample_every == 0 or take == args.takes:
+                samples.append(sample(take))
+                current = samples[-1]
+                print(f"{take:>7} takes  fds {current['fds']}  rss {(current['rss_bytes'] or 0) / 1048576:.1f} MiB"
+                      f"  traced {format_kib(current['traced_bytes'])}", flush=True)
+        elapsed = time.perf_counter() - started
+        # Let delayed and held-back datagrams land before counting
+        time.sleep(args.delay + args.jitter + fake_obs.REORDER_WINDOW + 0.2)
+    finally:
+        driver.close()
+        obs.stop()
+        tracemalloc.stop()
+    
+    per_take = 2 if (driver.use_bundle and args.transport == TRANSPORT_OSC) else 3
+    expected = {"filename": len(rolled), "start": len(rolled), "stop": args.takes}
+    received = count_commands(obs.received)
+    dropped = count_commands(obs.dropped)
+    handled = count_commands(obs.messages)
+    recorded = {name[:-len(obs.extension)] for _, name in obs.recordings}
+    missing = [name for name in rolled if name not in recorded]
+    if args.transport == TRANSPORT_OBS_WEBSOCKET:
+        # Requests travel over TCP: FakeOBS only sees the recordings they cause
+        lost = {}
+    else:
+        lost = {kind: expected[kind] - received[kind] for kind in expected if expected[kind] > received[kind]}
+    first, last = samples[0], samples[-1]
+    growth = {key: (last[key] - first[key]) if None not in (first[key], last[key]) else None
+              for key in ("fds", "traced_bytes", "rss_bytes")}
+    
+    report = {
+        "takes": args.takes,
+        "mode": args.mode,
+        "transport": args.transport,
+        "impairment": {"drop": args.drop, "delay": args.delay, "jitter": args.jitter, "reorder": args.reorder},
+        "elapsed_s": elapsed,
+        "expected_datagrams": args.takes * per_take if args.transport == TRANSPORT_OSC else None,
+        "expected": expected,
+        "received": received,
+        "dropped": dropped,
+        "handled": handled,
+        "reordered": obs.reordered,
+        "lost": lost,
+        "rolled": len(rolled),
+        "recorded": len(obs.recordings),
+        "missing_takes": missing[:20],
+        "missing_count": len(missing),
+        "duplicates": obs.duplicates[:20],
+        "duplicate_count": len(obs.duplicates),
+        "growth": growth,
+        "samples": samples
+    }
+    
+    print(f"{args.takes} takes in {elapsed:.1f} s ({elapsed / args.takes * 1000:.2f} ms per take)")
+    for kind in ("filename", "start", "stop"):
+        print(f"  {kind:<9} sent {expected[kind]:>7}  received {received[kind]:>7}"
+              f"  dropped {dropped[kind]:>6}  handled {handled[kind]:>7}")
+    print(f"  reordered {obs.reordered}  lost {sum(lost.values())}")
+    print(f"  rolled {len(rolled)}  recorded {len(obs.recordings)}  missing {len(missing)}"
+          f"  duplicate names {len(obs.duplicates)}")
+    print(f"  growth: fds {growth['fds'] or 0:+d}  rss {(growth['rss_bytes'] or 0) / 1048576:+.1f} MiB"
+          f"  traced {format_kib(growth['traced_bytes'], '+')}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+    
+    failures = []
+    if lost:
+        failures.append(f"commands lost outside the simulated drops: {lost}")
+    if growth["fds"] is not None and growth["fds"] > args.fd_slack:
+        failures.append(f"file descriptors grew by {growth['fds']}")
+    if not obs.impaired and (missing or obs.duplicates):
+        failures.append(f"{len(missing)} takes missing and {len(obs.duplicates)} names duplicated")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,151 @@
+"""
+起動時間ベンチマーク
+Startup benchmark: import time of the desktop app and time to the first painted frame.
+
+Usage:
+    python benchmarks/startup.py [--runs N] [--update-budget]
+
+Both measurements run in fresh interpreters under the offscreen Qt platform,
+with HOME and the take journal in a temporary directory so the user's data
+neither slows nor receives the run.
+The result is compared with benchmarks/startup_budget.json and the script
+exits with status 1 when a budget is exceeded.
+"""
+
+import argparse
+import atexit
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUDGET_PATH = os.path.join(ROOT, "benchmarks", "startup_budget.json")
+APP_MODULE = "cut_numbering_manager.ui.main_window"
+HOME_DIR = tempfile.mkdtemp(prefix="cut_numbering_startup_")
+atexit.register(shutil.rmtree, HOME_DIR, ignore_errors=True)
+
+FIRST_PAINT_SCRIPT = """
+import time
+started = time.perf_counter()
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtCore import QObject, QEvent
+app = QApplication([])
+from cut_numbering_manager.ui.main_window import MainWindow
+imported = time.perf_counter()
+
+class PaintWatcher(QObject):
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Paint:
+            print(f"{(imported - started) * 1000:.3f} {(time.perf_counter() - started) * 1000:.3f}")
+            app.quit()
+        return False
+
+watcher = PaintWatcher()
+window = MainWindow()
+window.installEventFilter(watcher)
+window.show()
+app.exec_()
+window.close()
+"""
+
+
+def _env():
+    """Environment for child interpreters, kept away from the user's journal, folders and settings"""
+    env = dict(os.environ)
+    env["HOME"] = env["USERPROFILE"] = HOME_DIR
+    env["CUT_NUMBERING_JOURNAL"] = os.path.join(HOME_DIR, "takes.sqlite3")
+    env["CUT_NUMBERING_RECORDING_FOLDER"] = ""
+    env.pop("CUT_NUMBERING_SHOT_LIST", None)
+    env["QT_QPA_PLATFORM"] = "offscreen"
+    env["PYTHONPATH"] = ROOT + os.pathsep + env.get("PYTHONPATH", "")
+    return env
+
+
+def measure_importtime():
+    """Cumulative import time of the main window module in ms, and the slowest imports"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {APP_MODULE}"],
+        cwd=ROOT, env=_env(), stderr=subprocess.PIPE, stdout=subprocess.DEVNULL,
+        universal_newlines=True, check=True
+    )
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        try:
+            imports.append((int(cumulative.strip()) / 1000, name.strip()))
+        except ValueError:
+            continue
+    total = next((ms for ms, name in imports if name == APP_MODULE), 0.0)
+    slowest = sorted((item for item in imports if item[1] != APP_MODULE), reverse=True)[:10]
+    return total, slowest
+
+
+def measure_first_paint():
+    """Time from interpreter start to the main window's first paint event, in ms"""
+    result = subprocess.run(
+        [sys.executable, "-c", FIRST_PAINT_SCRIPT],
+        cwd=ROOT, env=_env(), stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+        universal_newlines=True, check=True
+    )
+    imported_ms, painted_ms = result.stdout.split()[-2:]
+    return float(imported_ms), float(painted_ms)
+
+
+def main(argv=None):
+    """Run the startup benchmark and check it against the budget"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[2])
+    parser.add_argument("--runs", type=int, default=5, help="number of runs (median is reported)")
+    parser.add_argument("--update-budget", action="store_true",
+                        help="write the measured medians plus 25%% headroom as the new budget")
+    args = parser.parse_args(argv)
+
+    import_runs = []
+    paint_runs = []
+    slowest = []
+    for _ in range(args.runs):
+        total, slowest = measure_importtime()
+        import_runs.append(total)
+        paint_runs.append(measure_first_paint()[1])
+
+    result = {
+        "import_ms": round(statistics.median(import_runs), 1),
+        "first_paint_ms": round(statistics.median(paint_runs), 1),
+    }
+
+    print(f"import {APP_MODULE}: {result['import_ms']:.1f} ms (median of {args.runs})")
+    print(f"first painted frame: {result['first_paint_ms']:.1f} ms (median of {args.runs})")
+    print("slowest imports (cumulative):")
+    for ms, name in slowest:
+        print(f"  {ms:8.1f} ms  {name}")
+
+    if args.update_budget:
+        budget = {key: round(value * 1.25, 1) for key, value in result.items()}
+        with open(BUDGET_PATH, "w", encoding="utf-8") as f:
+            json.dump(budget, f, indent=2)
+            f.write("\n")
+        print(f"budget written to {BUDGET_PATH}")
+        return 0
+
+    if not os.path.exists(BUDGET_PATH):
+        print("no budget file; run with --update-budget to create one")
+        return 0
+
+    with open(BUDGET_PATH, encoding="utf-8") as f:
+        budget = json.load(f)
+    failed = False
+    for key, value in result.items():
+        limit = budget.get(key)
+        if limit is not None and value > limit:
+            print(f"OVER BUDGET: {key} = {value:.1f} ms (budget {limit:.1f} ms)")
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
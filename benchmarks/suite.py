@@ -0,0 +1,298 @@
+"""
+ベンチマークスイート
+Repeatable benchmark suite: filename functions, OSC encode/send and offscreen REC→STOP cycles, checked against a saved baseline.
+
+Usage:
+    python benchmarks/suite.py [--group filename|osc|ui ...] [--repeat N]
+                               [--threshold PCT] [--save-baseline] [--json PATH]
+
+Each benchmark runs its operation in batches and reports the median and
+the fastest time per operation over --repeat batches. The results are
+compared with benchmarks/suite_baseline.json: a benchmark whose median is
+more than --threshold percent slower than its baseline is reported as a
+regression and the script exits with status 1. Absolute times only
+compare on the machine that recorded them, so a baseline saved on another
+host, platform or Python version is shown for reference but not gated on.
+--save-baseline stores the current results as the new baseline instead.
+
+The filename group times generate_filename, CutInfo.sanitize_filename,
+the CutInfo formatting helpers and parse_filename. The osc group encodes
+messages and sends them with CustomOSCSender to a local UDP sink that
+drains its socket on a background thread. The ui group drives MainWindow
+under QT_QPA_PLATFORM=offscreen through full REC→STOP cycles against a
+FakeOBS that answers with recording feedback, and times
+ClapperboardPanel.update_font_sizes.
+"""
+
+import argparse
+import atexit
+import json
+import os
+import platform
+import shutil
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+BASELINE_PATH = os.path.join(ROOT, "benchmarks", "suite_baseline.json")
+
+# Keep the benchmark away from the user's journal and console logging
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+if "CUT_NUMBERING_JOURNAL" not in os.environ:
+    JOURNAL_DIR = tempfile.mkdtemp(prefix="cut_numbering_bench_")
+    atexit.register(shutil.rmtree, JOURNAL_DIR, ignore_errors=True)
+    os.environ["CUT_NUMBERING_JOURNAL"] = os.path.join(JOURNAL_DIR, "takes.sqlite3")
+os.environ.setdefault("CUT_NUMBERING_LOG_LEVEL", "WARNING")
+os.environ["CUT_NUMBERING_RECORDING_FOLDER"] = ""
+
+from cut_numbering_manager.config import OSC_FILENAME_COMMAND, OSC_RECORDING_COMMAND  # noqa: E402
+from cut_numbering_manager.models.cut_info import CutInfo  # noqa: E402
+from cut_numbering_manager.osc.sender import CustomOSCSender, encode_message  # noqa: E402
+from cut_numbering_manager.utils.filename import generate_filename, parse_filename  # noqa: E402
+
+GROUPS = ("filename", "osc", "ui")
+
+
+def time_per_op(func, loops, repeat):
+    """Seconds per call of func for each of repeat batches of loops calls"""
+    batches = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(loops):
+            func()
+        batches.append((time.perf_counter() - started) / loops)
+    return batches
+
+
+def result(batches, loops):
+    """Summary of one benchmark in microseconds per operation"""
+    return {
+        "median_us": statistics.median(batches) * 1e6,
+        "min_us": min(batches) * 1e6,
+        "loops": loops,
+        "repeat": len(batches)
+    }
+
+
+def bench_filename(repeat):
+    """Micro-benchmarks of filename generation, sanitizing, formatting and parsing"""
+    cut_info = CutInfo()
+    cut_info.part_name = "Part 3/B"
+    cut_info.scene_name = "Scene:12"
+    cut_info.cut_number = 42
+    cut_info.version = 3
+    filename = generate_filename(cut_info)
+    loops = 20000
+    cases = {
+        "generate_filename": lambda: generate_filename(cut_info),
+        "sanitize_filename": lambda: CutInfo.sanitize_filename("Part 3/B_Scene:12_042_v03"),
+        "get_formatted_cut_number": cut_info.get_formatted_cut_number,
+        "get_formatted_version": cut_info.get_formatted_version,
+        "parse_filename": lambda: parse_filename(filename + ".mp4")
+    }
+    return {f"filename.{name}": result(time_per_op(func, loops, repeat), loops)
+            for name, func in cases.items()}
+
+
+class UDPSink:
+    """Local UDP socket that receives and discards datagrams on a background thread"""
+    def __init__(self):
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.bind(("127.0.0.1", 0))
+        self.socket.settimeout(0.2)
+        self.port = self.socket.getsockname()[1]
+        self.received = 0
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="udp-sink", daemon=True)
+        self._thread.start()
+    
+    def _run(self):
+        """Drain the socket until stopped"""
+        while self._running:
+            try:
+                self.socket.recv(65536)
+                self.received += 1
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+    
+    def close(self):
+        """Stop draining and close the socket"""
+        self._running = False
+        self._thread.join(1.0)
+        self.socket.close()
+
+
+def bench_osc(repeat):
+    """OSC encoding and sends to a local UDP sink"""
+    sink = UDPSink()
+    sender = CustomOSCSender("127.0.0.1", sink.port)
+    filename = "Part1_Scene1_042_v03"
+    loops = 5000
+    sender.prepare(OSC_FILENAME_COMMAND, filename)
+    cases = {
+        "encode_message": lambda: encode_message(OSC_FILENAME_COMMAND, filename),
+        "send_message_standard": lambda: sender.send_message_standard(OSC_FILENAME_COMMAND, filename),
+        "send_recording_command": lambda: sender.send_message_standard(OSC_RECORDING_COMMAND, 1),
+        "send_bundle": lambda: sender.send_bundle([(OSC_FILENAME_COMMAND, filename), (OSC_RECORDING_COMMAND, 1)])
+    }
+    try:
+        return {f"osc.{name}": result(time_per_op(func, loops, repeat), loops)
+                for name, func in cases.items()}
+    finally:
+        sender.close()
+        sink.close()
+
+
+def pump_until(app, condition, timeout=5.0):
+    """Process Qt events until condition() holds"""
+    deadline = time.perf_counter() + timeout
+    while not condition():
+        if time.perf_counter() > deadline:
+            raise RuntimeError("timed out waiting for the UI")
+        app.processEvents()
+
+
+def bench_ui(repeat):
+    """Offscreen MainWindow REC→STOP cycles and clapperboard font updates"""
+    from PyQt5.QtWidgets import QApplication
+    from cut_numbering_manager.osc.fake_obs import FakeOBS
+    from cut_numbering_manager.ui.main_window import MainWindow
+    from cut_numbering_manager.ui.components.clapperboard_panel import ClapperboardPanel
+    
+    app = QApplication.instance() or QApplication([])
+    window = MainWindow()
+    window.show()
+    deadline = time.perf_counter() + 1.0
+    while window.osc_feedback is None and time.perf_counter() < deadline:
+        app.processEvents()
+    feedback_port = window.osc_feedback.port if window.osc_feedback is not None else 0
+    obs = FakeOBS(feedback_port=feedback_port).start()
+    window.osc_settings.port = obs.port
+    results = {}
+    try:
+        def cycle():
+            window.toggle_recording()
+            pump_until(app, lambda: window.recording and window._pending_command is None)
+            window.toggle_recording()
+            pump_until(app, lambda: not window.recording and window._pending_command is None)
+        
+        loops = 50
+        cycle()
+        results["ui.rec_stop_cycle"] = result(time_per_op(cycle, loops, repeat), loops)
+        
+        panel = ClapperboardPanel(CutInfo())
+        panel.resize(600, 350)
+        panel.show()
+        app.processEvents()
+        sizes = [(600, 350), (900, 520)]
+        
+        def resize_update():
+            sizes.reverse()
+            panel.resize(*sizes[0])
+            panel.update_font_sizes()
+        
+        loops = 500
+        results["ui.update_font_sizes"] = result(time_per_op(panel.update_font_sizes, loops * 10, repeat), loops * 10)
+        results["ui.resize_update_font_sizes"] = result(time_per_op(resize_update, loops, repeat), loops)
+        panel.close()
+    finally:
+        window.close()
+        obs.stop()
+        app.processEvents()
+    return results
+
+
+BENCHMARKS = {
+    "filename": bench_filename,
+    "osc": bench_osc,
+    "ui": bench_ui
+}
+
+
+def compare(results, baseline, threshold):
+    """Regressions as (name, median, baseline median) for medians past the threshold"""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        if current["median_us"] > previous["median_us"] * (1 + threshold / 100.0):
+            regressions.append((name, current["median_us"], previous["median_us"]))
+    return regressions
+
+
+def main(argv=None):
+    """Run the benchmark suite and check it against the baseline"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[2])
+    parser.add_argument("--group", action="append", choices=GROUPS,
+                        help="run only this group (repeatable)")
+    parser.add_argument("--repeat", type=int, default=7, help="number of timed batches per benchmark")
+    parser.add_argument("--threshold", type=float, default=25.0,
+                        help="percent slowdown of the median that counts as a regression")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="baseline file")
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the baseline")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args(argv)
+    
+    results = {}
+    for group in args.group or GROUPS:
+        results.update(BENCHMARKS[group](args.repeat))
+    
+    machine = {"python": sys.version.split()[0], "platform": sys.platform, "host": platform.node()}
+    baseline = {}
+    baseline_machine = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            saved = json.load(f)
+        baseline = saved.get("results", {})
+        baseline_machine = {key: saved.get(key) for key in machine}
+    
+    print(f"{'benchmark':<36}{'median':>12}{'min':>12}{'baseline':>12}{'change':>9}")
+    for name, current in results.items():
+        previous = baseline.get(name)
+        line = f"{name:<36}{current['median_us']:>10.2f}us{current['min_us']:>10.2f}us"
+        if previous is not None:
+            change = (current["median_us"] / previous["median_us"] - 1) * 100
+            line += f"{previous['median_us']:>10.2f}us{change:>+8.1f}%"
+        print(line)
+    
+    document = dict(machine, created_at=time.strftime("%Y-%m-%dT%H:%M:%S"), results=results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(document, f, indent=2)
+            f.write("\n")
+    
+    if args.save_baseline:
+        # A partial run only replaces its own groups of a baseline from this machine
+        if baseline_machine == machine:
+            document["results"] = dict(baseline, **results)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(document, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"baseline written to {args.baseline}")
+        return 0
+    
+    if not baseline:
+        print("no baseline; run with --save-baseline to create one")
+        return 0
+    if baseline_machine != machine:
+        print("baseline was recorded on {host} ({platform}, Python {python}); not checking for regressions, "
+              "run with --save-baseline to record one for this machine".format(**baseline_machine))
+        return 0
+    
+    regressions = compare(results, baseline, args.threshold)
+    for name, median_us, baseline_us in regressions:
+        print(f"REGRESSION: {name} {median_us:.2f} us (baseline {baseline_us:.2f} us, "
+              f"threshold +{args.threshold:.0f}%)")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""
+OBS WebSocketレイテンシベンチマーク
+obs-websocket REC latency benchmark: pipelined vs. sequential requests against the local mock server.
+
+Usage:
+    python benchmarks/websocket_latency.py [--takes N] [--delay MS] [--password PW]
+
+A MockOBSWebSocket is started on a free local port and one persistent
+connection is opened to it. For N takes the benchmark times the REC path,
+SetFilenameFormatting followed by StartRecording, once as a single
+pipelined write and once as two request/response round trips, plus a
+fresh connection per take for comparison. --delay adds a fixed server-side
+response delay to model a remote machine.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from cut_numbering_manager.websocket.mock_obs import MockOBSWebSocket  # noqa: E402
+from cut_numbering_manager.websocket.obs_client import OBSWebSocketClient  # noqa: E402
+
+
+def rec_pipelined(client, filename):
+    """Both REC requests in one write, then wait for both answers"""
+    pendings = client.send_requests([
+        ("SetFilenameFormatting", {"filename-formatting": filename}),
+        ("StartRecording", {})
+    ])
+    return all(response is not None and response.get("status") == "ok"
+               for response in client.wait_all(pendings))
+
+
+def rec_sequential(client, filename):
+    """Each REC request waits for the previous answer"""
+    if client.call("SetFilenameFormatting", **{"filename-formatting": filename}).get("status") != "ok":
+        return False
+    return client.call("StartRecording").get("status") == "ok"
+
+
+def measure(mode, mock, password, takes):
+    """Latency in ms of each REC, with a STOP between takes"""
+    client = None
+    if mode != "connect":
+        client = OBSWebSocketClient(mock.ip, mock.port, password).connect()
+    latencies = []
+    try:
+        for i in range(takes):
+            filename = f"Part1_Scene1_{i + 1:03d}_v01"
+            started = time.perf_counter()
+            if mode == "connect":
+                client = OBSWebSocketClient(mock.ip, mock.port, password).connect()
+                ok = rec_pipelined(client, filename)
+            elif mode == "pipelined":
+                ok = rec_pipelined(client, filename)
+            else:
+                ok = rec_sequential(client, filename)
+            elapsed = time.perf_counter() - started
+            if ok:
+                latencies.append(elapsed * 1000)
+            client.call("StopRecording")
+            if mode == "connect":
+                client.close()
+    finally:
+        if client is not None:
+            client.close()
+    return latencies
+
+
+def main(argv=None):
+    """Run the obs-websocket latency benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[2])
+    parser.add_argument("--takes", type=int, default=500, help="number of REC/STOP cycles per mode")
+    parser.add_argument("--delay", type=float, default=0.0, help="server response delay in ms")
+    parser.add_argument("--password", default="", help="require this password on the mock server")
+    args = parser.parse_args(argv)
+    
+    mock = MockOBSWebSocket(password=args.password, response_delay=args.delay / 1000).start()
+    try:
+        for mode in ("pipelined", "sequential", "connect"):
+            latencies = measure(mode, mock, args.password, args.takes)
+            if not latencies:
+                print(f"{mode}: no successful takes")
+                continue
+            latencies.sort()
+            p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+            print(f"{mode}: median {statistics.median(latencies):.3f} ms, "
+                  f"p99 {p99:.3f} ms, max {latencies[-1]:.3f} ms over {len(latencies)} takes")
+    finally:
+        mock.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,189 @@
+"""
+コマンドラインツール
+Command line tools that work without the GUI.
+"""
+
+import argparse
+import csv
+import os
+import sys
+import time
+
+from cut_numbering_manager.models.filename_config import FilenameConfig
+from cut_numbering_manager.utils.filename import (
+    iter_filenames,
+    iter_filename_ranges,
+    iter_parse_directory,
+    iter_parse_filenames
+)
+
+
+def parse_number_ranges(text):
+    """Parse a list like "1-120,130,140-150" into a list of ints"""
+    numbers = []
+    for chunk in text.split(","):
+        chunk = chunk.strip()
+        if not chunk:
+            continue
+        if "-" in chunk:
+            start, end = chunk.split("-", 1)
+            numbers.extend(range(int(start), int(end) + 1))
+        else:
+            numbers.append(int(chunk))
+    return numbers
+
+
+def parse_names(text):
+    """Parse a comma separated list of part or scene names"""
+    return [name.strip() for name in text.split(",") if name.strip()]
+
+
+def build_filename_config(order=None, prefixes=None):
+    """Build a FilenameConfig from --order and --prefix arguments"""
+    config = FilenameConfig()
+    if order:
+        if not config.set_element_order(parse_names(order)):
+            raise ValueError(f"要素順序が不正です: {order}")
+    for item in prefixes or []:
+        element, _, prefix = item.partition("=")
+        if not config.set_prefix(element, prefix):
+            raise ValueError(f"接頭辞の指定が不正です: {item}")
+    return config
+
+
+def iter_table_rows(stream, delimiter=","):
+    """Yield (part, scene, cut, version) rows from a table with an optional header"""
+    reader = csv.reader(stream, delimiter=delimiter)
+    for row in reader:
+        if not row:
+            continue
+        if reader.line_num == 1 and row[0].strip().lower() == FilenameConfig.PART:
+            continue
+        if len(row) < 3:
+            raise ValueError(f"{reader.line_num}行目: part,scene,cut の3列が必要です: {delimiter.join(row)}")
+        version = row[3] if len(row) > 3 and row[3].strip() else 1
+        yield row[0].strip(), row[1].strip(), row[2].strip(), version
+
+
+def run_filenames(args):
+    """Write expected filenames for ranges or a table of takes"""
+    config = build_filename_config(args.order, args.prefix)
+    
+    stream = None
+    if args.table:
+        stream = sys.stdin if args.table == "-" else open(args.table, newline="", encoding="utf-8")
+        delimiter = "\t" if args.table.endswith(".tsv") else ","
+        names = iter_filenames(iter_table_rows(stream, delimiter), config)
+    else:
+        names = iter_filename_ranges(
+            parse_names(args.parts),
+            parse_names(args.scenes),
+            parse_number_ranges(args.cuts),
+            parse_number_ranges(args.versions),
+            config
+        )
+    
+    output = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    count = 0
+    started = time.perf_counter()
+    try:
+        for name in names:
+            if not args.benchmark:
+                output.write(name)
+                output.write("\n")
+            count += 1
+    finally:
+        if output is not sys.stdout:
+            output.close()
+        if stream is not None and stream is not sys.stdin:
+            stream.close()
+    elapsed = time.perf_counter() - started
+    
+    if args.benchmark:
+        rate = count / elapsed if elapsed > 0 else float("inf")
+        print(f"{count} names in {elapsed:.3f} s ({rate:,.0f} names/s)", file=sys.stderr)
+    return 0
+
+
+def run_parse(args):
+    """Parse recorded filenames back into part, scene, cut and version rows"""
+    config = build_filename_config(args.order, args.prefix)
+    order = config.get_element_order()
+    
+    if args.source == "-":
+        takes = iter_parse_filenames((line.strip() for line in sys.stdin), config, order)
+    elif os.path.isdir(args.source):
+        takes = iter_parse_directory(args.source, config, order)
+    else:
+        with open(args.source, encoding="utf-8") as stream:
+            names = [line.strip() for line in stream]
+        takes = iter_parse_filenames(names, config, order)
+    
+    output = sys.stdout if args.output == "-" else open(args.output, "w", newline="", encoding="utf-8")
+    writer = csv.writer(output, delimiter="\t" if args.output.endswith(".tsv") else ",")
+    count = 0
+    started = time.perf_counter()
+    try:
+        if not args.benchmark:
+            writer.writerow([FilenameConfig.PART, FilenameConfig.SCENE, FilenameConfig.CUT,
+                             FilenameConfig.VERSION, "filename"])
+        for take in takes:
+            if not args.benchmark:
+                writer.writerow(take)
+            count += 1
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    elapsed = time.perf_counter() - started
+    
+    if args.benchmark:
+        rate = count / elapsed if elapsed > 0 else float("inf")
+        print(f"{count} names in {elapsed:.3f} s ({rate:,.0f} names/s)", file=sys.stderr)
+    return 0
+
+
+def build_parser():
+    """Build the argument parser for all subcommands"""
+    parser = argparse.ArgumentParser(prog="cut-numbering-tools",
+                                     description="カット番号管理システムのコマンドラインツール")
+    subparsers = parser.add_subparsers(dest="command")
+    subparsers.required = True
+    
+    filenames = subparsers.add_parser("filenames", help="想定されるファイル名を一括生成します")
+    filenames.add_argument("--parts", default="Part1", help="パート名 (カンマ区切り)")
+    filenames.add_argument("--scenes", default="Scene1", help="シーン名 (カンマ区切り)")
+    filenames.add_argument("--cuts", default="1", help="カット番号の範囲 (例: 1-120,130)")
+    filenames.add_argument("--versions", default="1", help="バージョンの範囲 (例: 1-3)")
+    filenames.add_argument("--table", help="part,scene,cut,version の CSV/TSV ファイル (- で標準入力)")
+    filenames.add_argument("--order", help="要素順序 (例: part,scene,cut,version)")
+    filenames.add_argument("--prefix", action="append", help="接頭辞 (例: version=v)")
+    filenames.add_argument("--output", default="-", help="出力先ファイル (- で標準出力)")
+    filenames.add_argument("--benchmark", action="store_true",
+                           help="ファイル名を書き出さずに生成速度だけを表示します")
+    filenames.set_defaults(func=run_filenames)
+    
+    parse = subparsers.add_parser("parse", help="収録済みファイル名をパート・シーン・カット・バージョンに分解します")
+    parse.add_argument("source", nargs="?", default="-",
+                       help="フォルダ、ファイル名一覧のファイル (- で標準入力)")
+    parse.add_argument("--order", help="要素順序 (例: part,scene,cut,version)")
+    parse.add_argument("--prefix", action="append", help="接頭辞 (例: version=v)")
+    parse.add_argument("--output", default="-", help="出力先ファイル (- で標準出力)")
+    parse.add_argument("--benchmark", action="store_true",
+                       help="結果を書き出さずに解析速度だけを表示します")
+    parse.set_defaults(func=run_parse)
+    
+    return parser
+
+
+def main(argv=None):
+    """Entry point for the command line tools"""
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except (OSError, ValueError) as e:
+        print(f"エラー: {str(e)}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,6 +3,8 @@
 Configuration settings for the application.
 """
 
+import os
+
 DEFAULT_IP = "127.0.0.1"
 DEFAULT_PORT = 3333
 DEFAULT_PART_NAME = "Part1"
@@ -12,6 +14,65 @@ DEFAULT_VERSION = 1
 
 OSC_RECORDING_COMMAND = "/setRecording"
 OSC_FILENAME_COMMAND = "/recFileName"
+OSC_USE_BUNDLE = False
+OSC_QUEUE_SIZE = 16
+OSC_FANOUT_MAX_WORKERS = 8
+
+OSC_FEEDBACK_ENABLED = True
+OSC_FEEDBACK_IP = "0.0.0.0"
+OSC_FEEDBACK_PORT = 3334
+OSC_RECORDING_FEEDBACK_ADDRESSES = ("/recording", "/recordingState")
+OSC_PING_COMMAND = "/ping"
+OSC_PONG_ADDRESS = "/pong"
+OSC_PING_TIMEOUT = 5.0
+
+SYNC_ROLL_ENABLED = False
+SYNC_ROLL_FRAME_RATE = 30  # FPSCommon in sample_OBS_settings/.../basic.ini
+SYNC_ROLL_LEAD = 0.02
+SYNC_ROLL_PING_INTERVAL_MS = 1000
+SYNC_ROLL_USE_TIMETAG = False
+
+TRANSPORT_OSC = "osc"
+TRANSPORT_OBS_WEBSOCKET = "obs-websocket"
+DEFAULT_TRANSPORT = TRANSPORT_OSC
+OBS_WEBSOCKET_PORT = 4444  # [WebsocketAPI] ServerPort in sample_OBS_settings/.../basic.ini
+OBS_WEBSOCKET_PASSWORD = os.environ.get("CUT_NUMBERING_OBS_PASSWORD", "")
+OBS_WEBSOCKET_TIMEOUT = 2.0
+
+JOURNAL_ENABLED = True
+JOURNAL_PATH = os.environ.get(
+    "CUT_NUMBERING_JOURNAL",
+    os.path.join(os.path.expanduser("~"), ".cut_numbering_manager", "takes.sqlite3")
+)
+JOURNAL_BATCH_SIZE = 64
+JOURNAL_FLUSH_INTERVAL = 0.05
+
+RECORDING_FOLDER = os.environ.get("CUT_NUMBERING_RECORDING_FOLDER", "")
+RECORDING_SCAN_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cut_numbering_manager", "scan_cache")
+RECORDING_SCAN_POLL_INTERVAL = 1.0
+RECORDING_SCAN_RESTART_DEBOUNCE_MS = 500
+# Container formats OBS can record to (Settings > Output > Recording Format)
+RECORDING_EXTENSIONS = (".mkv", ".mp4", ".mov", ".flv", ".ts", ".m3u8", ".webm", ".avi")
+
+COLLISION_GUARD_MODE = "bump"
+
+SHOT_LIST_PATH = os.environ.get("CUT_NUMBERING_SHOT_LIST", "")
+
+HISTORY_LIMIT = 10000
+HISTORY_MERGE_INTERVAL = 1.0
+
+LOG_LEVEL = os.environ.get("CUT_NUMBERING_LOG_LEVEL", "INFO").upper()
+LOG_QUEUE_SIZE = 10000
+LOG_RING_BUFFER_SIZE = 1000
+LOG_SHUTDOWN_TIMEOUT = 1.0
+
+METRICS_ENABLED = os.environ.get("CUT_NUMBERING_METRICS", "1") != "0"
+METRICS_SIGNIFICANT_BITS = 8
+METRICS_EXPORT_DIR = os.path.join(os.path.expanduser("~"), ".cut_numbering_manager", "metrics")
+
+HEADLESS_CONTROL_IP = "127.0.0.1"
+
+CLAPPERBOARD_RESIZE_DEBOUNCE_MS = 30
 
 APP_NAME = "カット番号管理システム"
 APP_VERSION = "0.1.0"
@@ -0,0 +1,261 @@
+"""
+ヘッドレスモード
+Qt-free run mode driven from stdin or a small TCP control socket.
+"""
+
+import socketserver
+import sys
+import threading
+import time
+
+from cut_numbering_manager.config import (
+    DEFAULT_IP,
+    DEFAULT_PORT,
+    OSC_RECORDING_COMMAND,
+    OSC_FILENAME_COMMAND,
+    OSC_USE_BUNDLE,
+    HEADLESS_CONTROL_IP,
+    SHOT_LIST_PATH
+)
+from cut_numbering_manager.models.cut_info import CutInfo
+from cut_numbering_manager.models.cut_history import CutInfoHistory
+from cut_numbering_manager.osc.transport import OSCTransport
+from cut_numbering_manager.utils.event_log import setup_logging
+from cut_numbering_manager.utils.filename import generate_filename
+
+
+class HeadlessSession:
+    """Numbering and OSC recording control without any GUI"""
+    def __init__(self, ip=DEFAULT_IP, port=DEFAULT_PORT, use_bundle=OSC_USE_BUNDLE):
+        self.ip = ip
+        self.port = port
+        self.use_bundle = use_bundle
+        self.recording = False
+        self.cut_info = CutInfo()
+        # Each command is one edit, so nothing is merged
+        self.history = CutInfoHistory(self.cut_info, merge_interval=0)
+        self.shot_list = None
+        self.transport = OSCTransport()
+        self._lock = threading.Lock()
+        self._commands = {
+            "rec": self.start_recording,
+            "stop": self.stop_recording,
+            "toggle": self.toggle_recording,
+            "part": self.set_part,
+            "scene": self.set_scene,
+            "cut": self.set_cut,
+            "version": self.set_version,
+            "target": self.set_target,
+            "shotlist": self.load_shot_list,
+            "jump": self.jump_to_shot,
+            "undo": self.undo,
+            "redo": self.redo,
+            "filename": self.get_filename,
+            "status": self.get_status,
+        }
+    
+    def current_filename(self):
+        """Filename for the current take"""
+        return generate_filename(self.cut_info, self.cut_info.filename_config.get_element_order())
+    
+    def execute(self, line):
+        """Run one command line and return the response line"""
+        name, _, argument = line.strip().partition(" ")
+        handler = self._commands.get(name.lower())
+        if handler is None:
+            return f"ERROR unknown command: {name}"
+        try:
+            with self._lock:
+                return handler(argument.strip())
+        except Exception as e:
+            return f"ERROR {str(e)}"
+    
+    def start_recording(self, argument=""):
+        """Set the filename and start recording"""
+        if self.recording:
+            return "ERROR already recording"
+        filename = self.current_filename()
+        sender = self.transport.get_sender(self.ip, self.port)
+        if self.use_bundle:
+            success = sender.send_bundle([
+                (OSC_FILENAME_COMMAND, filename),
+                (OSC_RECORDING_COMMAND, 1)
+            ])
+        else:
+            sender.send_message_standard(OSC_FILENAME_COMMAND, filename)
+            success = sender.send_message_standard(OSC_RECORDING_COMMAND, 1)
+        if not success:
+            return "ERROR send failed"
+        self.recording = True
+        return f"OK recording {filename}"
+    
+    def stop_recording(self, argument=""):
+        """Stop recording and advance to the next cut"""
+        if not self.recording:
+            return "ERROR not recording"
+        sender = self.transport.get_sender(self.ip, self.port)
+        if not sender.send_message_standard(OSC_RECORDING_COMMAND, 0):
+            return "ERROR send failed"
+        self.recording = False
+        if self.shot_list is None or self.shot_list.advance(
+                self.cut_info.part_name, self.cut_info.scene_name, self.cut_info.cut_number) is None:
+            self.cut_info.increment_cut()
+        else:
+            self.shot_list.apply(self.shot_list.position, self.cut_info)
+        return f"OK stopped next {self.current_filename()}"
+    
+    def toggle_recording(self, argument=""):
+        """Start or stop recording depending on the current state"""
+        if self.recording:
+            return self.stop_recording()
+        return self.start_recording()
+    
+    def set_part(self, argument):
+        """Set the part name"""
+        self.cut_info.part_name = argument
+        return f"OK {self.current_filename()}"
+    
+    def set_scene(self, argument):
+        """Set the scene name"""
+        self.cut_info.scene_name = argument
+        return f"OK {self.current_filename()}"
+    
+    def set_cut(self, argument):
+        """Set the cut number"""
+        self.cut_info.cut_number = int(argument)
+        return f"OK {self.current_filename()}"
+    
+    def set_version(self, argument):
+        """Set the version number"""
+        self.cut_info.version = int(argument)
+        return f"OK {self.current_filename()}"
+    
+    def set_target(self, argument):
+        """Change the OSC target, given as "ip port" """
+        ip, port = argument.split()
+        self.ip, self.port = ip, int(port)
+        self.transport.retarget(self.ip, self.port)
+        return f"OK target {self.ip}:{self.port}"
+    
+    def load_shot_list(self, argument):
+        """Load a shot list file and move to its first row, or drop the list without a path"""
+        if not argument:
+            self.shot_list = None
+            return "OK shotlist cleared"
+        from cut_numbering_manager.storage.shot_list_reader import read_shot_list
+        
+        shot_list = read_shot_list(argument)
+        if not len(shot_list):
+            return "ERROR shot list is empty"
+        self.shot_list = shot_list
+        shot_list.apply(0, self.cut_info)
+        return f"OK shotlist {len(shot_list)} rows skipped={shot_list.skipped} next {self.current_filename()}"
+    
+    def jump_to_shot(self, argument):
+        """Move to the shot list row a query names, e.g. "S3 12" """
+        if self.shot_list is None:
+            return "ERROR no shot list"
+        if self.recording:
+            return "ERROR recording"
+        matches = self.shot_list.find(argument, self.shot_list.position)
+        if not matches:
+            return f"ERROR not in shot list: {argument}"
+        self.shot_list.apply(matches[0], self.cut_info)
+        return f"OK {self.current_filename()}"
+    
+    def undo(self, argument=""):
+        """Go back to the previous numbering state"""
+        return self._step_history(self.history.undo, "nothing to undo")
+    
+    def redo(self, argument=""):
+        """Go forward to the numbering state undo left"""
+        return self._step_history(self.history.redo, "nothing to redo")
+    
+    def _step_history(self, step, empty_message):
+        """Run an undo or redo step and report the filename it leaves"""
+        if self.recording:
+            return "ERROR recording"
+        snapshot = step()
+        if snapshot is None:
+            return f"ERROR {empty_message}"
+        if self.shot_list is not None:
+            index = self.shot_list.index_of(snapshot.part_name, snapshot.scene_name, snapshot.cut_number)
+            if index is not None:
+                self.shot_list.position = index
+        return f"OK {self.current_filename()}"
+    
+    def get_filename(self, argument=""):
+        """Report the filename for the current take"""
+        return f"OK {self.current_filename()}"
+    
+    def get_status(self, argument=""):
+        """Report recording state, filename and open sockets"""
+        state = "recording" if self.recording else "idle"
+        return (f"OK {state} {self.current_filename()} "
+                f"target={self.ip}:{self.port} sockets={self.transport.open_socket_count()}")
+    
+    def close(self):
+        """Release OSC sockets"""
+        self.transport.close()
+
+
+class _ControlHandler(socketserver.StreamRequestHandler):
+    """Line based handler for the TCP control socket"""
+    def handle(self):
+        for raw in self.rfile:
+            line = raw.decode("utf-8", errors="replace").strip()
+            if not line:
+                continue
+            if line.lower() == "quit":
+                break
+            response = self.server.session.execute(line)
+            self.wfile.write((response + "\n").encode("utf-8"))
+
+
+class _ControlServer(socketserver.ThreadingTCPServer):
+    """TCP control server bound to a headless session"""
+    daemon_threads = True
+    allow_reuse_address = True
+    
+    def __init__(self, address, session):
+        self.session = session
+        super().__init__(address, _ControlHandler)
+
+
+def run_stdin(session, stdin=sys.stdin, stdout=sys.stdout):
+    """Read commands from stdin until EOF or quit"""
+    for line in stdin:
+        if not line.strip():
+            continue
+        if line.strip().lower() == "quit":
+            break
+        stdout.write(session.execute(line) + "\n")
+        stdout.flush()
+
+
+def run_headless(ip=DEFAULT_IP, port=DEFAULT_PORT, control_port=None, started_at=None):
+    """Run the headless mode and report the time until it accepts commands"""
+    setup_logging(sys.stderr)
+    session = HeadlessSession(ip, port)
+    if SHOT_LIST_PATH:
+        print(session.execute(f"shotlist {SHOT_LIST_PATH}"), file=sys.stderr, flush=True)
+    server = None
+    try:
+        if control_port is not None:
+            server = _ControlServer((HEADLESS_CONTROL_IP, control_port), session)
+        if started_at is not None:
+            ready_ms = (time.perf_counter() - started_at) * 1000
+            print(f"ready in {ready_ms:.1f} ms", file=sys.stderr, flush=True)
+        if server is not None:
+            host, bound_port = server.server_address[:2]
+            print(f"control socket listening on {host}:{bound_port}", file=sys.stderr, flush=True)
+            server.serve_forever()
+        else:
+            run_stdin(session)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if server is not None:
+            server.server_close()
+        session.close()
+    return 0
@@ -0,0 +1,97 @@
+"""
+カット情報履歴
+Bounded undo/redo history of CutInfo numbering states.
+"""
+
+import time
+from collections import deque
+
+from cut_numbering_manager.config import HISTORY_LIMIT, HISTORY_MERGE_INTERVAL
+from cut_numbering_manager.models.cut_info import CutInfo
+
+NUMBERING_FIELDS = frozenset((CutInfo.PART_NAME, CutInfo.SCENE_NAME, CutInfo.CUT_NUMBER, CutInfo.VERSION))
+TEXT_FIELDS = frozenset((CutInfo.PART_NAME, CutInfo.SCENE_NAME))
+
+
+class CutInfoHistory:
+    """Undo and redo stacks of CutInfoSnapshot states
+    
+    The history follows the CutInfo's change notifications, so every edit,
+    STOP advance or retake becomes a step. A notification that leaves the
+    state equal to the current one (including the one caused by undo or
+    redo itself) is not recorded. Edits of the part or scene name made
+    within merge_interval seconds of the previous one are merged, so
+    typing a name is one step. Both stacks are deques capped at limit
+    states; the oldest state is dropped first.
+    """
+    def __init__(self, cut_info, limit=HISTORY_LIMIT, merge_interval=HISTORY_MERGE_INTERVAL):
+        self.cut_info = cut_info
+        self.limit = limit
+        self.merge_interval = merge_interval
+        self._undo = deque(maxlen=limit)
+        self._redo = deque(maxlen=limit)
+        self._current = cut_info.snapshot()
+        self._last_fields = None
+        self._last_time = 0.0
+        cut_info.subscribe(self._on_changed)
+    
+    def __len__(self):
+        return len(self._undo)
+    
+    @property
+    def current(self):
+        """Snapshot of the state the history is at"""
+        return self._current
+    
+    def can_undo(self):
+        """Whether there is a state to go back to"""
+        return bool(self._undo)
+    
+    def can_redo(self):
+        """Whether there is an undone state to go forward to"""
+        return bool(self._redo)
+    
+    def _on_changed(self, fields):
+        """Record the state before a change of the numbering fields"""
+        if not fields & NUMBERING_FIELDS:
+            return
+        snapshot = self.cut_info.snapshot()
+        if snapshot == self._current:
+            return
+        now = time.monotonic()
+        merge = (fields & TEXT_FIELDS and fields == self._last_fields
+                 and now - self._last_time < self.merge_interval)
+        if not merge:
+            self._undo.append(self._current)
+        self._redo.clear()
+        self._current = snapshot
+        self._last_fields = fields
+        self._last_time = now
+    
+    def undo(self):
+        """Go back one state; returns the restored snapshot, or None"""
+        if not self._undo:
+            return None
+        self._redo.append(self._current)
+        return self._move_to(self._undo.pop())
+    
+    def redo(self):
+        """Go forward one undone state; returns the restored snapshot, or None"""
+        if not self._redo:
+            return None
+        self._undo.append(self._current)
+        return self._move_to(self._redo.pop())
+    
+    def _move_to(self, snapshot):
+        """Make a snapshot current and write it to the CutInfo"""
+        self._current = snapshot
+        self._last_fields = None
+        self.cut_info.restore(snapshot)
+        return snapshot
+    
+    def clear(self):
+        """Forget every state but the current one"""
+        self._undo.clear()
+        self._redo.clear()
+        self._current = self.cut_info.snapshot()
+        self._last_fields = None
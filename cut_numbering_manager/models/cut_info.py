@@ -4,6 +4,7 @@ Data model for cut information.
 """
 
 import re
+from contextlib import contextmanager
 from cut_numbering_manager.config import (
     DEFAULT_PART_NAME, 
     DEFAULT_SCENE_NAME, 
@@ -12,24 +13,198 @@ from cut_numbering_manager.config import (
 )
 from cut_numbering_manager.models.filename_config import FilenameConfig
 
+INVALID_FILENAME_CHARS = re.compile(r'[\\/*?:"<>|]')
+
+
+class CutInfoSnapshot:
+    """Immutable numbering state of a CutInfo at one moment
+    
+    Only the four numbering fields are held; filename_config is the
+    CutInfo's own FilenameConfig, shared by reference rather than copied,
+    so a snapshot costs a small fixed-size object. Snapshots render with
+    generate_filename like a CutInfo does.
+    """
+    __slots__ = ("part_name", "scene_name", "cut_number", "version", "filename_config")
+    
+    def __init__(self, part_name, scene_name, cut_number, version, filename_config):
+        set_field = object.__setattr__
+        set_field(self, "part_name", part_name)
+        set_field(self, "scene_name", scene_name)
+        set_field(self, "cut_number", cut_number)
+        set_field(self, "version", version)
+        set_field(self, "filename_config", filename_config)
+    
+    def __setattr__(self, name, value):
+        raise AttributeError(f"CutInfoSnapshot is immutable: cannot set {name}")
+    
+    def __delattr__(self, name):
+        raise AttributeError(f"CutInfoSnapshot is immutable: cannot delete {name}")
+    
+    def _key(self):
+        """Fields compared for equality (the config by identity)"""
+        return (self.part_name, self.scene_name, self.cut_number, self.version, id(self.filename_config))
+    
+    def __eq__(self, other):
+        if not isinstance(other, CutInfoSnapshot):
+            return NotImplemented
+        return self._key() == other._key()
+    
+    def __hash__(self):
+        return hash(self._key())
+    
+    def __repr__(self):
+        return (f"CutInfoSnapshot({self.part_name!r}, {self.scene_name!r}, "
+                f"{self.cut_number!r}, {self.version!r})")
+
 
 class CutInfo:
-    """Cut information data model"""
+    """Cut information data model
+
+    Field changes are collected and delivered to subscribers as one
+    notification with the set of changed field names. With a notify
+    scheduler installed (the GUI uses the next event-loop tick), all
+    changes made before the scheduled call are coalesced into one pass.
+    """
+    PART_NAME = "part_name"
+    SCENE_NAME = "scene_name"
+    CUT_NUMBER = "cut_number"
+    VERSION = "version"
+    FILENAME_CONFIG = "filename_config"
+    
     def __init__(self):
-        self.part_name = DEFAULT_PART_NAME
-        self.scene_name = DEFAULT_SCENE_NAME
-        self.cut_number = DEFAULT_CUT_NUMBER
-        self.version = DEFAULT_VERSION
+        self._listeners = []
+        self._changed = set()
+        self._batch_depth = 0
+        self._notify_scheduler = None
+        self._notify_scheduled = False
+        self.notification_count = 0
+        self._part_name = DEFAULT_PART_NAME
+        self._scene_name = DEFAULT_SCENE_NAME
+        self._cut_number = DEFAULT_CUT_NUMBER
+        self._version = DEFAULT_VERSION
         self.filename_config = FilenameConfig()
     
+    @property
+    def part_name(self):
+        """Part name"""
+        return self._part_name
+    
+    @part_name.setter
+    def part_name(self, value):
+        if value != self._part_name:
+            self._part_name = value
+            self.mark_changed(self.PART_NAME)
+    
+    @property
+    def scene_name(self):
+        """Scene name"""
+        return self._scene_name
+    
+    @scene_name.setter
+    def scene_name(self, value):
+        if value != self._scene_name:
+            self._scene_name = value
+            self.mark_changed(self.SCENE_NAME)
+    
+    @property
+    def cut_number(self):
+        """Cut number"""
+        return self._cut_number
+    
+    @cut_number.setter
+    def cut_number(self, value):
+        if value != self._cut_number:
+            self._cut_number = value
+            self.mark_changed(self.CUT_NUMBER)
+    
+    @property
+    def version(self):
+        """Version number"""
+        return self._version
+    
+    @version.setter
+    def version(self, value):
+        if value != self._version:
+            self._version = value
+            self.mark_changed(self.VERSION)
+    
+    def subscribe(self, listener):
+        """Register a callable that receives the set of changed field names"""
+        self._listeners.append(listener)
+    
+    def unsubscribe(self, listener):
+        """Remove a previously registered listener"""
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+    
+    def set_notify_scheduler(self, scheduler):
+        """Set a callable that runs a function later, used to coalesce notifications
+
+        None (the default) notifies synchronously at the end of each change or batch.
+        """
+        self._notify_scheduler = scheduler
+    
+    def mark_changed(self, field):
+        """Record a changed field and schedule a notification"""
+        self._changed.add(field)
+        if self._batch_depth == 0:
+            self._schedule_notify()
+    
+    @contextmanager
+    def batch(self):
+        """Group several changes into one notification"""
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0 and self._changed:
+                self._schedule_notify()
+    
+    def _schedule_notify(self):
+        """Notify now, or once through the scheduler"""
+        if self._notify_scheduler is None:
+            self.flush_changes()
+        elif not self._notify_scheduled:
+            self._notify_scheduled = True
+            self._notify_scheduler(self.flush_changes)
+    
+    def flush_changes(self):
+        """Deliver pending changes to all listeners in one pass"""
+        self._notify_scheduled = False
+        if not self._changed:
+            return
+        fields = frozenset(self._changed)
+        self._changed.clear()
+        self.notification_count += 1
+        for listener in list(self._listeners):
+            listener(fields)
+    
+    def snapshot(self):
+        """Immutable copy of the numbering fields that shares this CutInfo's FilenameConfig"""
+        return CutInfoSnapshot(self._part_name, self._scene_name, self._cut_number, self._version,
+                               self.filename_config)
+    
+    def restore(self, snapshot):
+        """Set the numbering fields back to a snapshot, as one notification"""
+        with self.batch():
+            self.part_name = snapshot.part_name
+            self.scene_name = snapshot.scene_name
+            self.cut_number = snapshot.cut_number
+            self.version = snapshot.version
+    
     def increment_cut(self):
         """Increment cut number and reset version"""
-        self.cut_number += 1
-        self.version = 1
+        with self.batch():
+            self.cut_number += 1
+            self.version = 1
     
-    def increment_version(self):
-        """Increment version number only"""
-        self.version += 1
+    def increment_version(self, next_free=None):
+        """Increment version number only, jumping ahead to next_free when it is higher"""
+        if next_free is not None and next_free > self.version:
+            self.version = next_free
+        else:
+            self.version += 1
     
     def get_formatted_cut_number(self, prefix=None):
         """Get formatted cut number with custom prefix or default"""
@@ -70,4 +245,4 @@ class CutInfo:
     @staticmethod
     def sanitize_filename(name):
         """Remove invalid characters from filename"""
-        return re.sub(r'[\\/*?:"<>|]', "_", name)
+        return INVALID_FILENAME_CHARS.sub("_", name)
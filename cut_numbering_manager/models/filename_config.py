@@ -22,6 +22,11 @@ class FilenameConfig:
     def __init__(self):
         self.element_order = self.DEFAULT_ORDER.copy()
         self.prefixes = self.DEFAULT_PREFIXES.copy()
+        self.revision = 0
+    
+    def _touch(self):
+        """Bump the revision counter so compiled templates get rebuilt"""
+        self.revision += 1
     
     def get_element_order(self):
         """Get current element order"""
@@ -31,15 +36,22 @@ class FilenameConfig:
         """Set new element order"""
         if sorted(new_order) == sorted(self.DEFAULT_ORDER):
             self.element_order = new_order
+            self._touch()
             return True
         return False
     
+    def reset_element_order(self):
+        """Reset element order to default"""
+        self.element_order = self.DEFAULT_ORDER.copy()
+        self._touch()
+    
     def move_element_up(self, element):
         """Move element up in the order"""
         if element in self.element_order:
             idx = self.element_order.index(element)
             if idx > 0:
                 self.element_order[idx], self.element_order[idx-1] = self.element_order[idx-1], self.element_order[idx]
+                self._touch()
                 return True
         return False
     
@@ -49,6 +61,7 @@ class FilenameConfig:
             idx = self.element_order.index(element)
             if idx < len(self.element_order) - 1:
                 self.element_order[idx], self.element_order[idx+1] = self.element_order[idx+1], self.element_order[idx]
+                self._touch()
                 return True
         return False
     
@@ -69,7 +82,9 @@ class FilenameConfig:
     def set_prefix(self, element, prefix):
         """Set prefix for element"""
         if element in self.DEFAULT_ORDER:
-            self.prefixes[element] = prefix
+            if self.prefixes.get(element) != prefix:
+                self.prefixes[element] = prefix
+                self._touch()
             return True
         return False
     
@@ -79,6 +94,15 @@ class FilenameConfig:
     
     def set_all_prefixes(self, prefixes):
         """Set all prefixes"""
+        changed = False
         for element, prefix in prefixes.items():
-            if element in self.DEFAULT_ORDER:
+            if element in self.DEFAULT_ORDER and self.prefixes.get(element) != prefix:
                 self.prefixes[element] = prefix
+                changed = True
+        if changed:
+            self._touch()
+    
+    def reset_prefixes(self):
+        """Reset prefixes to default values"""
+        self.prefixes = self.DEFAULT_PREFIXES.copy()
+        self._touch()
@@ -0,0 +1,114 @@
+"""
+OSC設定モデル
+Data model for OSC connection settings.
+"""
+
+from cut_numbering_manager.config import (
+    DEFAULT_IP,
+    DEFAULT_PORT,
+    DEFAULT_TRANSPORT,
+    OBS_WEBSOCKET_PASSWORD,
+    OBS_WEBSOCKET_PORT,
+    OSC_USE_BUNDLE,
+    SYNC_ROLL_ENABLED
+)
+from cut_numbering_manager.models.cut_info import CutInfo
+
+
+class OSCTarget:
+    """One OBS instance that receives the recording commands"""
+    def __init__(self, ip=DEFAULT_IP, port=DEFAULT_PORT, enabled=True, suffix=""):
+        self.ip = ip
+        self.port = port
+        self.enabled = enabled
+        self.suffix = suffix
+    
+    def get_target(self):
+        """Get the (ip, port) target"""
+        return (self.ip, int(self.port))
+    
+    def get_filename(self, filename):
+        """Filename for this target with its suffix appended"""
+        return self.apply_suffix(filename, self.suffix)
+    
+    @staticmethod
+    def apply_suffix(filename, suffix):
+        """Filename with a target suffix appended, for callers that only hold a snapshot"""
+        if not suffix:
+            return filename
+        return CutInfo.sanitize_filename(f"{filename}{suffix}")
+    
+    def label(self):
+        """Short label for status displays"""
+        return f"{self.ip}:{self.port}"
+    
+    def snapshot(self):
+        """Immutable copy that can be handed to the OSC worker thread"""
+        return (self.ip, int(self.port), self.suffix, self.label())
+
+
+class OSCSettings:
+    """OSC connection settings data model
+    
+    targets holds every OBS instance; the first one is the primary target
+    exposed through ip and port. transport selects OSC or obs-websocket;
+    with obs-websocket each target's IP is reached on websocket_port.
+    """
+    def __init__(self):
+        self.targets = [OSCTarget()]
+        self.use_bundle = OSC_USE_BUNDLE
+        self.sync_roll = SYNC_ROLL_ENABLED
+        self.transport = DEFAULT_TRANSPORT
+        self.websocket_port = OBS_WEBSOCKET_PORT
+        self.websocket_password = OBS_WEBSOCKET_PASSWORD
+    
+    @property
+    def ip(self):
+        """IP address of the primary target"""
+        return self.targets[0].ip
+    
+    @ip.setter
+    def ip(self, value):
+        self.targets[0].ip = value
+    
+    @property
+    def port(self):
+        """Port of the primary target"""
+        return self.targets[0].port
+    
+    @port.setter
+    def port(self, value):
+        self.targets[0].port = value
+    
+    def get_target(self):
+        """Get the (ip, port) target"""
+        return (self.ip, self.port)
+    
+    def get_suffixes(self):
+        """Distinct non-empty filename suffixes of every target"""
+        return tuple(sorted({target.suffix for target in self.targets if target.suffix}))
+    
+    def add_target(self, ip=DEFAULT_IP, port=DEFAULT_PORT, enabled=True, suffix=""):
+        """Append a target and return it"""
+        target = OSCTarget(ip, port, enabled, suffix)
+        self.targets.append(target)
+        return target
+    
+    def remove_target(self, index):
+        """Remove a target; the last remaining target cannot be removed"""
+        if len(self.targets) <= 1 or not 0 <= index < len(self.targets):
+            return False
+        del self.targets[index]
+        return True
+    
+    def enabled_targets(self):
+        """Targets that should receive commands"""
+        return [target for target in self.targets if target.enabled]
+    
+    def get_targets(self):
+        """(ip, port) of every enabled target"""
+        return [target.get_target() for target in self.enabled_targets()]
+    
+    def get_websocket_targets(self):
+        """(ip, websocket port) of every enabled target"""
+        return [(target.ip, int(self.websocket_port)) for target in self.enabled_targets()]
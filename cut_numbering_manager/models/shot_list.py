@@ -0,0 +1,181 @@
+"""
+ショットリストモデル
+Data model for a shot list: part, scene and cut rows in shooting order, indexed for jumping and advancing.
+"""
+
+import bisect
+import re
+
+from cut_numbering_manager.config import DEFAULT_VERSION
+
+# Separators accepted between the words of a jump query ("S3 12", "Part1_Scene3_012")
+QUERY_SEPARATORS = re.compile(r"[\s_/]+")
+TRAILING_NUMBER = re.compile(r"^(.*?)(\d+)$")
+
+
+class ShotList:
+    """Shot list rows with O(1) lookups by take, by cut and by part or scene name
+    
+    Rows are (part, scene, cut) tuples kept in the order of the list, gaps,
+    inserts and out-of-order cuts included. Every index is built as rows
+    are appended, so a list can be filled while it is still being read.
+    Repeated part and scene names share one string. Shot rows are flagged
+    in a bytearray, so finding the next unshot row is a C-level scan.
+    """
+    def __init__(self, source=""):
+        self.source = source
+        self.position = None
+        self.skipped = 0
+        self._rows = []
+        self._shot = bytearray()
+        self._folded = {}
+        self._by_take = {}
+        self._by_cut = {}
+        self._by_name_cut = {}
+        self._by_name = {}
+    
+    def __len__(self):
+        return len(self._rows)
+    
+    def append(self, part_name, scene_name, cut_number):
+        """Add a row at the end of the list and index it"""
+        part_name, part_key = self._fold(part_name)
+        scene_name, scene_key = self._fold(scene_name)
+        rows = self._rows
+        index = len(rows)
+        # Names are shared, so an identity check tells whether this row starts a new run
+        new_run = not rows or rows[-1][0] is not part_name or rows[-1][1] is not scene_name
+        rows.append((part_name, scene_name, cut_number))
+        self._shot.append(0)
+        self._by_take.setdefault((part_key, scene_key, cut_number), []).append(index)
+        self._by_cut.setdefault(cut_number, []).append(index)
+        keys = (part_key,) if scene_key == part_key else (part_key, scene_key)
+        for key in keys:
+            self._by_name_cut.setdefault((key, cut_number), []).append(index)
+            if new_run:
+                self._by_name.setdefault(key, []).append(index)
+        return index
+    
+    def _fold(self, name):
+        """Shared copy of a name and of its case-folded key"""
+        entry = self._folded.get(name)
+        if entry is None:
+            entry = self._folded[name] = (name, name.casefold())
+        return entry
+    
+    def row(self, index):
+        """(part, scene, cut) of a row"""
+        return self._rows[index]
+    
+    def index_of(self, part_name, scene_name, cut_number):
+        """Index of the first row for a take (names match case-insensitively), or None"""
+        indexes = self._by_take.get((part_name.casefold(), scene_name.casefold(), cut_number))
+        return indexes[0] if indexes else None
+    
+    def is_shot(self, index):
+        """Whether a row has been shot"""
+        return bool(self._shot[index])
+    
+    def mark_shot(self, index, shot=True):
+        """Flag a row as shot (or not)"""
+        self._shot[index] = 1 if shot else 0
+    
+    def shot_count(self):
+        """Number of rows flagged as shot"""
+        return len(self._shot) - self._shot.count(0)
+    
+    def next_unshot(self, after=None, is_shot=None):
+        """Index of the first unshot row after a row (from the top for None), or None
+        
+        is_shot(part, scene, cut) can report rows shot outside this list,
+        e.g. takes in the journal; such rows are flagged as they are passed.
+        """
+        index = -1 if after is None else after
+        while True:
+            index = self._shot.find(0, index + 1)
+            if index < 0:
+                return None
+            if is_shot is None or not is_shot(*self._rows[index]):
+                return index
+            self._shot[index] = 1
+    
+    def mark_taken(self, takes):
+        """Flag the rows of (part, scene, cut) takes that already exist; returns how many were flagged"""
+        by_take = self._by_take
+        shot = self._shot
+        flagged = 0
+        for part_name, scene_name, cut_number in takes:
+            for index in by_take.get((part_name.casefold(), scene_name.casefold(), cut_number), ()):
+                if not shot[index]:
+                    shot[index] = 1
+                    flagged += 1
+        return flagged
+    
+    def advance(self, part_name, scene_name, cut_number, is_shot=None):
+        """Flag a finished take's row as shot and move to the next unshot row
+        
+        Rows skipped over by a jump are picked up again from the top once
+        the end of the list is reached. Returns the new position, or None
+        when every row has been shot (the position is then left as is).
+        """
+        index = self.index_of(part_name, scene_name, cut_number)
+        if index is not None:
+            self._shot[index] = 1
+            self.position = index
+        next_index = self.next_unshot(self.position, is_shot)
+        if next_index is None and self.position is not None:
+            next_index = self.next_unshot(None, is_shot)
+        if next_index is not None:
+            self.position = next_index
+        return next_index
+    
+    def find(self, query, near=None):
+        """Indexes of the rows matching a jump query, nearest after near first
+        
+        The query is a cut number, optionally preceded by a scene name or by
+        a part and a scene name ("12", "S3 12", "Part1 S3 12"). Without a
+        number it names a scene or part (or a part and a scene) and matches
+        the first row of each run of it. Names match case-insensitively.
+        """
+        words = [word for word in QUERY_SEPARATORS.split(query.strip()) if word]
+        if not words:
+            return []
+        cut_number = None
+        last = words[-1]
+        if last.isdigit() or (TRAILING_NUMBER.match(last) and last.casefold() not in self._by_name):
+            cut_number = int(TRAILING_NUMBER.match(last).group(2))
+            words = words[:-1]
+        names = [word.casefold() for word in words]
+        if len(names) > 2 or (cut_number is None and not names):
+            return []
+        
+        if cut_number is None:
+            matches = self._by_name.get(names[-1], [])
+            if len(names) == 2:
+                matches = [index for index in matches if self._fold(self._rows[index][0])[1] == names[0]]
+        elif not names:
+            matches = self._by_cut.get(cut_number, [])
+        elif len(names) == 1:
+            matches = self._by_name_cut.get((names[0], cut_number), [])
+        else:
+            matches = self._by_take.get((names[0], names[1], cut_number), [])
+        if near is None:
+            return list(matches)
+        # Index lists are in row order, so "after near, then from the top" is a rotation
+        split = bisect.bisect_right(matches, near)
+        return matches[split:] + matches[:split]
+    
+    def apply(self, index, cut_info, version=DEFAULT_VERSION):
+        """Set a CutInfo to a row and make it the current position"""
+        part_name, scene_name, cut_number = self._rows[index]
+        with cut_info.batch():
+            cut_info.part_name = part_name
+            cut_info.scene_name = scene_name
+            cut_info.cut_number = cut_number
+            cut_info.version = version
+        self.position = index
+    
+    def describe(self, index):
+        """Short "part / scene / cut" label of a row"""
+        part_name, scene_name, cut_number = self._rows[index]
+        return f"{part_name} / {scene_name} / {cut_number:03d}"
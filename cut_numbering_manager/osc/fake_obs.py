@@ -0,0 +1,235 @@
+"""
+OBS代替OSCピア
+Local stand-in for OSC for OBS, used to exercise the app without OBS.
+"""
+
+import heapq
+import itertools
+import os
+import random
+import select
+import socket
+import threading
+import time
+
+from pythonosc.dispatcher import Dispatcher
+from pythonosc.osc_packet import OscPacket, ParseError
+
+from cut_numbering_manager.config import (
+    DEFAULT_IP,
+    OSC_FEEDBACK_PORT,
+    OSC_FILENAME_COMMAND,
+    OSC_RECORDING_COMMAND,
+    OSC_RECORDING_FEEDBACK_ADDRESSES,
+    OSC_PING_COMMAND,
+    OSC_PONG_ADDRESS
+)
+from cut_numbering_manager.osc.sender import CustomOSCSender
+
+# Receive buffer requested for the command socket (the kernel may cap it)
+RECEIVE_BUFFER_SIZE = 4 * 1024 * 1024
+
+# A held-back datagram is released on its own if nothing overtakes it within this many seconds
+REORDER_WINDOW = 0.05
+
+# Filename OBS falls back to when none was set (its default "%CCYY-%MM-%DD %hh-%mm-%ss")
+DEFAULT_FILENAME_FORMAT = "%Y-%m-%d %H-%M-%S"
+
+
+class FakeOBS:
+    """Receives the app's OSC commands and answers with recording-state feedback
+    
+    Every arriving message is kept in received as (monotonic time, address,
+    args); messages that reach the handlers are kept in messages. The
+    network between the app and OBS can be impaired: drop_rate discards
+    datagrams, delay and jitter postpone them (seconds), and reorder_rate
+    holds a datagram back until the next one has been delivered (or for
+    REORDER_WINDOW seconds at most). With
+    output_folder set, every recording leaves an empty file named after the
+    filename OBS was told to use, as in sample_videos/. With
+    websocket_port set, an obs-websocket 4.x server is also started on that
+    port (0 picks a free one) and drives the same recording state.
+    """
+    def __init__(self, ip=DEFAULT_IP, port=0, feedback_ip=DEFAULT_IP,
+                 feedback_port=OSC_FEEDBACK_PORT, drop_rate=0.0, delay=0.0, jitter=0.0,
+                 reorder_rate=0.0, output_folder=None, extension=".mp4", websocket_port=None,
+                 websocket_password="", seed=None):
+        self.ip = ip
+        self.port = port
+        self.feedback_ip = feedback_ip
+        self.feedback_port = feedback_port
+        self.drop_rate = drop_rate
+        self.delay = delay
+        self.jitter = jitter
+        self.reorder_rate = reorder_rate
+        self.output_folder = output_folder
+        self.extension = extension
+        self.websocket_port = websocket_port
+        self.websocket_password = websocket_password
+        self.recording = False
+        self.filename = None
+        self.messages = []
+        self.received = []
+        self.dropped = []
+        self.reordered = 0
+        self.recordings = []
+        self.duplicates = []
+        self.websocket = None
+        self._random = random.Random(seed)
+        self._dispatcher = None
+        self._socket = None
+        self._wake_r = None
+        self._wake_w = None
+        self._pending = []
+        self._held = None
+        self._sequence = itertools.count()
+        self._running = False
+        self._thread = None
+        self._feedback = None
+        self._output_names = set()
+        self._lock = threading.Lock()
+    
+    @property
+    def impaired(self):
+        """Whether any network impairment is configured"""
+        return bool(self.drop_rate or self.delay or self.jitter or self.reorder_rate)
+    
+    def start(self):
+        """Bind the command socket and start serving on a background thread"""
+        self._dispatcher = Dispatcher()
+        self._dispatcher.map(OSC_FILENAME_COMMAND, self._handle_filename)
+        self._dispatcher.map(OSC_RECORDING_COMMAND, self._handle_recording)
+        self._dispatcher.map(OSC_PING_COMMAND, self._handle_ping)
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        # A deep receive buffer so bursts are lost only where the impairment says so
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RECEIVE_BUFFER_SIZE)
+        self._socket.bind((self.ip, self.port))
+        self.port = self._socket.getsockname()[1]
+        # A socket pair rather than a pipe: select() on Windows only accepts sockets
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._feedback = CustomOSCSender(self.feedback_ip, self.feedback_port)
+        if self.output_folder:
+            os.makedirs(self.output_folder, exist_ok=True)
+        if self.websocket_port is not None:
+            from cut_numbering_manager.websocket.mock_obs import MockOBSWebSocket
+            
+            self.websocket = MockOBSWebSocket(self.ip, self.websocket_port, self.websocket_password,
+                                              self.delay, self._on_websocket_recording).start()
+            self.websocket_port = self.websocket.port
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="fake-obs", daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        """Stop serving and close every socket"""
+        self._running = False
+        if self._wake_w is not None:
+            try:
+                self._wake_w.send(b"x")
+            except OSError:
+                pass
+        if self._thread is not None:
+            self._thread.join(1.0)
+            self._thread = None
+        for wake_socket in (self._wake_r, self._wake_w):
+            if wake_socket is not None:
+                wake_socket.close()
+        self._wake_r = self._wake_w = None
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+        if self._feedback is not None:
+            self._feedback.close()
+            self._feedback = None
+        if self.websocket is not None:
+            self.websocket.stop()
+            self.websocket = None
+    
+    def _run(self):
+        """Receive datagrams, impair them and hand them to the dispatcher when due"""
+        while self._running:
+            deadlines = [item[0] for item in (self._pending[:1] + ([self._held] if self._held else []))]
+            timeout = max(0.0, min(deadlines) - time.monotonic()) if deadlines else None
+            readable, _, _ = select.select([self._socket, self._wake_r], [], [], timeout)
+            if self._wake_r in readable:
+                break
+            if self._socket in readable:
+                try:
+                    data, client_address = self._socket.recvfrom(65536)
+                except OSError:
+                    break
+                self._receive(data, client_address)
+            now = time.monotonic()
+            if self._held is not None and self._held[0] <= now:
+                heapq.heappush(self._pending, (now, next(self._sequence)) + self._held[1:])
+                self._held = None
+            while self._pending and self._pending[0][0] <= now:
+                _, _, data, client_address = heapq.heappop(self._pending)
+                self._dispatcher.call_handlers_for_packet(data, client_address)
+    
+    def _receive(self, data, client_address):
+        """Log an arriving datagram and schedule, hold back or drop it"""
+        now = time.monotonic()
+        try:
+            messages = [(timed.message.address, tuple(timed.message.params))
+                        for timed in OscPacket(data).messages]
+        except ParseError:
+            messages = [(None, (data,))]
+        for address, args in messages:
+            self.received.append((now, address, args))
+        if not self.impaired:
+            self._dispatcher.call_handlers_for_packet(data, client_address)
+            return
+        if self.drop_rate and self._random.random() < self.drop_rate:
+            self.dropped.extend((now, address, args) for address, args in messages)
+            return
+        due = now + self.delay
+        if self.jitter:
+            due += self._random.uniform(0.0, self.jitter)
+        held, self._held = self._held, None
+        if held is None and self.reorder_rate and self._random.random() < self.reorder_rate:
+            self._held = (now + REORDER_WINDOW, data, client_address)
+            return
+        heapq.heappush(self._pending, (due, next(self._sequence), data, client_address))
+        if held is not None:
+            self.reordered += 1
+            heapq.heappush(self._pending, (due, next(self._sequence)) + held[1:])
+    
+    def _handle_filename(self, address, *args):
+        """Remember the filename for the next recording"""
+        self.messages.append((time.monotonic(), address, args))
+        if args:
+            self.filename = str(args[0])
+    
+    def _handle_ping(self, address, *args):
+        """Echo a ping token back on the feedback channel"""
+        if args:
+            self._feedback.send_message_standard(OSC_PONG_ADDRESS, args[0])
+    
+    def _handle_recording(self, address, *args):
+        """Change recording state and report it on the feedback channel"""
+        self.messages.append((time.monotonic(), address, args))
+        if not args:
+            return
+        self._set_recording(bool(args[0]), self.filename)
+        self._feedback.send_message_standard(OSC_RECORDING_FEEDBACK_ADDRESSES[0], int(self.recording))
+    
+    def _on_websocket_recording(self, state, filename):
+        """Follow recording started or stopped over obs-websocket"""
+        # An untouched strftime-style formatting means OBS picks a dated name itself
+        self.filename = None if "%" in filename else filename
+        self._set_recording(state, self.filename)
+    
+    def _set_recording(self, state, filename):
+        """Start or stop a recording, writing its output file on start"""
+        with self._lock:
+            if state and not self.recording:
+                name = (filename or time.strftime(DEFAULT_FILENAME_FORMAT)) + self.extension
+                if name in self._output_names:
+                    self.duplicates.append(name)
+                self._output_names.add(name)
+                self.recordings.append((time.monotonic(), name))
+                if self.output_folder:
+                    open(os.path.join(self.output_folder, name), "ab").close()
+            self.recording = state
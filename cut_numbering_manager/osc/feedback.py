@@ -0,0 +1,143 @@
+"""
+OSCフィードバック受信モジュール
+Background OSC server that receives recording-state feedback from OBS.
+"""
+
+import itertools
+import threading
+import time
+from collections import deque
+
+from pythonosc.dispatcher import Dispatcher
+from pythonosc.osc_server import BlockingOSCUDPServer
+
+from cut_numbering_manager.config import (
+    OSC_FEEDBACK_IP,
+    OSC_FEEDBACK_PORT,
+    OSC_RECORDING_FEEDBACK_ADDRESSES,
+    OSC_PING_COMMAND,
+    OSC_PONG_ADDRESS,
+    OSC_PING_TIMEOUT
+)
+from cut_numbering_manager.osc.sender import encode_message
+
+
+class OSCFeedbackListener:
+    """Listens for recording-state feedback and measures command round-trip time"""
+    def __init__(self, on_state=None, ip=OSC_FEEDBACK_IP, port=OSC_FEEDBACK_PORT,
+                 addresses=OSC_RECORDING_FEEDBACK_ADDRESSES, history=100):
+        self.on_state = on_state
+        self.ip = ip
+        self.port = port
+        self.addresses = addresses
+        self._sent_at = {}
+        self._round_trip_times = deque(maxlen=history)
+        self._history = history
+        self._tokens = itertools.count(1)
+        self._pings = {}
+        self._pings_lock = threading.Lock()
+        self._ping_times = {}
+        self._server = None
+        self._thread = None
+    
+    @property
+    def running(self):
+        """Whether the listener thread is serving"""
+        return self._thread is not None and self._thread.is_alive()
+    
+    def start(self):
+        """Bind the server socket and start serving on a background thread"""
+        dispatcher = Dispatcher()
+        for address in self.addresses:
+            dispatcher.map(address, self._handle_state)
+        dispatcher.map(OSC_PONG_ADDRESS, self._handle_pong)
+        self._server = BlockingOSCUDPServer((self.ip, self.port), dispatcher)
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        name="osc-feedback-listener", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """Stop serving and close the server socket"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if self._thread is not None:
+            self._thread.join(1.0)
+            self._thread = None
+    
+    def mark_command_sent(self, state):
+        """Record when a command asking for the given recording state was sent"""
+        self._sent_at[bool(state)] = time.monotonic()
+    
+    def round_trip_times(self):
+        """Round-trip times in seconds of the most recent acknowledged commands"""
+        return list(self._round_trip_times)
+    
+    def ping(self, sender, key):
+        """Send a ping to a target; its pong is matched by token and timed per key
+        
+        Pings unanswered for OSC_PING_TIMEOUT seconds are forgotten, since
+        stock OSC for OBS never answers /ping.
+        """
+        token = next(self._tokens)
+        now = time.monotonic()
+        with self._pings_lock:
+            self._expire_pings(now - OSC_PING_TIMEOUT)
+            self._pings[token] = (key, now)
+        if not sender.send_dgram(encode_message(OSC_PING_COMMAND, token)):
+            with self._pings_lock:
+                self._pings.pop(token, None)
+            return False
+        return True
+    
+    def _expire_pings(self, cutoff):
+        """Drop pings sent before cutoff (tokens are in send order)"""
+        pings = self._pings
+        while pings:
+            token = next(iter(pings))
+            if pings[token][1] >= cutoff:
+                break
+            del pings[token]
+    
+    def pending_pings(self):
+        """Number of pings still waiting for a pong"""
+        return len(self._pings)
+    
+    def one_way_latency(self, key):
+        """Estimated one-way latency in seconds to a target, or None if it never answered
+
+        Half the smallest round trip: queueing only ever adds delay, so the
+        minimum is the sample closest to the true path latency.
+        """
+        samples = self._ping_times.get(key)
+        if not samples:
+            return None
+        return min(samples) / 2
+    
+    def _handle_pong(self, address, *args):
+        """Handle a ping reply (runs on the listener thread)"""
+        if not args:
+            return
+        with self._pings_lock:
+            ping = self._pings.pop(args[0], None)
+        if ping is None:
+            return
+        key, sent_at = ping
+        samples = self._ping_times.get(key)
+        if samples is None:
+            samples = self._ping_times[key] = deque(maxlen=self._history)
+        samples.append(time.monotonic() - sent_at)
+    
+    def _handle_state(self, address, *args):
+        """Handle a recording-state message (runs on the listener thread)"""
+        if not args:
+            return
+        state = bool(args[0])
+        sent_at = self._sent_at.pop(state, None)
+        rtt = None if sent_at is None else time.monotonic() - sent_at
+        if rtt is not None:
+            self._round_trip_times.append(rtt)
+        if self.on_state:
+            self.on_state(state, rtt)
@@ -4,7 +4,49 @@ OSC message sending functionality for OBS communication.
 """
 
 import socket
-from pythonosc import udp_client
+import time
+from pythonosc.osc_message_builder import OscMessageBuilder
+from pythonosc.parsing import osc_types
+from pythonosc.parsing.osc_types import IMMEDIATELY
+
+from cut_numbering_manager.config import OSC_RECORDING_COMMAND
+from cut_numbering_manager.utils.event_log import get_logger, log_send
+from cut_numbering_manager.utils.metrics import METRICS
+
+logger = get_logger("osc")
+
+
+def build_message(address, value):
+    """Build a standard OSC message from an address and a value or list of values"""
+    builder = OscMessageBuilder(address=address)
+    values = value if isinstance(value, list) else [value]
+    for item in values:
+        builder.add_arg(item)
+    return builder.build()
+
+
+def encode_message(address, value):
+    """Encode a standard OSC message to datagram bytes"""
+    return build_message(address, value).dgram
+
+
+def build_bundle_dgram(dgrams, timetag=None):
+    """Build an OSC bundle datagram from already encoded message datagrams
+
+    timetag is a system time in seconds since the epoch; None means immediately.
+    """
+    parts = [b"#bundle\x00", osc_types.write_date(IMMEDIATELY if timetag is None else timetag)]
+    for dgram in dgrams:
+        parts.append(osc_types.write_int(len(dgram)))
+        parts.append(dgram)
+    return b"".join(parts)
+
+
+# Commands whose encoding never changes are encoded once at import time
+CONSTANT_DGRAMS = {
+    (OSC_RECORDING_COMMAND, 1): encode_message(OSC_RECORDING_COMMAND, 1),
+    (OSC_RECORDING_COMMAND, 0): encode_message(OSC_RECORDING_COMMAND, 0),
+}
 
 
 class CustomOSCSender:
@@ -13,47 +55,106 @@ class CustomOSCSender:
         self.ip = ip
         self.port = port
         self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._prepared = {}
     
-    def send_message_with_space(self, address, value):
-        """Send an OSC message with a space between address and value"""
-        message = f"{address} {value}"
-        print(f"送信 (スペース区切り): {message}")
+    @property
+    def closed(self):
+        """Whether the underlying socket has been closed"""
+        return self.socket.fileno() == -1
+    
+    def close(self):
+        """Close the underlying UDP socket"""
+        self.socket.close()
+    
+    def prepare(self, address, value):
+        """Encode a message ahead of time so the next send of it is just a sendto"""
+        self._prepared[address] = (value, encode_message(address, value))
+    
+    def encode(self, address, value):
+        """Get datagram bytes, reusing prepared and constant encodings when they match"""
+        prepared = self._prepared.get(address)
+        if prepared is not None and prepared[0] == value:
+            return prepared[1]
+        if type(value) is int:
+            dgram = CONSTANT_DGRAMS.get((address, value))
+            if dgram is not None:
+                return dgram
+        return encode_message(address, value)
+    
+    def _target_label(self):
+        """ip:port label used in log records"""
+        return f"{self.ip}:{self.port}"
+    
+    def _send_text(self, label, message):
+        """Send a plain text payload and log it"""
+        started = time.perf_counter()
         try:
-            self.socket.sendto(message.encode(), (self.ip, self.port))
-            return True
+            payload = message.encode()
+            encoded = time.perf_counter()
+            self.socket.sendto(payload, (self.ip, self.port))
+            sent = time.perf_counter()
         except Exception as e:
-            print(f"エラー: {str(e)}")
+            logger.error("エラー: %s", e)
             return False
+        METRICS.record("encode", encoded - started)
+        METRICS.record("sendto", sent - encoded)
+        log_send(logger, label, self._target_label(), message, len(payload),
+                 encoded - started, sent - encoded)
+        return True
+    
+    def send_message_with_space(self, address, value):
+        """Send an OSC message with a space between address and value"""
+        return self._send_text("スペース区切り", f"{address} {value}")
     
     def send_message_with_comma(self, address, value):
         """Send an OSC message with a comma between address and value"""
-        message = f"{address},{value}"
-        print(f"送信 (カンマ区切り): {message}")
+        return self._send_text("カンマ区切り", f"{address},{value}")
+    
+    def send_message_standard(self, address, value):
+        """Send an OSC message in the standard python-osc encoding over the sender's socket"""
+        started = time.perf_counter()
         try:
-            self.socket.sendto(message.encode(), (self.ip, self.port))
-            return True
+            dgram = self.encode(address, value)
+            encoded = time.perf_counter()
+            self.socket.sendto(dgram, (self.ip, self.port))
+            sent = time.perf_counter()
         except Exception as e:
-            print(f"エラー: {str(e)}")
+            logger.error("エラー: %s", e)
             return False
+        METRICS.record("encode", encoded - started)
+        METRICS.record("sendto", sent - encoded)
+        log_send(logger, "標準OSC形式", self._target_label(), address, len(dgram),
+                 encoded - started, sent - encoded, f"{address} {value}")
+        return True
     
-    def send_message_standard(self, address, value):
-        """Send an OSC message using the standard python-osc library"""
-        client = udp_client.SimpleUDPClient(self.ip, self.port)
-        print(f"送信 (標準OSC形式): {address} {value}")
+    def send_dgram(self, dgram):
+        """Send already encoded datagram bytes without logging (pings and timed dispatch)"""
         try:
-            client.send_message(address, value)
+            self.socket.sendto(dgram, (self.ip, self.port))
             return True
         except Exception as e:
-            print(f"エラー: {str(e)}")
+            logger.error("エラー: %s", e)
             return False
-            
-    def send_message_raw(self, address, value=None):
-        """Send an OSC message as a raw string without any formatting"""
-        message = address if value is None else f"{address}{value}"
-        print(f"送信 (生データ): {message}")
+    
+    def send_bundle(self, messages, timetag=None):
+        """Send several OSC messages as a single bundle datagram"""
+        started = time.perf_counter()
         try:
-            self.socket.sendto(message.encode(), (self.ip, self.port))
-            return True
+            dgrams = [self.encode(address, value) for address, value in messages]
+            bundle = build_bundle_dgram(dgrams, timetag)
+            encoded = time.perf_counter()
+            self.socket.sendto(bundle, (self.ip, self.port))
+            sent = time.perf_counter()
         except Exception as e:
-            print(f"エラー: {str(e)}")
+            logger.error("エラー: %s", e)
             return False
+        METRICS.record("encode", encoded - started)
+        METRICS.record("sendto", sent - encoded)
+        summary = ", ".join(f"{address} {value}" for address, value in messages)
+        log_send(logger, "OSCバンドル", self._target_label(), "#bundle", len(bundle),
+                 encoded - started, sent - encoded, summary)
+        return True
+            
+    def send_message_raw(self, address, value=None):
+        """Send an OSC message as a raw string without any formatting"""
+        return self._send_text("生データ", address if value is None else f"{address}{value}")
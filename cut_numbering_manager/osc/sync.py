@@ -0,0 +1,104 @@
+"""
+シンクロールモジュール
+Frame-aligned start of several targets at one scheduled instant.
+"""
+
+import sys
+import time
+
+from cut_numbering_manager.config import (
+    OSC_RECORDING_COMMAND,
+    SYNC_ROLL_FRAME_RATE,
+    SYNC_ROLL_LEAD
+)
+from cut_numbering_manager.osc.sender import build_bundle_dgram, CONSTANT_DGRAMS
+from cut_numbering_manager.osc.transport import FanOutResult, TargetResult
+
+SPIN_THRESHOLD = 0.002
+DISPATCH_SWITCH_INTERVAL = 0.0001
+
+
+def wait_until(deadline):
+    """Sleep until shortly before a perf_counter deadline, then spin to hit it precisely"""
+    while True:
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            return
+        if remaining > SPIN_THRESHOLD:
+            time.sleep(remaining - SPIN_THRESHOLD)
+
+
+class SyncRollResult(FanOutResult):
+    """Fan-out result of a scheduled start, with the estimated skew between targets
+    
+    estimated_skew is the spread of each target's send completion plus its
+    ping-based one-way latency estimate. It shows how well the app kept to
+    its own schedule, not when each OBS actually started recording.
+    """
+    def __init__(self, results, estimated_skew=None, frame_time=1.0 / SYNC_ROLL_FRAME_RATE):
+        super().__init__(results)
+        self.estimated_skew = estimated_skew
+        self.frame_time = frame_time
+    
+    @property
+    def within_frame(self):
+        """Whether every target is estimated to have started within one frame of the others"""
+        return self.estimated_skew is not None and self.estimated_skew <= self.frame_time
+
+
+class SyncRollScheduler:
+    """Sends /setRecording 1 so that it reaches every target at the same instant
+    
+    Each target's one-way latency (half its best ping round trip) is
+    subtracted from a common start instant a little in the future; the
+    targets are then dispatched in order of their send times on the
+    calling thread, with the interpreter's thread switch interval lowered
+    meanwhile so that a busy GUI thread cannot hold the GIL across a send
+    for the default 5 ms. A target that never answered a ping is assumed
+    to have zero latency. With use_timetag the command is also wrapped in a
+    bundle timetagged with the start instant, for receivers that honour
+    timetags (this needs the machines' clocks to be in sync).
+    """
+    def __init__(self, lead=SYNC_ROLL_LEAD, frame_rate=SYNC_ROLL_FRAME_RATE, use_timetag=False):
+        self.lead = lead
+        self.frame_time = 1.0 / frame_rate
+        self.use_timetag = use_timetag
+    
+    def schedule(self, targets, latencies):
+        """Plan (send_at, target, latency) entries ordered by send time, and the start instant"""
+        latencies = [latencies.get(target[:2]) or 0.0 for target in targets]
+        start_at = time.perf_counter() + self.lead + max(latencies, default=0.0)
+        plan = sorted(
+            ((start_at - latency, target, latency) for target, latency in zip(targets, latencies)),
+            key=lambda entry: entry[0]
+        )
+        return start_at, plan
+    
+    def start(self, transport, targets, latencies):
+        """Dispatch the start command to every target and return a SyncRollResult
+        
+        latencies maps (ip, port) to the one-way latency in seconds.
+        """
+        start_at, plan = self.schedule(targets, latencies)
+        dgram = CONSTANT_DGRAMS[(OSC_RECORDING_COMMAND, 1)]
+        if self.use_timetag:
+            dgram = build_bundle_dgram([dgram], time.time() + (start_at - time.perf_counter()))
+        senders = [transport.get_sender(*target[:2]) for _, target, _ in plan]
+        
+        results = []
+        arrivals = []
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(DISPATCH_SWITCH_INTERVAL)
+        try:
+            for (send_at, target, latency), sender in zip(plan, senders):
+                wait_until(send_at)
+                sent = time.perf_counter()
+                success = sender.send_dgram(dgram)
+                done = time.perf_counter()
+                results.append(TargetResult(target, success, done - sent, sent_perf=done))
+                if success:
+                    arrivals.append(done + latency)
+        finally:
+            sys.setswitchinterval(switch_interval)
+        estimated_skew = max(arrivals) - min(arrivals) if arrivals else None
+        return SyncRollResult(results, estimated_skew, self.frame_time)
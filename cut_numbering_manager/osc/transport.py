@@ -0,0 +1,156 @@
+"""
+OSCトランスポートモジュール
+Long-lived OSC transport that reuses one sender per target.
+"""
+
+import threading
+import time
+
+from cut_numbering_manager.config import OSC_FANOUT_MAX_WORKERS
+from cut_numbering_manager.osc.sender import CustomOSCSender
+from cut_numbering_manager.utils.metrics import METRICS
+
+
+class TargetResult:
+    """Outcome of one command sent to one target
+    
+    sent_perf is the perf_counter time the target's send returned.
+    """
+    def __init__(self, target, success=False, latency=None, error=None, sent_perf=None):
+        self.target = target
+        self.success = success
+        self.latency = latency
+        self.error = error
+        self.sent_perf = sent_perf
+
+
+class FanOutResult:
+    """Per-target results of one fanned-out command; true when any target succeeded"""
+    def __init__(self, results):
+        self.results = results
+    
+    def __bool__(self):
+        return any(result.success for result in self.results)
+    
+    @property
+    def all_succeeded(self):
+        """Whether every target succeeded"""
+        return bool(self.results) and all(result.success for result in self.results)
+    
+    @property
+    def first_sent_perf(self):
+        """perf_counter time the first successful target's send returned, or None"""
+        times = [result.sent_perf for result in self.results
+                 if result.success and result.sent_perf is not None]
+        return min(times) if times else None
+
+
+class OSCTransport:
+    """Pool of persistent OSC senders keyed by (ip, port)"""
+    def __init__(self, max_workers=OSC_FANOUT_MAX_WORKERS):
+        self._senders = {}
+        self._lock = threading.Lock()
+        self._max_workers = max_workers
+        self._executor = None
+    
+    def get_sender(self, ip, port):
+        """Get the sender for a target, creating it on first use (timed as a hot-path stage)"""
+        started = METRICS.start()
+        sender = self.lookup_sender(ip, port)
+        METRICS.stop("sender_lookup", started)
+        return sender
+    
+    def lookup_sender(self, ip, port):
+        """Get the sender for a target without recording a sender_lookup sample, e.g. for idle pings"""
+        key = (ip, int(port))
+        with self._lock:
+            sender = self._senders.get(key)
+            if sender is None or sender.closed:
+                sender = CustomOSCSender(*key)
+                self._senders[key] = sender
+        return sender
+    
+    def retarget(self, ip, port):
+        """Close every sender except the one for the given target"""
+        key = (ip, int(port))
+        with self._lock:
+            for other_key in list(self._senders):
+                if other_key != key:
+                    self._senders.pop(other_key).close()
+        return self.lookup_sender(ip, port)
+    
+    def retain(self, targets):
+        """Close every sender whose (ip, port) is not in targets"""
+        keep = {(ip, int(port)) for ip, port in targets}
+        with self._lock:
+            for key in list(self._senders):
+                if key not in keep:
+                    self._senders.pop(key).close()
+    
+    def fan_out(self, targets, func, *args, concurrent=True):
+        """Call func(target, *args) for every target and collect a FanOutResult
+        
+        With concurrent set, the first target runs on the calling thread and
+        the others on a persistent thread pool, so N targets that each wait
+        on the network take about as long as the slowest one. Without it the
+        targets run back to back, which is faster for sends that never block
+        (a UDP sendto costs less than a thread hand-off).
+        """
+        if not targets:
+            return FanOutResult([])
+        if not concurrent:
+            return FanOutResult([self._run_target(target, func, args) for target in targets])
+        futures = []
+        if len(targets) > 1:
+            executor = self._get_executor()
+            futures = [executor.submit(self._run_target, target, func, args) for target in targets[1:]]
+        results = [self._run_target(targets[0], func, args)]
+        results.extend(future.result() for future in futures)
+        return FanOutResult(results)
+    
+    def _get_executor(self):
+        """Thread pool for fan-out, created on first use (concurrent.futures is slow to import)"""
+        from concurrent.futures import ThreadPoolExecutor
+        
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self._max_workers, thread_name_prefix="osc-fanout")
+            return self._executor
+    
+    @staticmethod
+    def _run_target(target, func, args):
+        """Run one target's send and time it"""
+        started = time.perf_counter()
+        try:
+            success = bool(func(target, *args))
+            error = None
+        except Exception as e:
+            success = False
+            error = e
+        finished = time.perf_counter()
+        return TargetResult(target, success, finished - started, error, finished)
+    
+    def send_bundle(self, ip, port, messages, timetag=None):
+        """Send (address, value) pairs to a target as one OSC bundle"""
+        return self.get_sender(ip, port).send_bundle(messages, timetag)
+    
+    def prepare(self, ip, port, address, value):
+        """Pre-encode a message on a target's sender ahead of the press that sends it"""
+        self.get_sender(ip, port).prepare(address, value)
+    
+    def open_socket_count(self):
+        """Number of sockets currently held open by the transport"""
+        with self._lock:
+            return sum(1 for sender in self._senders.values() if not sender.closed)
+    
+    def close(self):
+        """Close all pooled senders"""
+        with self._lock:
+            senders = list(self._senders.values())
+            self._senders.clear()
+            executor = self._executor
+            self._executor = None
+        if executor is not None:
+            executor.shutdown(wait=False)
+        for sender in senders:
+            sender.close()
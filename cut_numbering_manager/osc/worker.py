@@ -0,0 +1,85 @@
+"""
+OSC送信ワーカーモジュール
+Background worker that performs OSC sends off the GUI thread.
+"""
+
+import queue
+import threading
+import time
+
+from cut_numbering_manager.config import OSC_QUEUE_SIZE
+from cut_numbering_manager.utils.metrics import METRICS
+
+
+class OSCCommand:
+    """A unit of OSC work queued for the background worker"""
+    def __init__(self, kind, func, args, context=None):
+        self.kind = kind
+        self.func = func
+        self.args = args
+        self.context = context or {}
+        self.enqueued_at = time.monotonic()
+        self.enqueued_perf = time.perf_counter()
+        self.dispatched_perf = None
+        self.started_at = None
+        self.finished_at = None
+        self.sent_at = None
+        self.result = None
+        self.success = False
+        self.error = None
+    
+    @property
+    def latency(self):
+        """Seconds from enqueue to completion, or None while pending"""
+        if self.finished_at is None:
+            return None
+        return self.finished_at - self.enqueued_at
+
+
+class OSCSendWorker:
+    """Runs queued OSC commands on a single background thread"""
+    _STOP = object()
+    
+    def __init__(self, on_finished=None, maxsize=OSC_QUEUE_SIZE):
+        self.on_finished = on_finished
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._thread = threading.Thread(target=self._run, name="osc-send-worker", daemon=True)
+        self._thread.start()
+    
+    def submit(self, kind, func, *args, context=None):
+        """Queue a command without blocking; raises queue.Full when the queue is saturated"""
+        command = OSCCommand(kind, func, args, context)
+        self._queue.put_nowait(command)
+        return command
+    
+    def queue_depth(self):
+        """Number of commands waiting to be sent"""
+        return self._queue.qsize()
+    
+    def stop(self, timeout=1.0):
+        """Finish queued commands and stop the worker thread"""
+        if self._thread.is_alive():
+            self._queue.put(self._STOP)
+            self._thread.join(timeout)
+    
+    def _run(self):
+        """Worker loop"""
+        while True:
+            command = self._queue.get()
+            if command is self._STOP:
+                break
+            command.started_at = time.monotonic()
+            command.sent_at = time.time()
+            started = time.perf_counter()
+            METRICS.record("queue_wait", started - command.enqueued_perf)
+            try:
+                command.result = command.func(*command.args)
+                command.success = bool(command.result)
+            except Exception as e:
+                command.error = e
+                command.success = False
+            command.finished_at = time.monotonic()
+            command.dispatched_perf = time.perf_counter()
+            METRICS.record("dispatch", command.dispatched_perf - started)
+            if self.on_finished:
+                self.on_finished(command)
@@ -0,0 +1,89 @@
+"""
+衝突ガード
+Pre-roll check of the next filename against the output names already in use.
+"""
+
+import os
+
+from cut_numbering_manager.config import COLLISION_GUARD_MODE, RECORDING_EXTENSIONS
+from cut_numbering_manager.utils.filename import generate_filename
+
+
+class CollisionGuard:
+    """In-memory set of used output names for O(1) checks before recording starts
+    
+    The set is fed by the take journal and the recording-folder scanner, so
+    the check itself never touches the disk. Names are kept without a
+    recording file extension, matching what generate_filename produces;
+    any other dotted ending (a "v." version prefix, say) is part of the
+    name. Added and checked names are normalized the same way.
+    """
+    MODE_OFF = "off"
+    MODE_BUMP = "bump"
+    MODE_BLOCK = "block"
+    MODES = (MODE_OFF, MODE_BUMP, MODE_BLOCK)
+    
+    MODE_NAMES = {
+        MODE_OFF: "チェックしない",
+        MODE_BUMP: "バージョンを自動で上げる",
+        MODE_BLOCK: "録画を開始せず警告する"
+    }
+    
+    def __init__(self, mode=COLLISION_GUARD_MODE):
+        self.mode = mode if mode in self.MODES else self.MODE_OFF
+        self._names = set()
+    
+    @staticmethod
+    def normalize(filename):
+        """Strip a trailing recording file extension"""
+        stem, extension = os.path.splitext(filename)
+        if extension.lower() in RECORDING_EXTENSIONS:
+            return stem
+        return filename
+    
+    def set_mode(self, mode):
+        """Change the guard mode"""
+        if mode not in self.MODES:
+            return False
+        self.mode = mode
+        return True
+    
+    def add(self, filename):
+        """Record a name that is in use"""
+        self._names.add(self.normalize(filename))
+    
+    def add_many(self, filenames):
+        """Record several names that are in use"""
+        normalize = self.normalize
+        self._names.update(normalize(filename) for filename in filenames)
+    
+    def discard(self, filename):
+        """Forget a name, e.g. when its file was deleted"""
+        self._names.discard(self.normalize(filename))
+    
+    def __contains__(self, filename):
+        return self.normalize(filename) in self._names
+    
+    def __len__(self):
+        return len(self._names)
+    
+    def check(self, cut_info, element_order=None):
+        """Resolve the filename for the next take
+        
+        Returns (filename, collision). With no collision, or with the guard
+        off, collision is None. In bump mode the cut's version is raised
+        until the name is free and collision is the name that was taken.
+        In block mode filename is None and collision is the taken name.
+        """
+        filename = generate_filename(cut_info, element_order)
+        if self.mode == self.MODE_OFF or filename not in self:
+            return filename, None
+        if self.mode == self.MODE_BLOCK:
+            return None, filename
+        
+        collision = filename
+        with cut_info.batch():
+            while filename in self:
+                cut_info.increment_version()
+                filename = generate_filename(cut_info, element_order)
+        return filename, collision
@@ -0,0 +1,348 @@
+"""
+収録フォルダスキャナ
+Incremental scanner that tracks which takes have landed in the recording folder.
+"""
+
+import ctypes
+import ctypes.util
+import hashlib
+import json
+import os
+import select
+import struct
+import sys
+import threading
+import time
+
+from cut_numbering_manager.config import (
+    RECORDING_SCAN_CACHE_DIR,
+    RECORDING_SCAN_POLL_INTERVAL
+)
+from cut_numbering_manager.models.filename_config import FilenameConfig
+from cut_numbering_manager.utils.event_log import get_logger
+from cut_numbering_manager.utils.filename import FilenameParser, ParsedTake
+
+logger = get_logger("storage")
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0x00000800
+IN_CLOEXEC = 0x00080000
+
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct("iIII")
+
+CACHE_VERSION = 2
+NO_TAKE = ("", "", -1, -1, "")
+FOLDER_MTIME_SETTLE_NS = 2 * 10 ** 9
+
+
+class InotifyWatch:
+    """Minimal inotify watch on one directory through libc (Linux only)"""
+    def __init__(self, path, mask=WATCH_MASK):
+        libc_name = ctypes.util.find_library("c")
+        if not sys.platform.startswith("linux") or libc_name is None:
+            raise OSError("inotify is not available")
+        libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("inotify is not available")
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        wd = libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, os.strerror(errno), path)
+        self._wake_read, self._wake_write = os.pipe()
+    
+    def read(self, timeout):
+        """Wait up to timeout seconds and return a list of (mask, name) events"""
+        readable, _, _ = select.select([self.fd, self._wake_read], [], [], timeout)
+        if self.fd not in readable:
+            return []
+        try:
+            data = os.read(self.fd, 65536)
+        except BlockingIOError:
+            return []
+        events = []
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            _, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+            events.append((mask, name))
+        return events
+    
+    def wake(self):
+        """Interrupt a blocking read from another thread"""
+        os.write(self._wake_write, b"\0")
+    
+    def close(self):
+        """Close the inotify descriptor"""
+        if self.fd >= 0:
+            os.close(self.fd)
+            os.close(self._wake_read)
+            os.close(self._wake_write)
+            self.fd = -1
+
+
+def default_cache_path(folder):
+    """Cache file for a recording folder under RECORDING_SCAN_CACHE_DIR"""
+    digest = hashlib.sha1(os.path.abspath(folder).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(RECORDING_SCAN_CACHE_DIR, f"{digest}.json")
+
+
+class RecordingFolderScanner:
+    """Keeps the set of takes present in a recording folder up to date
+    
+    Every file is cached on disk as (inode, size, mtime) plus its parsed
+    take, so a rescan only re-parses files whose stat changed. The first
+    pass uses os.scandir; after that the folder is watched with inotify
+    and each event touches only the file it names. Where inotify is not
+    available the folder is rescanned every poll_interval seconds.
+    The folder's own mtime is cached too: while it is unchanged (and old
+    enough not to hide a same-tick change) no file can have been added or
+    removed, so a rescan or a restart skips the per-file stat entirely.
+    on_added and on_removed receive lists of ParsedTake and are called on
+    the scanner thread.
+    """
+    def __init__(self, folder, filename_config=None, element_order=None, on_added=None,
+                 on_removed=None, cache_path=None, poll_interval=RECORDING_SCAN_POLL_INTERVAL,
+                 use_inotify=True, suffixes=()):
+        if filename_config is None:
+            filename_config = FilenameConfig()
+        if element_order is None:
+            element_order = filename_config.get_element_order()
+        self.folder = folder
+        self.suffixes = tuple(suffixes)
+        self.parser = FilenameParser(element_order, filename_config.get_all_prefixes(),
+                                     suffixes=self.suffixes)
+        self.on_added = on_added
+        self.on_removed = on_removed
+        self.cache_path = cache_path if cache_path is not None else default_cache_path(folder)
+        self.poll_interval = poll_interval
+        self.use_inotify = use_inotify
+        self.mode = None
+        self._entries = {}
+        self._folder_key = None
+        self._takes = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._watch = None
+    
+    @property
+    def running(self):
+        """Whether the watcher thread is alive"""
+        return self._thread is not None and self._thread.is_alive()
+    
+    def takes(self):
+        """Snapshot of the known takes keyed by filename"""
+        with self._lock:
+            return dict(self._takes)
+    
+    def load_cache(self):
+        """Load cached entries; entries parsed with another pattern are parsed again"""
+        try:
+            with open(self.cache_path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return 0
+        if data.get("version") != CACHE_VERSION or data.get("folder") != os.path.abspath(self.folder):
+            return 0
+        try:
+            names = data["names"]
+            keys = zip(data["inodes"], data["sizes"], data["mtimes"])
+            if data.get("pattern") == self.parser.pattern.pattern:
+                takes = map(ParsedTake._make, zip(data["parts"], data["scenes"], data["cuts"],
+                                                  data["versions"], names))
+                takes = (take if take.cut_number >= 0 else None for take in takes)
+            else:
+                takes = map(self.parser.parse, names)
+            self._entries = dict(zip(names, zip(keys, takes)))
+        except (KeyError, TypeError, ValueError):
+            self._entries = {}
+            return 0
+        folder_key = data.get("folder_key")
+        self._folder_key = tuple(folder_key) if folder_key else None
+        return len(self._entries)
+    
+    def save_cache(self):
+        """Write the entry cache atomically, one JSON array per column"""
+        names = list(self._entries)
+        keys = [self._entries[name][0] for name in names]
+        takes = [self._entries[name][1] or NO_TAKE for name in names]
+        data = {
+            "version": CACHE_VERSION,
+            "folder": os.path.abspath(self.folder),
+            "pattern": self.parser.pattern.pattern,
+            "folder_key": self._folder_key,
+            "names": names,
+            "inodes": [key[0] for key in keys],
+            "sizes": [key[1] for key in keys],
+            "mtimes": [key[2] for key in keys],
+            "parts": [take[0] for take in takes],
+            "scenes": [take[1] for take in takes],
+            "cuts": [take[2] for take in takes],
+            "versions": [take[3] for take in takes]
+        }
+        directory = os.path.dirname(self.cache_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = self.cache_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(data, separators=(",", ":")))
+        os.replace(temp_path, self.cache_path)
+    
+    def scan(self):
+        """Full pass over the folder; returns (added, removed) lists of ParsedTake"""
+        folder_stat = os.stat(self.folder)
+        folder_key = (folder_stat.st_ino, folder_stat.st_mtime_ns)
+        if folder_key == self._folder_key:
+            entries = self._entries
+        else:
+            entries = self._scan_entries()
+            settled = folder_stat.st_mtime_ns < int(time.time() * 10 ** 9) - FOLDER_MTIME_SETTLE_NS
+            self._folder_key = folder_key if settled else None
+        
+        takes = {name: take for name, (_, take) in entries.items() if take is not None}
+        with self._lock:
+            added = [take for name, take in takes.items() if name not in self._takes]
+            removed = [take for name, take in self._takes.items() if name not in takes]
+            self._takes = takes
+        return added, removed
+    
+    def _scan_entries(self):
+        """Stat every file with os.scandir, re-parsing only files whose stat changed"""
+        old_entries = self._entries
+        entries = {}
+        parse = self.parser.parse
+        with os.scandir(self.folder) as listing:
+            for entry in listing:
+                try:
+                    if not entry.is_file():
+                        continue
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                key = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+                cached = old_entries.get(entry.name)
+                if cached is not None and cached[0] == key:
+                    entries[entry.name] = cached
+                else:
+                    entries[entry.name] = (key, parse(entry.name))
+        self._entries = entries
+        return entries
+    
+    def refresh(self, name):
+        """Re-stat one file; returns (added, removed) lists of ParsedTake"""
+        path = os.path.join(self.folder, name)
+        try:
+            stat = os.stat(path)
+            exists = os.path.isfile(path)
+        except OSError:
+            exists = False
+        
+        if not exists:
+            self._entries.pop(name, None)
+            with self._lock:
+                take = self._takes.pop(name, None)
+            return [], ([] if take is None else [take])
+        
+        key = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        cached = self._entries.get(name)
+        take = cached[1] if cached is not None else self.parser.parse(name)
+        self._entries[name] = (key, take)
+        if take is None:
+            return [], []
+        with self._lock:
+            if name in self._takes:
+                return [], []
+            self._takes[name] = take
+        return [take], []
+    
+    def start(self):
+        """Load the cache and start scanning and watching on a background thread"""
+        self.load_cache()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="recording-folder-scanner", daemon=True)
+        self._thread.start()
+    
+    def stop(self, timeout=1.0):
+        """Stop watching and save the cache; returns whether the thread exited within timeout"""
+        self._stop_event.set()
+        watch = self._watch
+        if watch is not None:
+            try:
+                watch.wake()
+            except OSError:
+                pass
+        if self._thread is not None:
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                return False
+            self._thread = None
+        return True
+    
+    def _notify(self, added, removed):
+        """Deliver changes to the callbacks"""
+        if added and self.on_added:
+            self.on_added(added)
+        if removed and self.on_removed:
+            self.on_removed(removed)
+    
+    def _run(self):
+        """Initial scan, then inotify or polling until stopped"""
+        if self.use_inotify and sys.platform.startswith("linux"):
+            try:
+                self._watch = InotifyWatch(self.folder)
+                self.mode = "inotify"
+            except (OSError, AttributeError, TypeError) as e:
+                logger.warning("inotifyを使用できません。ポーリングに切り替えます: %s", e)
+                self._watch = None
+        if self._watch is None:
+            self.mode = "polling"
+        
+        try:
+            self._notify(*self.scan())
+            self.save_cache()
+            while not self._stop_event.is_set():
+                if self._watch is not None:
+                    self._process_events(self._watch.read(self.poll_interval))
+                elif not self._stop_event.wait(self.poll_interval):
+                    self._notify(*self.scan())
+        except OSError as e:
+            logger.error("エラー: %s", e)
+        finally:
+            if self._watch is not None:
+                self._watch.close()
+                self._watch = None
+            try:
+                self.save_cache()
+            except OSError as e:
+                logger.error("エラー: %s", e)
+    
+    def _process_events(self, events):
+        """Apply a batch of inotify events"""
+        if not events:
+            return
+        added = []
+        removed = []
+        for mask, name in events:
+            if mask & IN_Q_OVERFLOW:
+                self._notify(*self.scan())
+                continue
+            if mask & IN_ISDIR or not name:
+                continue
+            file_added, file_removed = self.refresh(name)
+            added.extend(file_added)
+            removed.extend(file_removed)
+        self._notify(added, removed)
@@ -0,0 +1,101 @@
+"""
+ショットリスト読み込み
+Streaming readers for shot lists in CSV, TSV and (with openpyxl) XLSX.
+"""
+
+import csv
+import os
+import re
+
+from cut_numbering_manager.models.filename_config import FilenameConfig
+from cut_numbering_manager.models.shot_list import ShotList
+from cut_numbering_manager.utils.event_log import get_logger
+
+logger = get_logger("storage")
+
+SHOT_LIST_EXTENSIONS = (".csv", ".tsv", ".txt", ".xlsx")
+
+# First cells that mark a header row
+HEADER_CELLS = {FilenameConfig.PART, "パート", "パート名"}
+
+# A cut cell may carry a prefix ("C012", "カット12"); inserts like "12A" have no cut number
+CUT_CELL = re.compile(r"^\D*?(\d+)$")
+
+
+def iter_csv_cells(path, delimiter=None):
+    """Yield the cell lists of a CSV or TSV file one row at a time
+    
+    The delimiter is a tab for .tsv and .txt files and a comma otherwise.
+    A UTF-8 byte-order mark, as written by spreadsheet exports, is skipped.
+    """
+    if delimiter is None:
+        delimiter = "\t" if path.lower().endswith((".tsv", ".txt")) else ","
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        yield from csv.reader(f, delimiter=delimiter)
+
+
+def iter_xlsx_cells(path):
+    """Yield the cell lists of the first worksheet of an XLSX file one row at a time
+    
+    openpyxl is imported only here; its read-only mode streams the sheet
+    instead of loading the whole workbook.
+    """
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ImportError("XLSX形式のショットリストには openpyxl が必要です (pip install openpyxl)")
+    
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        for values in workbook.worksheets[0].iter_rows(values_only=True):
+            yield [format_xlsx_value(value) for value in values]
+    finally:
+        workbook.close()
+
+
+def format_xlsx_value(value):
+    """Cell text of a worksheet value; whole-number floats lose their ".0" """
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def iter_cells(path):
+    """Yield the cell lists of a shot list file, choosing the reader by extension"""
+    if path.lower().endswith(".xlsx"):
+        return iter_xlsx_cells(path)
+    return iter_csv_cells(path)
+
+
+def parse_cut_cell(cell):
+    """Cut number in a cut cell, or None"""
+    match = CUT_CELL.match(cell.strip())
+    if match is None:
+        return None
+    return int(match.group(1))
+
+
+def read_shot_list(path, shot_list=None):
+    """Stream a part, scene, cut table into a ShotList and return it
+    
+    A first row whose first cell is a part column heading is skipped, as
+    are empty rows. Rows without a usable cut number are counted in
+    shot_list.skipped. Columns after the cut are ignored.
+    """
+    if shot_list is None:
+        shot_list = ShotList(os.path.basename(path))
+    append = shot_list.append
+    for line_number, cells in enumerate(iter_cells(path), 1):
+        if not cells or not any(cell.strip() for cell in cells):
+            continue
+        if line_number == 1 and cells[0].strip().lower() in HEADER_CELLS:
+            continue
+        cut_number = parse_cut_cell(cells[2]) if len(cells) > 2 else None
+        if cut_number is None:
+            shot_list.skipped += 1
+            logger.debug("ショットリスト %d 行目を読み飛ばしました: %s", line_number, cells)
+            continue
+        append(cells[0].strip(), cells[1].strip(), cut_number)
+    return shot_list
@@ -0,0 +1,67 @@
+"""
+テイクインデックス
+Index of the highest cut and version already used per part and scene.
+"""
+
+from cut_numbering_manager.config import DEFAULT_CUT_NUMBER, DEFAULT_VERSION
+
+_MISSING = object()
+
+
+class TakeIndex:
+    """Next free cut and version lookups per (part, scene)
+
+    Lookups hit an in-memory cache first. A miss asks the take journal,
+    whose covering index answers MAX() in O(log n), and the answer is
+    cached. New takes update the cache incrementally through add(), so
+    nothing is ever rescanned.
+    """
+    def __init__(self, journal=None):
+        self.journal = journal
+        self._max_cut = {}
+        self._max_version = {}
+    
+    def add(self, part_name, scene_name, cut_number, version):
+        """Record a take that has been rolled"""
+        scene_key = (part_name, scene_name)
+        max_cut = self._lookup_cut(scene_key)
+        if max_cut is None or cut_number > max_cut:
+            self._max_cut[scene_key] = cut_number
+        cut_key = (part_name, scene_name, cut_number)
+        max_version = self._lookup_version(cut_key)
+        if max_version is None or version > max_version:
+            self._max_version[cut_key] = version
+    
+    def add_take(self, take):
+        """Record a take given as a journal-style dict"""
+        self.add(take["part_name"], take["scene_name"], take["cut_number"], take["version"])
+    
+    def max_cut(self, part_name, scene_name):
+        """Highest cut used in a part and scene, or None"""
+        return self._lookup_cut((part_name, scene_name))
+    
+    def next_cut(self, part_name, scene_name):
+        """Next free cut number in a part and scene"""
+        max_cut = self._lookup_cut((part_name, scene_name))
+        return DEFAULT_CUT_NUMBER if max_cut is None else max_cut + 1
+    
+    def next_version(self, part_name, scene_name, cut_number):
+        """Next free version of a cut"""
+        max_version = self._lookup_version((part_name, scene_name, cut_number))
+        return DEFAULT_VERSION if max_version is None else max_version + 1
+    
+    def _lookup_cut(self, key):
+        """Cached highest cut for (part, scene), loading it from the journal on a miss"""
+        value = self._max_cut.get(key, _MISSING)
+        if value is _MISSING:
+            value = self.journal.max_cut(*key) if self.journal is not None else None
+            self._max_cut[key] = value
+        return value
+    
+    def _lookup_version(self, key):
+        """Cached highest version for (part, scene, cut), loading it from the journal on a miss"""
+        value = self._max_version.get(key, _MISSING)
+        if value is _MISSING:
+            value = self.journal.max_version(*key) if self.journal is not None else None
+            self._max_version[key] = value
+        return value
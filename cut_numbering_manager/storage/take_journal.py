@@ -0,0 +1,225 @@
+"""
+テイクジャーナル
+Crash-safe append-only take journal backed by SQLite in WAL mode.
+"""
+
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+from cut_numbering_manager.config import (
+    JOURNAL_PATH,
+    JOURNAL_BATCH_SIZE,
+    JOURNAL_FLUSH_INTERVAL
+)
+from cut_numbering_manager.utils.event_log import get_logger
+
+logger = get_logger("storage")
+
+TAKE_COLUMNS = (
+    "event", "filename", "part_name", "scene_name", "cut_number", "version",
+    "sent_at", "latency", "success", "error", "recorded_at"
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS takes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    event TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    part_name TEXT NOT NULL,
+    scene_name TEXT NOT NULL,
+    cut_number INTEGER NOT NULL,
+    version INTEGER NOT NULL,
+    sent_at REAL,
+    latency REAL,
+    success INTEGER NOT NULL,
+    error TEXT,
+    recorded_at REAL NOT NULL
+)
+"""
+
+TAKE_INDEX_SCHEMA = """
+CREATE INDEX IF NOT EXISTS takes_by_name
+ON takes (event, success, part_name, scene_name, cut_number, version)
+"""
+
+
+def connect(path):
+    """Open a journal connection in WAL mode and make sure the schema exists"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    connection = sqlite3.connect(path, check_same_thread=False)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.execute(SCHEMA)
+    connection.execute(TAKE_INDEX_SCHEMA)
+    connection.commit()
+    return connection
+
+
+class TakeJournal:
+    """Append-only take journal whose inserts are batched on a background thread"""
+    EVENT_START = "start"
+    EVENT_STOP = "stop"
+    
+    _STOP = object()
+    
+    def __init__(self, path=JOURNAL_PATH, batch_size=JOURNAL_BATCH_SIZE,
+                 flush_interval=JOURNAL_FLUSH_INTERVAL):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue()
+        self._reader = connect(path)
+        self._writer = connect(path)
+        self._thread = threading.Thread(target=self._run, name="take-journal", daemon=True)
+        self._thread.start()
+    
+    def record(self, event, take, sent_at=None, latency=None, success=True, error=None):
+        """Queue a take record; take is a dict with filename, part_name, scene_name, cut_number and version"""
+        self._queue.put((
+            event,
+            take["filename"],
+            take["part_name"],
+            take["scene_name"],
+            int(take["cut_number"]),
+            int(take["version"]),
+            sent_at,
+            latency,
+            1 if success else 0,
+            None if error is None else str(error),
+            time.time()
+        ))
+    
+    def last_take(self):
+        """Get the most recent take record as a dict, or None for an empty journal"""
+        row = self._reader.execute(
+            f"SELECT {', '.join(TAKE_COLUMNS)} FROM takes ORDER BY id DESC LIMIT 1"
+        ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(TAKE_COLUMNS, row))
+    
+    def restore(self, cut_info):
+        """Restore the numbering state that follows the last journaled take
+
+        After a successful stop the next take is the next free cut of that
+        part and scene. If the last record is a start, the app went down
+        mid-take, so the next take is the next free version of that cut.
+        Returns the record used, or None.
+        """
+        take = self.last_take()
+        if take is None:
+            return None
+        part_name, scene_name = take["part_name"], take["scene_name"]
+        with cut_info.batch():
+            cut_info.part_name = part_name
+            cut_info.scene_name = scene_name
+            cut_info.cut_number = take["cut_number"]
+            cut_info.version = take["version"]
+            if take["event"] == self.EVENT_STOP and take["success"]:
+                cut_info.cut_number = max(take["cut_number"], self.max_cut(part_name, scene_name) or 0)
+                cut_info.increment_cut()
+            elif take["event"] == self.EVENT_START and take["success"]:
+                cut_info.increment_version(
+                    (self.max_version(part_name, scene_name, take["cut_number"]) or 0) + 1)
+        return take
+    
+    def max_cut(self, part_name, scene_name):
+        """Highest successfully started cut for a part and scene, or None"""
+        return self._reader.execute(
+            "SELECT MAX(cut_number) FROM takes WHERE event = ? AND success = 1 "
+            "AND part_name = ? AND scene_name = ?",
+            (self.EVENT_START, part_name, scene_name)
+        ).fetchone()[0]
+    
+    def max_version(self, part_name, scene_name, cut_number):
+        """Highest successfully started version of a cut, or None"""
+        return self._reader.execute(
+            "SELECT MAX(version) FROM takes WHERE event = ? AND success = 1 "
+            "AND part_name = ? AND scene_name = ? AND cut_number = ?",
+            (self.EVENT_START, part_name, scene_name, int(cut_number))
+        ).fetchone()[0]
+    
+    def started_cuts(self):
+        """Set of (part, scene, cut) with a successfully started take, in one query
+        
+        The query runs on its own connection, so it can be made from any
+        thread while the GUI keeps using the shared reader.
+        """
+        connection = connect(self.path)
+        try:
+            return set(connection.execute(
+                "SELECT DISTINCT part_name, scene_name, cut_number FROM takes "
+                "WHERE event = ? AND success = 1",
+                (self.EVENT_START,)
+            ))
+        finally:
+            connection.close()
+    
+    def iter_filenames(self):
+        """Yield every filename that was successfully started"""
+        cursor = self._reader.execute(
+            "SELECT DISTINCT filename FROM takes WHERE event = ? AND success = 1",
+            (self.EVENT_START,)
+        )
+        for (filename,) in cursor:
+            yield filename
+    
+    def count(self):
+        """Number of records written so far"""
+        return self._reader.execute("SELECT COUNT(*) FROM takes").fetchone()[0]
+    
+    def flush(self):
+        """Block until every queued record has been written"""
+        self._queue.join()
+    
+    def close(self):
+        """Write pending records and close the journal"""
+        if self._thread.is_alive():
+            self._queue.put(self._STOP)
+            self._thread.join()
+        self._reader.close()
+    
+    def _run(self):
+        """Writer loop: collect records into batches and commit each batch once"""
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            batch = []
+            done = 1
+            if item is self._STOP:
+                stopping = True
+            else:
+                batch.append(item)
+            deadline = time.monotonic() + self.flush_interval
+            while not stopping and len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                done += 1
+                if item is self._STOP:
+                    stopping = True
+                else:
+                    batch.append(item)
+            try:
+                if batch:
+                    self._writer.executemany(
+                        f"INSERT INTO takes ({', '.join(TAKE_COLUMNS)}) "
+                        f"VALUES ({', '.join('?' * len(TAKE_COLUMNS))})",
+                        batch
+                    )
+                    self._writer.commit()
+            except sqlite3.Error as e:
+                logger.error("ジャーナル書き込みエラー: %s", e)
+            finally:
+                for _ in range(done):
+                    self._queue.task_done()
+        self._writer.close()
@@ -6,6 +6,8 @@ Panel for displaying cut information in a clapperboard-like UI.
 from PyQt5.QtWidgets import (QGroupBox, QVBoxLayout, QHBoxLayout, QLabel, QWidget, QGridLayout, QSizePolicy)
 from PyQt5.QtCore import Qt, QTimer, QPropertyAnimation, QEasingCurve, QRect, QEvent
 from PyQt5.QtGui import QFont, QColor
+from cut_numbering_manager.config import CLAPPERBOARD_RESIZE_DEBOUNCE_MS
+from cut_numbering_manager.models.cut_info import CutInfo
 
 
 class ClapperboardPanel(QGroupBox):
@@ -26,24 +28,21 @@ class ClapperboardPanel(QGroupBox):
             'version_title': 16,
             'version_value': 42
         }
+        self._font_cache = {}
+        self._applied_font_sizes = None
+        self._resize_timer = QTimer(self)
+        self._resize_timer.setSingleShot(True)
+        self._resize_timer.setInterval(CLAPPERBOARD_RESIZE_DEBOUNCE_MS)
+        self._resize_timer.timeout.connect(self.update_font_sizes)
         self._init_ui()
         self.installEventFilter(self)
+        self.cut_info.subscribe(self._on_model_changed)
     
     def _init_ui(self):
         """Initialize the UI components"""
         main_layout = QVBoxLayout()
-        self.setStyleSheet("""
-            QGroupBox {
-                background-color: #1a1a1a;
-                border: 1px solid #3a3a3a;
-                border-radius: 5px;
-                margin-top: 0px;
-            }
-            QLabel {
-                color: #ffffff;
-                font-family: 'Inter', 'Noto Sans', 'Arial', 'Helvetica', sans-serif;
-            }
-        """)
+        self.setObjectName("clapperboard")
+        self.setProperty("recording", False)
         
         grid_layout = QGridLayout()
         grid_layout.setSpacing(15)
@@ -53,12 +52,11 @@ class ClapperboardPanel(QGroupBox):
         part_layout.setContentsMargins(10, 10, 10, 10)
         
         self.part_title = QLabel("パート")
-        self.part_title.setStyleSheet("color: #ffd900; font-size: 16px; font-weight: bold;")
+        self.part_title.setStyleSheet("color: #ffd900;")
         self.part_title.setAlignment(Qt.AlignLeft | Qt.AlignTop)
         part_layout.addWidget(self.part_title)
         
         self.part_value = QLabel(self.cut_info.part_name)
-        self.part_value.setStyleSheet("font-size: 42px; font-weight: bold;")
         self.part_value.setAlignment(Qt.AlignRight | Qt.AlignBottom)
         self.part_value.setWordWrap(False)
         self.part_value.setSizePolicy(QSizePolicy.Preferred, QSizePolicy.Preferred)
@@ -69,12 +67,11 @@ class ClapperboardPanel(QGroupBox):
         scene_layout.setContentsMargins(10, 10, 10, 10)
         
         self.scene_title = QLabel("シーン")
-        self.scene_title.setStyleSheet("color: #ffd900; font-size: 16px; font-weight: bold;")
+        self.scene_title.setStyleSheet("color: #ffd900;")
         self.scene_title.setAlignment(Qt.AlignLeft | Qt.AlignTop)
         scene_layout.addWidget(self.scene_title)
         
         self.scene_value = QLabel(self.cut_info.scene_name)
-        self.scene_value.setStyleSheet("font-size: 42px; font-weight: bold;")
         self.scene_value.setAlignment(Qt.AlignRight | Qt.AlignBottom)
         self.scene_value.setWordWrap(False)
         self.scene_value.setSizePolicy(QSizePolicy.Preferred, QSizePolicy.Preferred)
@@ -85,12 +82,11 @@ class ClapperboardPanel(QGroupBox):
         cut_layout.setContentsMargins(10, 10, 10, 10)
         
         self.cut_title = QLabel("カット")
-        self.cut_title.setStyleSheet("color: #ffd900; font-size: 16px; font-weight: bold;")
+        self.cut_title.setStyleSheet("color: #ffd900;")
         self.cut_title.setAlignment(Qt.AlignLeft | Qt.AlignTop)
         cut_layout.addWidget(self.cut_title)
         
         self.cut_value = QLabel(self.cut_info.get_formatted_cut_number())
-        self.cut_value.setStyleSheet("font-size: 84px; font-weight: bold;")
         self.cut_value.setAlignment(Qt.AlignRight | Qt.AlignBottom)
         self.cut_value.setWordWrap(False)
         self.cut_value.setSizePolicy(QSizePolicy.Preferred, QSizePolicy.Preferred)
@@ -101,12 +97,11 @@ class ClapperboardPanel(QGroupBox):
         version_layout.setContentsMargins(10, 10, 10, 10)
         
         self.version_title = QLabel("バージョン")
-        self.version_title.setStyleSheet("color: #ffd900; font-size: 16px; font-weight: bold;")
+        self.version_title.setStyleSheet("color: #ffd900;")
         self.version_title.setAlignment(Qt.AlignLeft | Qt.AlignTop)
         version_layout.addWidget(self.version_title)
         
         self.version_value = QLabel(self.cut_info.get_formatted_version())
-        self.version_value.setStyleSheet("font-size: 42px; font-weight: bold;")
         self.version_value.setAlignment(Qt.AlignRight | Qt.AlignBottom)
         self.version_value.setWordWrap(False)
         self.version_value.setSizePolicy(QSizePolicy.Preferred, QSizePolicy.Preferred)
@@ -130,11 +125,22 @@ class ClapperboardPanel(QGroupBox):
         self.scene_value.setText(self.cut_info.scene_name)
         self.cut_value.setText(self.cut_info.get_formatted_cut_number())
         self.version_value.setText(self.cut_info.get_formatted_version())
-        
+    
+    def _on_model_changed(self, fields):
+        """Update only the labels whose model fields changed"""
+        if CutInfo.PART_NAME in fields:
+            self.part_value.setText(self.cut_info.part_name)
+        if CutInfo.SCENE_NAME in fields:
+            self.scene_value.setText(self.cut_info.scene_name)
+        if CutInfo.CUT_NUMBER in fields or CutInfo.FILENAME_CONFIG in fields:
+            self.cut_value.setText(self.cut_info.get_formatted_cut_number())
+        if CutInfo.VERSION in fields or CutInfo.FILENAME_CONFIG in fields:
+            self.version_value.setText(self.cut_info.get_formatted_version())
+    
     def eventFilter(self, obj, event):
         """Filter events to handle resize events"""
         if obj is self and event.type() == QEvent.Resize:
-            self.update_font_sizes()
+            self._resize_timer.start()
         return super().eventFilter(obj, event)
     
     def update_font_sizes(self):
@@ -164,14 +170,34 @@ class ClapperboardPanel(QGroupBox):
         version_title_size = max(int(self.base_font_sizes['version_title'] * scale), min_title_size)
         version_value_size = max(int(self.base_font_sizes['version_value'] * scale), min_value_size)
         
-        self.part_title.setStyleSheet(f"color: #ffd900; font-size: {part_title_size}px; font-weight: bold;")
-        self.part_value.setStyleSheet(f"font-size: {part_value_size}px; font-weight: bold;")
-        self.scene_title.setStyleSheet(f"color: #ffd900; font-size: {scene_title_size}px; font-weight: bold;")
-        self.scene_value.setStyleSheet(f"font-size: {scene_value_size}px; font-weight: bold;")
-        self.cut_title.setStyleSheet(f"color: #ffd900; font-size: {cut_title_size}px; font-weight: bold;")
-        self.cut_value.setStyleSheet(f"font-size: {cut_value_size}px; font-weight: bold;")
-        self.version_title.setStyleSheet(f"color: #ffd900; font-size: {version_title_size}px; font-weight: bold;")
-        self.version_value.setStyleSheet(f"font-size: {version_value_size}px; font-weight: bold;")
+        sizes = (
+            part_title_size, part_value_size,
+            scene_title_size, scene_value_size,
+            cut_title_size, cut_value_size,
+            version_title_size, version_value_size
+        )
+        if sizes == self._applied_font_sizes:
+            return
+        self._applied_font_sizes = sizes
+        
+        labels = (
+            self.part_title, self.part_value,
+            self.scene_title, self.scene_value,
+            self.cut_title, self.cut_value,
+            self.version_title, self.version_value
+        )
+        for label, size in zip(labels, sizes):
+            label.setFont(self._get_font(size))
+    
+    def _get_font(self, size):
+        """Get a bold font of the given pixel size, cached by size"""
+        font = self._font_cache.get(size)
+        if font is None:
+            font = QFont()
+            font.setPixelSize(size)
+            font.setBold(True)
+            self._font_cache[size] = font
+        return font
     
     def set_recording(self, is_recording):
         """Set recording state and update UI accordingly"""
@@ -180,29 +206,6 @@ class ClapperboardPanel(QGroupBox):
         if hasattr(self, 'breathing_animation'):
             self.breathing_animation.stop()
         
-        if is_recording:
-            self.setStyleSheet("""
-                QGroupBox {
-                    background-color: #1a1a1a;
-                    border: 2px solid #ffd900;
-                    border-radius: 5px;
-                    margin-top: 0px;
-                }
-                QLabel {
-                    color: #ffffff;
-                    font-family: 'Inter', 'Noto Sans', 'Arial', 'Helvetica', sans-serif;
-                }
-            """)
-        else:
-            self.setStyleSheet("""
-                QGroupBox {
-                    background-color: #1a1a1a;
-                    border: 1px solid #3a3a3a;
-                    border-radius: 5px;
-                    margin-top: 0px;
-                }
-                QLabel {
-                    color: #ffffff;
-                    font-family: 'Inter', 'Noto Sans', 'Arial', 'Helvetica', sans-serif;
-                }
-            """)
+        self.setProperty("recording", is_recording)
+        self.style().unpolish(self)
+        self.style().polish(self)
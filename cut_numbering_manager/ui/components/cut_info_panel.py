@@ -10,16 +10,19 @@ from cut_numbering_manager.config import (
     DEFAULT_CUT_NUMBER, 
     DEFAULT_VERSION
 )
+from cut_numbering_manager.models.cut_info import CutInfo
 from cut_numbering_manager.models.filename_config import FilenameConfig
 
 
 class CutInfoPanel(QGroupBox):
     """Panel for cut information input"""
-    def __init__(self, cut_info, callback):
+    def __init__(self, cut_info, take_index=None):
         super().__init__("カット情報")
         self.cut_info = cut_info
-        self.callback = callback
+        self.take_index = take_index
+        self._names_before_edit = None
         self._init_ui()
+        self.cut_info.subscribe(self._on_model_changed)
     
     def _init_ui(self):
         """Initialize the UI components"""
@@ -27,11 +30,13 @@ class CutInfoPanel(QGroupBox):
         
         self.part_input = QLineEdit(self.cut_info.part_name)
         layout.addRow("パート名:", self.part_input)
-        self.part_input.textChanged.connect(self._on_input_changed)
+        self.part_input.textChanged.connect(self._on_part_changed)
+        self.part_input.editingFinished.connect(self._on_name_edit_finished)
         
         self.scene_input = QLineEdit(self.cut_info.scene_name)
         layout.addRow("シーン名:", self.scene_input)
-        self.scene_input.textChanged.connect(self._on_input_changed)
+        self.scene_input.textChanged.connect(self._on_scene_changed)
+        self.scene_input.editingFinished.connect(self._on_name_edit_finished)
         
         cut_container = QWidget()
         cut_layout = QHBoxLayout(cut_container)
@@ -40,13 +45,13 @@ class CutInfoPanel(QGroupBox):
         self.cut_prefix_input = QLineEdit(self.cut_info.filename_config.get_prefix(FilenameConfig.CUT))
         self.cut_prefix_input.setPlaceholderText("接頭辞")
         self.cut_prefix_input.setMaximumWidth(80)
-        self.cut_prefix_input.textChanged.connect(self._on_input_changed)
+        self.cut_prefix_input.textChanged.connect(self._on_cut_prefix_changed)
         cut_layout.addWidget(self.cut_prefix_input)
         
         self.cut_number_input = QSpinBox()
         self.cut_number_input.setRange(1, 9999)
         self.cut_number_input.setValue(self.cut_info.cut_number)
-        self.cut_number_input.valueChanged.connect(self._on_input_changed)
+        self.cut_number_input.valueChanged.connect(self._on_cut_number_changed)
         cut_layout.addWidget(self.cut_number_input)
         
         layout.addRow("カット番号:", cut_container)
@@ -58,13 +63,13 @@ class CutInfoPanel(QGroupBox):
         self.version_prefix_input = QLineEdit(self.cut_info.filename_config.get_prefix(FilenameConfig.VERSION))
         self.version_prefix_input.setPlaceholderText("接頭辞")
         self.version_prefix_input.setMaximumWidth(80)
-        self.version_prefix_input.textChanged.connect(self._on_input_changed)
+        self.version_prefix_input.textChanged.connect(self._on_version_prefix_changed)
         version_layout.addWidget(self.version_prefix_input)
         
         self.version_input = QSpinBox()
         self.version_input.setRange(1, 999)
         self.version_input.setValue(self.cut_info.version)
-        self.version_input.valueChanged.connect(self._on_input_changed)
+        self.version_input.valueChanged.connect(self._on_version_changed)
         version_layout.addWidget(self.version_input)
         
         layout.addRow("バージョン:", version_container)
@@ -75,28 +80,98 @@ class CutInfoPanel(QGroupBox):
         
         self.setLayout(layout)
     
-    def _on_input_changed(self):
-        """Handle input changes and update the model"""
-        self.cut_info.part_name = self.part_input.text()
-        self.cut_info.scene_name = self.scene_input.text()
-        self.cut_info.cut_number = self.cut_number_input.value()
-        self.cut_info.version = self.version_input.value()
-        
-        prefixes = self.cut_info.filename_config.get_all_prefixes().copy()
-        prefixes[FilenameConfig.CUT] = self.cut_prefix_input.text()
-        prefixes[FilenameConfig.VERSION] = self.version_prefix_input.text()
-        self.cut_info.filename_config.set_all_prefixes(prefixes)
+    def _on_part_changed(self, text):
+        """Write the part name to the model"""
+        self._begin_name_edit()
+        self.cut_info.part_name = text
+    
+    def _on_scene_changed(self, text):
+        """Write the scene name to the model"""
+        self._begin_name_edit()
+        self.cut_info.scene_name = text
+    
+    def _begin_name_edit(self):
+        """Remember the part and scene as they were before the operator started typing"""
+        if self._names_before_edit is None:
+            self._names_before_edit = (self.cut_info.part_name, self.cut_info.scene_name)
+    
+    def _on_name_edit_finished(self):
+        """Jump to the next free cut once a part or scene edit is done, if the names really changed
         
-        if self.callback:
-            self.callback()
+        Filling on every keystroke would look up (and overwrite the cut
+        and version for) every prefix of the name being typed.
+        """
+        before, self._names_before_edit = self._names_before_edit, None
+        if before is None or before == (self.cut_info.part_name, self.cut_info.scene_name):
+            return
+        with self.cut_info.batch():
+            self._fill_next_free_cut()
+    
+    def _fill_next_free_cut(self):
+        """Set the cut and version to the next free take of the current part and scene"""
+        if self.take_index is None:
+            return
+        self.cut_info.cut_number = self.take_index.next_cut(self.cut_info.part_name, self.cut_info.scene_name)
+        self.cut_info.version = 1
+    
+    def _on_cut_number_changed(self, value):
+        """Write the cut number to the model"""
+        self.cut_info.cut_number = value
+    
+    def _on_version_changed(self, value):
+        """Write the version to the model"""
+        self.cut_info.version = value
+    
+    def _on_cut_prefix_changed(self, text):
+        """Write the cut prefix to the filename config"""
+        self._set_prefix(FilenameConfig.CUT, text)
+    
+    def _on_version_prefix_changed(self, text):
+        """Write the version prefix to the filename config"""
+        self._set_prefix(FilenameConfig.VERSION, text)
+    
+    def _set_prefix(self, element, prefix):
+        """Set a prefix and notify the model when it actually changed"""
+        config = self.cut_info.filename_config
+        revision = config.revision
+        config.set_prefix(element, prefix)
+        if config.revision != revision:
+            self.cut_info.mark_changed(CutInfo.FILENAME_CONFIG)
+    
+    def _on_model_changed(self, fields):
+        """Update only the inputs whose model fields changed"""
+        if CutInfo.PART_NAME in fields:
+            self._set_text(self.part_input, self.cut_info.part_name)
+        if CutInfo.SCENE_NAME in fields:
+            self._set_text(self.scene_input, self.cut_info.scene_name)
+        if CutInfo.CUT_NUMBER in fields:
+            self._set_value(self.cut_number_input, self.cut_info.cut_number)
+        if CutInfo.VERSION in fields:
+            self._set_value(self.version_input, self.cut_info.version)
+        if CutInfo.FILENAME_CONFIG in fields:
+            config = self.cut_info.filename_config
+            self._set_text(self.cut_prefix_input, config.get_prefix(FilenameConfig.CUT))
+            self._set_text(self.version_prefix_input, config.get_prefix(FilenameConfig.VERSION))
+    
+    @staticmethod
+    def _set_text(widget, text):
+        """Set a line edit's text without re-entering the change handlers"""
+        if widget.text() != text:
+            widget.blockSignals(True)
+            widget.setText(text)
+            widget.blockSignals(False)
+    
+    @staticmethod
+    def _set_value(widget, value):
+        """Set a spin box's value without re-entering the change handlers"""
+        if widget.value() != value:
+            widget.blockSignals(True)
+            widget.setValue(value)
+            widget.blockSignals(False)
     
     def update_ui_from_model(self):
         """Update UI components from the model"""
-        self.part_input.setText(self.cut_info.part_name)
-        self.scene_input.setText(self.cut_info.scene_name)
-        self.cut_number_input.setValue(self.cut_info.cut_number)
-        self.version_input.setValue(self.cut_info.version)
-        
-        prefixes = self.cut_info.filename_config.get_all_prefixes()
-        self.cut_prefix_input.setText(prefixes.get(FilenameConfig.CUT, ""))
-        self.version_prefix_input.setText(prefixes.get(FilenameConfig.VERSION, ""))
+        self._on_model_changed(frozenset((
+            CutInfo.PART_NAME, CutInfo.SCENE_NAME, CutInfo.CUT_NUMBER,
+            CutInfo.VERSION, CutInfo.FILENAME_CONFIG
+        )))
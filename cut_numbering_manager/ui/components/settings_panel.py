@@ -3,12 +3,19 @@
 Panel for application settings.
 """
 
+import os
+
 from PyQt5.QtWidgets import (QGroupBox, QFormLayout, QLineEdit, QSpinBox, QLabel, 
                             QVBoxLayout, QHBoxLayout, QPushButton, QListWidget, 
-                            QListWidgetItem, QWidget, QGridLayout)
-from PyQt5.QtCore import Qt, pyqtSignal
-from cut_numbering_manager.config import DEFAULT_IP, DEFAULT_PORT
+                            QListWidgetItem, QWidget, QGridLayout, QCheckBox,
+                            QFileDialog, QComboBox, QTableWidget, QTableWidgetItem,
+                            QHeaderView, QPlainTextEdit)
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal
+from cut_numbering_manager.config import METRICS_EXPORT_DIR, TRANSPORT_OSC, TRANSPORT_OBS_WEBSOCKET
 from cut_numbering_manager.models.filename_config import FilenameConfig
+from cut_numbering_manager.models.osc_settings import OSCSettings
+from cut_numbering_manager.storage.collision_guard import CollisionGuard
+from cut_numbering_manager.utils.event_log import format_event
 
 
 class SettingsPanel(QWidget):
@@ -16,11 +23,22 @@ class SettingsPanel(QWidget):
     
     filename_order_changed = pyqtSignal(list)
     prefix_changed = pyqtSignal(dict)
+    osc_targets_changed = pyqtSignal(list)
+    transport_changed = pyqtSignal(str)
+    recording_folder_changed = pyqtSignal(str)
     
-    def __init__(self, parent=None):
+    def __init__(self, filename_config=None, osc_settings=None, recording_folder="",
+                 collision_guard=None, event_log=None, metrics=None, queue_depth=None, parent=None):
         super().__init__()
         self.parent = parent
-        self.filename_config = FilenameConfig()
+        self.filename_config = filename_config if filename_config is not None else FilenameConfig()
+        self.osc_settings = osc_settings if osc_settings is not None else OSCSettings()
+        self.recording_folder = recording_folder
+        self.collision_guard = collision_guard if collision_guard is not None else CollisionGuard()
+        self.event_log = event_log
+        self.metrics = metrics
+        self.queue_depth = queue_depth
+        self._shown_log_total = None
         self._init_ui()
     
     def _init_ui(self):
@@ -30,13 +48,23 @@ class SettingsPanel(QWidget):
         osc_group = QGroupBox("OSC設定")
         osc_layout = QFormLayout()
         
-        self.ip_input = QLineEdit(DEFAULT_IP)
-        osc_layout.addRow("IPアドレス:", self.ip_input)
+        self.target_table = QTableWidget(0, 4)
+        self.target_table.setHorizontalHeaderLabels(["有効", "IPアドレス", "ポート", "ファイル名の接尾辞"])
+        self.target_table.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
+        self.target_table.horizontalHeader().setSectionResizeMode(3, QHeaderView.Stretch)
+        self.target_table.verticalHeader().setVisible(False)
+        self.update_target_table()
+        self.target_table.itemChanged.connect(self._on_target_item_changed)
+        osc_layout.addRow("送信先:", self.target_table)
         
-        self.port_input = QSpinBox()
-        self.port_input.setRange(1, 65535)
-        self.port_input.setValue(DEFAULT_PORT)
-        osc_layout.addRow("ポート:", self.port_input)
+        target_buttons = QHBoxLayout()
+        self.add_target_button = QPushButton("送信先を追加")
+        self.add_target_button.clicked.connect(self.add_target)
+        target_buttons.addWidget(self.add_target_button)
+        self.remove_target_button = QPushButton("選択した送信先を削除")
+        self.remove_target_button.clicked.connect(self.remove_target)
+        target_buttons.addWidget(self.remove_target_button)
+        osc_layout.addRow("", target_buttons)
         
         version_note = QLabel("OSC for OBS v2.7.1 (OBS v27.2.4用)")
         version_note.setStyleSheet("font-weight: bold;")
@@ -54,9 +82,64 @@ class SettingsPanel(QWidget):
         format_note.setStyleSheet("color: #555; font-style: italic;")
         osc_layout.addRow("", format_note)
         
+        self.bundle_checkbox = QCheckBox("ファイル名設定と録画開始を1つのOSCバンドルで送信")
+        self.bundle_checkbox.setChecked(self.osc_settings.use_bundle)
+        self.bundle_checkbox.toggled.connect(self._on_osc_settings_changed)
+        osc_layout.addRow("送信方式:", self.bundle_checkbox)
+        
+        self.sync_roll_checkbox = QCheckBox("シンクロール: 全送信先の録画開始を同じ瞬間に揃える")
+        self.sync_roll_checkbox.setToolTip("送信先ごとの遅延をpingで計測し、到着時刻が揃うように録画開始コマンドを送ります")
+        self.sync_roll_checkbox.setChecked(self.osc_settings.sync_roll)
+        self.sync_roll_checkbox.toggled.connect(self._on_osc_settings_changed)
+        osc_layout.addRow("", self.sync_roll_checkbox)
+        
+        self.transport_combo = QComboBox()
+        self.transport_combo.addItem("OSC (OSC for OBS)", TRANSPORT_OSC)
+        self.transport_combo.addItem("OBS WebSocket (obs-websocket 4.9.1)", TRANSPORT_OBS_WEBSOCKET)
+        self.transport_combo.setCurrentIndex(max(0, self.transport_combo.findData(self.osc_settings.transport)))
+        self.transport_combo.currentIndexChanged.connect(self._on_transport_changed)
+        osc_layout.addRow("接続方式:", self.transport_combo)
+        
+        self.websocket_port_input = QSpinBox()
+        self.websocket_port_input.setRange(1, 65535)
+        self.websocket_port_input.setValue(int(self.osc_settings.websocket_port))
+        self.websocket_port_input.valueChanged.connect(self._on_transport_changed)
+        osc_layout.addRow("WebSocketポート:", self.websocket_port_input)
+        
+        self.websocket_password_input = QLineEdit(self.osc_settings.websocket_password)
+        self.websocket_password_input.setEchoMode(QLineEdit.Password)
+        self.websocket_password_input.setPlaceholderText("認証なしの場合は空欄")
+        self.websocket_password_input.editingFinished.connect(self._on_transport_changed)
+        osc_layout.addRow("WebSocketパスワード:", self.websocket_password_input)
+        self._update_transport_inputs()
+        
         osc_group.setLayout(osc_layout)
         main_layout.addWidget(osc_group)
         
+        folder_group = QGroupBox("収録フォルダ")
+        folder_layout = QFormLayout()
+        
+        folder_row = QHBoxLayout()
+        self.folder_input = QLineEdit(self.recording_folder)
+        self.folder_input.setPlaceholderText("OBSの録画出力フォルダ (空欄で監視しない)")
+        self.folder_input.editingFinished.connect(self._on_folder_edited)
+        folder_row.addWidget(self.folder_input)
+        
+        self.folder_button = QPushButton("参照...")
+        self.folder_button.clicked.connect(self.choose_recording_folder)
+        folder_row.addWidget(self.folder_button)
+        folder_layout.addRow("フォルダ:", folder_row)
+        
+        self.collision_combo = QComboBox()
+        for mode in CollisionGuard.MODES:
+            self.collision_combo.addItem(CollisionGuard.MODE_NAMES[mode], mode)
+        self.collision_combo.setCurrentIndex(CollisionGuard.MODES.index(self.collision_guard.mode))
+        self.collision_combo.currentIndexChanged.connect(self._on_collision_mode_changed)
+        folder_layout.addRow("同名ファイル:", self.collision_combo)
+        
+        folder_group.setLayout(folder_layout)
+        main_layout.addWidget(folder_group)
+        
         filename_group = QGroupBox("ファイル名設定")
         filename_layout = QVBoxLayout()
         
@@ -96,8 +179,125 @@ class SettingsPanel(QWidget):
         filename_group.setLayout(filename_layout)
         main_layout.addWidget(filename_group)
         
+        if self.event_log is not None:
+            log_group = QGroupBox(f"送信ログ (直近{self.event_log.capacity}件)")
+            log_layout = QVBoxLayout()
+            
+            self.log_view = QPlainTextEdit()
+            self.log_view.setReadOnly(True)
+            self.log_view.setLineWrapMode(QPlainTextEdit.NoWrap)
+            self.log_view.setStyleSheet("font-family: monospace; font-size: 11px;")
+            log_layout.addWidget(self.log_view)
+            
+            log_buttons = QHBoxLayout()
+            self.log_refresh_button = QPushButton("更新")
+            self.log_refresh_button.clicked.connect(self.update_log_view)
+            log_buttons.addWidget(self.log_refresh_button)
+            self.log_clear_button = QPushButton("クリア")
+            self.log_clear_button.clicked.connect(self.clear_log)
+            log_buttons.addWidget(self.log_clear_button)
+            log_layout.addLayout(log_buttons)
+            
+            log_group.setLayout(log_layout)
+            main_layout.addWidget(log_group)
+        
+        if self.metrics is not None:
+            metrics_group = QGroupBox("レイテンシ計測 (REC/STOPの各段階)")
+            metrics_layout = QVBoxLayout()
+            
+            self.metrics_checkbox = QCheckBox("計測する")
+            self.metrics_checkbox.setChecked(self.metrics.enabled)
+            self.metrics_checkbox.toggled.connect(self.metrics.set_enabled)
+            metrics_layout.addWidget(self.metrics_checkbox)
+            
+            self.metrics_label = QLabel()
+            self.metrics_label.setStyleSheet("font-family: monospace; font-size: 11px;")
+            self.metrics_label.setTextInteractionFlags(Qt.TextSelectableByMouse)
+            metrics_layout.addWidget(self.metrics_label)
+            
+            metrics_buttons = QHBoxLayout()
+            self.metrics_reset_button = QPushButton("リセット")
+            self.metrics_reset_button.clicked.connect(self.reset_metrics)
+            metrics_buttons.addWidget(self.metrics_reset_button)
+            self.metrics_json_button = QPushButton("JSONで書き出し")
+            self.metrics_json_button.clicked.connect(self.export_metrics_json)
+            metrics_buttons.addWidget(self.metrics_json_button)
+            self.metrics_prometheus_button = QPushButton("Prometheus形式で書き出し")
+            self.metrics_prometheus_button.clicked.connect(self.export_metrics_prometheus)
+            metrics_buttons.addWidget(self.metrics_prometheus_button)
+            metrics_layout.addLayout(metrics_buttons)
+            
+            self.metrics_status_label = QLabel()
+            self.metrics_status_label.setStyleSheet("color: #555; font-size: 11px;")
+            metrics_layout.addWidget(self.metrics_status_label)
+            
+            metrics_group.setLayout(metrics_layout)
+            main_layout.addWidget(metrics_group)
+        
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(500)
+        self.refresh_timer.timeout.connect(self.refresh_live_views)
+        
         self.setLayout(main_layout)
     
+    def showEvent(self, event):
+        """Refresh the live views while the panel is visible"""
+        super().showEvent(event)
+        self.refresh_live_views()
+        self.refresh_timer.start()
+    
+    def hideEvent(self, event):
+        """Stop refreshing the live views while the panel is hidden"""
+        super().hideEvent(event)
+        self.refresh_timer.stop()
+    
+    def refresh_live_views(self):
+        """Update the log view, the latency readout and the send queue depth"""
+        if self.event_log is not None:
+            self.update_log_view()
+        if self.metrics is not None:
+            readout = self.metrics.readout()
+            if self.queue_depth is not None:
+                readout += f"\n\n送信キュー: {self.queue_depth()} 件"
+            self.metrics_label.setText(readout)
+    
+    def reset_metrics(self):
+        """Forget every recorded latency"""
+        self.metrics.reset()
+        self.refresh_live_views()
+    
+    def export_metrics_json(self):
+        """Write the latency summary as JSON"""
+        self._export_metrics(self.metrics.export_json, "latency.json")
+    
+    def export_metrics_prometheus(self):
+        """Write the latency summary as a Prometheus text file"""
+        self._export_metrics(self.metrics.export_prometheus, "cut_numbering_manager.prom")
+    
+    def _export_metrics(self, export, filename):
+        """Write an export into the metrics folder and show where it went"""
+        path = os.path.join(METRICS_EXPORT_DIR, filename)
+        try:
+            export(path)
+            self.metrics_status_label.setText(f"書き出しました: {path}")
+        except OSError as e:
+            self.metrics_status_label.setText(f"エラー: {str(e)}")
+    
+    def update_log_view(self):
+        """Show the buffered events when new ones have arrived"""
+        if self.event_log.total == self._shown_log_total:
+            return
+        self._shown_log_total = self.event_log.total
+        self.log_view.setPlainText("\n".join(format_event(record) for record in self.event_log.records()))
+        scrollbar = self.log_view.verticalScrollBar()
+        scrollbar.setValue(scrollbar.maximum())
+    
+    def clear_log(self):
+        """Empty the event buffer and the log view"""
+        self.event_log.clear()
+        self._shown_log_total = None
+        self.update_log_view()
+    
     def update_element_list(self):
         """Update the element list with current order"""
         self.element_list.clear()
@@ -128,7 +328,7 @@ class SettingsPanel(QWidget):
     
     def reset_element_order(self):
         """Reset element order to default"""
-        self.filename_config.element_order = self.filename_config.DEFAULT_ORDER.copy()
+        self.filename_config.reset_element_order()
         self.update_element_list()
         self.emit_order_changed()
     
@@ -138,7 +338,7 @@ class SettingsPanel(QWidget):
     
     def reset_prefixes(self):
         """Reset prefixes to default values"""
-        self.filename_config.prefixes = self.filename_config.DEFAULT_PREFIXES.copy()
+        self.filename_config.reset_prefixes()
         self.emit_prefix_changed()
     
     def emit_order_changed(self):
@@ -149,6 +349,103 @@ class SettingsPanel(QWidget):
         """Emit signal that prefixes have changed"""
         self.prefix_changed.emit(self.filename_config.get_all_prefixes())
     
+    def update_target_table(self):
+        """Fill the target table from the settings model"""
+        self.target_table.blockSignals(True)
+        self.target_table.setRowCount(len(self.osc_settings.targets))
+        for row, target in enumerate(self.osc_settings.targets):
+            enabled_item = QTableWidgetItem()
+            enabled_item.setFlags(Qt.ItemIsUserCheckable | Qt.ItemIsEnabled | Qt.ItemIsSelectable)
+            enabled_item.setCheckState(Qt.Checked if target.enabled else Qt.Unchecked)
+            self.target_table.setItem(row, 0, enabled_item)
+            self.target_table.setItem(row, 1, QTableWidgetItem(target.ip))
+            self.target_table.setItem(row, 2, QTableWidgetItem(str(target.port)))
+            self.target_table.setItem(row, 3, QTableWidgetItem(target.suffix))
+        self.target_table.blockSignals(False)
+    
+    def add_target(self):
+        """Add a target row"""
+        self.osc_settings.add_target(enabled=False)
+        self.update_target_table()
+        self.target_table.setCurrentCell(len(self.osc_settings.targets) - 1, 1)
+    
+    def remove_target(self):
+        """Remove the selected target row"""
+        if self.osc_settings.remove_target(self.target_table.currentRow()):
+            self.update_target_table()
+            self.emit_osc_targets_changed()
+    
+    def _on_target_item_changed(self, item):
+        """Write an edited table cell back to its target"""
+        target = self.osc_settings.targets[item.row()]
+        column = item.column()
+        if column == 0:
+            target.enabled = item.checkState() == Qt.Checked
+        elif column == 1:
+            target.ip = item.text().strip()
+        elif column == 2:
+            try:
+                port = int(item.text())
+                if not 1 <= port <= 65535:
+                    raise ValueError(port)
+                target.port = port
+            except ValueError:
+                self.target_table.blockSignals(True)
+                item.setText(str(target.port))
+                self.target_table.blockSignals(False)
+        elif column == 3:
+            target.suffix = item.text()
+        self.emit_osc_targets_changed()
+    
+    def _on_osc_settings_changed(self):
+        """Write OSC inputs back to the settings model"""
+        self.osc_settings.use_bundle = self.bundle_checkbox.isChecked()
+        self.osc_settings.sync_roll = self.sync_roll_checkbox.isChecked()
+    
+    def _on_transport_changed(self, *args):
+        """Write the transport inputs back to the settings model and emit the change"""
+        transport = self.transport_combo.currentData()
+        port = self.websocket_port_input.value()
+        password = self.websocket_password_input.text()
+        if (transport, port, password) == (self.osc_settings.transport, self.osc_settings.websocket_port,
+                                           self.osc_settings.websocket_password):
+            return
+        self.osc_settings.transport = transport
+        self.osc_settings.websocket_port = port
+        self.osc_settings.websocket_password = password
+        self._update_transport_inputs()
+        self.transport_changed.emit(transport)
+    
+    def _update_transport_inputs(self):
+        """Enable the inputs that apply to the selected transport"""
+        websocket = self.osc_settings.transport == TRANSPORT_OBS_WEBSOCKET
+        self.websocket_port_input.setEnabled(websocket)
+        self.websocket_password_input.setEnabled(websocket)
+        self.bundle_checkbox.setEnabled(not websocket)
+        self.sync_roll_checkbox.setEnabled(not websocket)
+    
+    def emit_osc_targets_changed(self):
+        """Emit signal with the (ip, port) of every enabled target"""
+        self.osc_targets_changed.emit(self.osc_settings.get_targets())
+    
+    def choose_recording_folder(self):
+        """Pick the recording folder with a directory dialog"""
+        folder = QFileDialog.getExistingDirectory(self, "収録フォルダを選択", self.recording_folder)
+        if folder:
+            self.folder_input.setText(folder)
+            self._on_folder_edited()
+    
+    def _on_folder_edited(self):
+        """Emit signal when the recording folder actually changed"""
+        folder = self.folder_input.text().strip()
+        if folder != self.recording_folder:
+            self.recording_folder = folder
+            self.recording_folder_changed.emit(folder)
+    
+    def _on_collision_mode_changed(self, index):
+        """Write the collision guard mode back to the guard"""
+        self.collision_guard.set_mode(self.collision_combo.itemData(index))
+    
     def get_filename_order(self):
         """Get current filename element order"""
         return self.filename_config.get_element_order()
@@ -158,9 +455,13 @@ class SettingsPanel(QWidget):
         return self.filename_config.get_all_prefixes()
     
     def get_ip(self):
-        """Get the current IP address from input"""
-        return self.ip_input.text()
+        """Get the current IP address"""
+        return self.osc_settings.ip
     
     def get_port(self):
-        """Get the current port from input"""
-        return self.port_input.value()
+        """Get the current port"""
+        return self.osc_settings.port
+    
+    def get_use_bundle(self):
+        """Whether filename and start commands should be sent as one bundle"""
+        return self.osc_settings.use_bundle
@@ -0,0 +1,102 @@
+"""
+ショットリストパネル
+Panel for loading a shot list and jumping between its rows.
+"""
+
+import os
+
+from PyQt5.QtWidgets import (QGroupBox, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QLineEdit,
+                             QFileDialog)
+from PyQt5.QtCore import pyqtSignal
+
+
+class ShotListPanel(QGroupBox):
+    """Panel for loading a shot list and jumping between its rows"""
+    load_requested = pyqtSignal(str)
+    clear_requested = pyqtSignal()
+    jump_requested = pyqtSignal(str)
+    
+    def __init__(self, parent=None):
+        super().__init__("ショットリスト")
+        self.parent = parent
+        self.shot_list = None
+        self._init_ui()
+    
+    def _init_ui(self):
+        """Initialize the UI components"""
+        layout = QVBoxLayout()
+        
+        button_layout = QHBoxLayout()
+        self.load_button = QPushButton("読み込み...")
+        self.load_button.setToolTip("パート・シーン・カットの表 (CSV / TSV / XLSX) を読み込みます")
+        self.load_button.clicked.connect(self.choose_shot_list)
+        button_layout.addWidget(self.load_button)
+        
+        self.clear_button = QPushButton("解除")
+        self.clear_button.setToolTip("ショットリストを外し、STOPでカット番号を1つずつ進めます")
+        self.clear_button.clicked.connect(self.clear_requested.emit)
+        self.clear_button.setEnabled(False)
+        button_layout.addWidget(self.clear_button)
+        layout.addLayout(button_layout)
+        
+        self.status_label = QLabel("未読み込み")
+        self.status_label.setStyleSheet("color: #aaaaaa; font-size: 11px;")
+        self.status_label.setWordWrap(True)
+        layout.addWidget(self.status_label)
+        
+        self.jump_input = QLineEdit()
+        self.jump_input.setPlaceholderText("ジャンプ (例: 12 / S3 12 / Part1 S3 12)")
+        self.jump_input.returnPressed.connect(self._on_jump_entered)
+        self.jump_input.setEnabled(False)
+        layout.addWidget(self.jump_input)
+        
+        self.setLayout(layout)
+    
+    def choose_shot_list(self):
+        """Pick a shot list file with a file dialog"""
+        path, _ = QFileDialog.getOpenFileName(
+            self, "ショットリストを選択", "",
+            "ショットリスト (*.csv *.tsv *.txt *.xlsx);;すべてのファイル (*)"
+        )
+        if path:
+            self.load_requested.emit(path)
+    
+    def _on_jump_entered(self):
+        """Emit the jump query typed by the user"""
+        query = self.jump_input.text().strip()
+        if query:
+            self.jump_requested.emit(query)
+    
+    def set_loading(self, path):
+        """Show that a shot list is being read"""
+        self.status_label.setText(f"読み込み中: {os.path.basename(path)}")
+        self.status_label.setStyleSheet("color: #aaaaaa; font-size: 11px;")
+    
+    def show_error(self, message):
+        """Show why a shot list could not be read"""
+        self.status_label.setText(message)
+        self.status_label.setStyleSheet("color: red; font-size: 11px;")
+    
+    def set_shot_list(self, shot_list):
+        """Show a newly loaded shot list, or none"""
+        self.shot_list = shot_list
+        self.clear_button.setEnabled(shot_list is not None)
+        self.jump_input.setEnabled(shot_list is not None)
+        if shot_list is None:
+            self.status_label.setText("未読み込み")
+            self.status_label.setStyleSheet("color: #aaaaaa; font-size: 11px;")
+            return
+        self.update_status()
+    
+    def update_status(self):
+        """Show progress through the shot list and the current row"""
+        shot_list = self.shot_list
+        if shot_list is None:
+            return
+        lines = [f"{shot_list.source}: {shot_list.shot_count()} / {len(shot_list)} 撮影済み"]
+        if shot_list.position is not None:
+            lines.append(f"{shot_list.position + 1} 行目: {shot_list.describe(shot_list.position)}")
+        elif len(shot_list):
+            lines.append("すべて撮影済み")
+        self.status_label.setText("\n".join(lines))
+        self.status_label.setStyleSheet("color: #aaaaaa; font-size: 11px;")
@@ -5,9 +5,11 @@ Main application window.
 
 import sys
 import os
-import platform
+import queue
+import sqlite3
+import threading
 
-if platform.system() == "Darwin":  # macOS specific settings
+if sys.platform == "darwin":  # macOS specific settings
     os.environ["QT_MAC_WANTS_LAYER"] = "1"  # Fix for macOS rendering issues
     if "QT_QPA_PLATFORM" in os.environ:
         del os.environ["QT_QPA_PLATFORM"]  # Avoid offscreen rendering on macOS
@@ -15,95 +17,343 @@ elif "DISPLAY" not in os.environ:
     os.environ["QT_QPA_PLATFORM"] = "offscreen"
 
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
-                            QLabel, QPushButton, QGroupBox, QTabWidget)
-from PyQt5.QtCore import Qt
+                            QLabel, QPushButton, QGroupBox, QTabWidget, QShortcut)
+from PyQt5.QtGui import QKeySequence
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal
 
 from cut_numbering_manager.ui.components.cut_info_panel import CutInfoPanel
-from cut_numbering_manager.ui.components.settings_panel import SettingsPanel
 from cut_numbering_manager.ui.components.preview_panel import PreviewPanel
+from cut_numbering_manager.ui.components.shot_list_panel import ShotListPanel
 from cut_numbering_manager.ui.components.clapperboard_panel import ClapperboardPanel
+from cut_numbering_manager.ui.styles import MAIN_STYLESHEET, REC_BUTTON_STYLESHEET
 from cut_numbering_manager.models.cut_info import CutInfo
-from cut_numbering_manager.utils.filename import generate_filename
-from cut_numbering_manager.osc.sender import CustomOSCSender
+from cut_numbering_manager.models.cut_history import CutInfoHistory
+from cut_numbering_manager.models.osc_settings import OSCSettings, OSCTarget
+from cut_numbering_manager.utils.event_log import get_logger, setup_logging
+from cut_numbering_manager.utils.filename import generate_filename, get_template
+from cut_numbering_manager.utils.metrics import METRICS
+from cut_numbering_manager.osc.transport import OSCTransport
+from cut_numbering_manager.osc.worker import OSCSendWorker
+from cut_numbering_manager.storage.collision_guard import CollisionGuard
+from cut_numbering_manager.storage.take_index import TakeIndex
+from cut_numbering_manager.storage.take_journal import TakeJournal
 from cut_numbering_manager.config import (
     APP_NAME, 
     APP_GEOMETRY, 
+    DEFAULT_VERSION,
     OSC_RECORDING_COMMAND,
-    OSC_FILENAME_COMMAND
+    OSC_FILENAME_COMMAND,
+    OSC_FEEDBACK_ENABLED,
+    JOURNAL_ENABLED,
+    RECORDING_FOLDER,
+    RECORDING_SCAN_RESTART_DEBOUNCE_MS,
+    SHOT_LIST_PATH,
+    SYNC_ROLL_PING_INTERVAL_MS,
+    SYNC_ROLL_USE_TIMETAG,
+    TRANSPORT_OBS_WEBSOCKET
 )
 
+logger = get_logger("ui")
+
 
 class MainWindow(QMainWindow):
     """Main application window"""
+    
+    osc_command_finished = pyqtSignal(object)
+    recording_state_confirmed = pyqtSignal(bool, object)
+    recording_files_added = pyqtSignal(list)
+    recording_files_removed = pyqtSignal(list)
+    shot_list_loaded = pyqtSignal(object, object)
+    
     def __init__(self):
         super().__init__()
         self.setWindowTitle(APP_NAME)
         self.setGeometry(*APP_GEOMETRY)
         
-        self.setStyleSheet("""
-            QMainWindow, QWidget {
-                background-color: #1a1a1a;
-                color: #ffffff;
-                font-family: 'Inter', 'Noto Sans', 'Arial', 'Helvetica', sans-serif;
-            }
-            QGroupBox {
-                border: 1px solid #3a3a3a;
-                border-radius: 5px;
-                margin-top: 10px;
-                font-weight: bold;
-                color: #ffffff;
-            }
-            QGroupBox::title {
-                subcontrol-origin: margin;
-                left: 10px;
-                padding: 0 5px 0 5px;
-            }
-            QTabWidget::pane {
-                border: 1px solid #3a3a3a;
-                border-radius: 5px;
-            }
-            QTabBar::tab {
-                background-color: #2a2a2a;
-                color: #cccccc;
-                border: 1px solid #3a3a3a;
-                border-bottom: none;
-                border-top-left-radius: 5px;
-                border-top-right-radius: 5px;
-                padding: 5px 10px;
-                min-width: 50px;
-            }
-            QTabBar::tab:selected {
-                background-color: #1a1a1a;
-                color: #ffd900;
-                border-bottom: none;
-            }
-            QLineEdit, QSpinBox {
-                background-color: #2a2a2a;
-                color: #ffffff;
-                border: 1px solid #3a3a3a;
-                border-radius: 3px;
-                padding: 5px;
-            }
-            QPushButton {
-                background-color: #2a2a2a;
-                color: #ffffff;
-                border: 1px solid #3a3a3a;
-                border-radius: 3px;
-                padding: 5px 10px;
-            }
-            QPushButton:hover {
-                background-color: #3a3a3a;
-            }
-            QPushButton:pressed {
-                background-color: #4a4a4a;
-            }
-        """)
+        self.setStyleSheet(MAIN_STYLESHEET)
         
+        self.event_log = setup_logging()
         self.recording = False
         self.cut_info = CutInfo()
+        self.cut_info.set_notify_scheduler(lambda notify: QTimer.singleShot(0, notify))
+        self.osc_settings = OSCSettings()
+        self.settings_panel = None
+        self.take_journal = None
+        self._current_take = None
+        self._last_take = None
+        if JOURNAL_ENABLED:
+            self._open_take_journal()
+        self.take_index = TakeIndex(self.take_journal)
+        self.history = CutInfoHistory(self.cut_info)
+        self.collision_guard = CollisionGuard()
+        self.osc_transport = OSCTransport()
+        self.websocket_transport = None
+        self.osc_worker = OSCSendWorker(self.osc_command_finished.emit)
+        self.osc_command_finished.connect(self._on_osc_command_finished)
+        self._pending_command = None
+        self._deferred_confirmation = None
+        self._pressed_at = None
+        self.osc_feedback = None
+        self._ping_timer = None
+        self.recording_state_confirmed.connect(self._on_recording_state_confirmed)
+        self.recording_folder = RECORDING_FOLDER
+        self.folder_scanner = None
+        self._stopping_scanner = None
+        # Prefix inputs change the filename settings on every keystroke; restart the scanner once they settle
+        self._scanner_restart_timer = QTimer(self)
+        self._scanner_restart_timer.setSingleShot(True)
+        self._scanner_restart_timer.setInterval(RECORDING_SCAN_RESTART_DEBOUNCE_MS)
+        self._scanner_restart_timer.timeout.connect(self._start_folder_scanner)
+        self.recording_files_added.connect(self._on_recording_files_added)
+        self.recording_files_removed.connect(self._on_recording_files_removed)
+        self.shot_list = None
+        self.shot_list_loaded.connect(self._on_shot_list_loaded)
         
         self._init_ui()
+        self.cut_info.subscribe(self._on_cut_info_changed)
         self.update_filename_preview()
+        # QShortcut takes only the first binding of a standard key; Redo is both Ctrl+Y and Ctrl+Shift+Z
+        for standard_key, slot in ((QKeySequence.Undo, self.undo), (QKeySequence.Redo, self.redo)):
+            for key in QKeySequence.keyBindings(standard_key):
+                QShortcut(key, self, slot)
+        
+        if OSC_FEEDBACK_ENABLED:
+            QTimer.singleShot(0, self._start_feedback_listener)
+        if self.recording_folder:
+            QTimer.singleShot(0, self._start_folder_scanner)
+        if self.take_journal is not None:
+            QTimer.singleShot(0, self._load_journal_filenames)
+        if SHOT_LIST_PATH:
+            QTimer.singleShot(0, lambda: self.load_shot_list(SHOT_LIST_PATH))
+    
+    def _open_take_journal(self):
+        """Open the take journal and restore the numbering state from it"""
+        try:
+            self.take_journal = TakeJournal()
+            take = self.take_journal.restore(self.cut_info)
+        except (OSError, sqlite3.Error) as e:
+            logger.error("テイクジャーナルを開けません: %s", e)
+            self.take_journal = None
+            return
+        self._last_take = take
+        if take is not None:
+            logger.info("前回のセッションを復元しました: %s (%s)", take["filename"], take["event"])
+    
+    def _load_journal_filenames(self):
+        """Feed the collision guard with every name the journal has seen rolled"""
+        try:
+            self.collision_guard.add_many(self.take_journal.iter_filenames())
+        except sqlite3.Error as e:
+            logger.error("エラー: %s", e)
+    
+    def _take_context(self, filename):
+        """Snapshot of the take being sent, for the journal"""
+        return {
+            "filename": filename,
+            "part_name": self.cut_info.part_name,
+            "scene_name": self.cut_info.scene_name,
+            "cut_number": self.cut_info.cut_number,
+            "version": self.cut_info.version
+        }
+    
+    def _start_feedback_listener(self):
+        """Start the OBS feedback listener once the window is up (its import pulls in asyncio)"""
+        from cut_numbering_manager.osc.feedback import OSCFeedbackListener
+        
+        listener = OSCFeedbackListener(self.recording_state_confirmed.emit)
+        try:
+            listener.start()
+        except OSError as e:
+            logger.warning("フィードバック受信を開始できません: %s", e)
+            return
+        self.osc_feedback = listener
+        self._ping_timer = QTimer(self)
+        self._ping_timer.setInterval(SYNC_ROLL_PING_INTERVAL_MS)
+        self._ping_timer.timeout.connect(self._ping_targets)
+        self._ping_timer.start()
+    
+    def _ping_targets(self):
+        """Keep per-target latency estimates fresh for sync roll while idle"""
+        if not self.osc_settings.sync_roll or self.recording or self._pending_command is not None:
+            return
+        for target in self.osc_settings.enabled_targets():
+            key = target.get_target()
+            self.osc_feedback.ping(self.osc_transport.lookup_sender(*key), key)
+    
+    def _start_folder_scanner(self):
+        """(Re)start watching the recording folder with the current filename settings"""
+        from cut_numbering_manager.storage.folder_scanner import RecordingFolderScanner
+        
+        self._scanner_restart_timer.stop()
+        self._stop_folder_scanner(timeout=0)
+        if self._stopping_scanner is not None:
+            if self._stopping_scanner.running:
+                # The old thread still owns the cache file; try again once it has saved and exited
+                self._scanner_restart_timer.start()
+                return
+            self._stopping_scanner = None
+        if not self.recording_folder:
+            return
+        if not os.path.isdir(self.recording_folder):
+            logger.warning("収録フォルダが見つかりません: %s", self.recording_folder)
+            return
+        self.folder_scanner = RecordingFolderScanner(
+            self.recording_folder,
+            self.cut_info.filename_config,
+            on_added=self.recording_files_added.emit,
+            on_removed=self.recording_files_removed.emit,
+            suffixes=self.osc_settings.get_suffixes()
+        )
+        self.folder_scanner.start()
+    
+    def _stop_folder_scanner(self, timeout=1.0):
+        """Stop the folder scanner, waiting up to timeout seconds for its thread to exit"""
+        if self.folder_scanner is not None:
+            if not self.folder_scanner.stop(timeout):
+                self._stopping_scanner = self.folder_scanner
+            self.folder_scanner = None
+    
+    def _on_recording_folder_changed(self, folder):
+        """Watch the newly selected recording folder"""
+        self.recording_folder = folder
+        self._start_folder_scanner()
+    
+    def _on_recording_files_added(self, takes):
+        """Index takes that have landed in the recording folder"""
+        for take in takes:
+            self.take_index.add(take.part_name, take.scene_name, take.cut_number, take.version)
+            self.collision_guard.add(self._unsuffixed_filename(take))
+        if len(takes) == 1:
+            logger.info("収録フォルダに追加: %s", takes[0].filename)
+        else:
+            logger.info("収録フォルダのテイク: %d 件", len(takes))
+    
+    def _on_recording_files_removed(self, takes):
+        """Report takes that disappeared from the recording folder"""
+        remaining = set()
+        if self.folder_scanner is not None:
+            remaining = {take[:4] for take in self.folder_scanner.takes().values()}
+        for take in takes:
+            # Another camera's file of the same take keeps the name in use
+            if take[:4] not in remaining:
+                self.collision_guard.discard(self._unsuffixed_filename(take))
+            logger.info("収録フォルダから削除: %s", take.filename)
+    
+    def _unsuffixed_filename(self, take):
+        """Name generate_filename gives a scanned take: no extension and no per-target suffix"""
+        config = self.cut_info.filename_config
+        return get_template(config, config.get_element_order()).render(
+            take.part_name, take.scene_name, take.cut_number, take.version)
+    
+    def load_shot_list(self, path):
+        """Read a shot list on a background thread; it replaces the current one when done"""
+        from cut_numbering_manager.storage.shot_list_reader import read_shot_list
+        
+        journal = self.take_journal
+        folder_takes = [] if self.folder_scanner is None else list(self.folder_scanner.takes().values())
+        
+        def run():
+            try:
+                shot_list = read_shot_list(path)
+                # Flag rows that already have takes here, not one lookup per row on the GUI thread
+                if journal is not None:
+                    shot_list.mark_taken(journal.started_cuts())
+                shot_list.mark_taken((take.part_name, take.scene_name, take.cut_number) for take in folder_takes)
+            except Exception as e:
+                self.shot_list_loaded.emit(None, e)
+                return
+            self.shot_list_loaded.emit(shot_list, None)
+        
+        self.shot_list_panel.set_loading(path)
+        threading.Thread(target=run, name="shot-list-reader", daemon=True).start()
+    
+    def _on_shot_list_loaded(self, shot_list, error):
+        """Switch to a freshly read shot list and move to its first unshot row"""
+        if error is not None:
+            logger.error("ショットリストを読み込めません: %s", error)
+            self.shot_list_panel.show_error(f"読み込みエラー: {error}")
+            return
+        self.shot_list = shot_list
+        logger.info("ショットリストを読み込みました: %s (%d 行, 読み飛ばし %d 行)",
+                    shot_list.source, len(shot_list), shot_list.skipped)
+        index = shot_list.next_unshot(None, self._is_take_shot)
+        if index is not None and not self.recording and self._pending_command is None:
+            self._apply_shot(index)
+        self.shot_list_panel.set_shot_list(shot_list)
+    
+    def clear_shot_list(self):
+        """Go back to advancing the cut number by one on STOP"""
+        self.shot_list = None
+        self.shot_list_panel.set_shot_list(None)
+    
+    def _is_take_shot(self, part_name, scene_name, cut_number):
+        """Whether a cut already has a take in the journal or the recording folder"""
+        return self.take_index.next_version(part_name, scene_name, cut_number) > DEFAULT_VERSION
+    
+    def _apply_shot(self, index):
+        """Set the cut information to a shot list row with its next free version"""
+        self.shot_list.apply(index, self.cut_info, self.take_index.next_version(*self.shot_list.row(index)))
+        self.shot_list_panel.update_status()
+    
+    def jump_to_shot(self, query):
+        """Move to the shot list row a jump query names, nearest after the current row first"""
+        if self.shot_list is None:
+            return
+        if self.recording or self._pending_command is not None:
+            self.status_label.setText("録画中はジャンプできません")
+            self.status_label.setStyleSheet("color: red;")
+            return
+        matches = self.shot_list.find(query, self.shot_list.position)
+        if not matches:
+            self.status_label.setText(f"ショットリストにありません: {query}")
+            self.status_label.setStyleSheet("color: red;")
+            return
+        self._apply_shot(matches[0])
+        logger.info("ショットリストの %d 行目へ移動: %s", matches[0] + 1, self.shot_list.describe(matches[0]))
+    
+    def _advance_shot_list(self):
+        """Move to the next unshot row after the take that just finished"""
+        take = self._last_take
+        if take is None:
+            take = {"part_name": self.cut_info.part_name, "scene_name": self.cut_info.scene_name,
+                    "cut_number": self.cut_info.cut_number}
+        index = self.shot_list.advance(take["part_name"], take["scene_name"], take["cut_number"],
+                                       self._is_take_shot)
+        if index is None:
+            logger.info("ショットリストの最後まで撮影しました")
+            self.cut_info.increment_cut()
+            self.shot_list_panel.update_status()
+            return
+        self._apply_shot(index)
+    
+    def undo(self):
+        """Go back to the previous numbering state"""
+        self._step_history(self.history.undo, "元に戻しました", "これ以上元に戻せません")
+    
+    def redo(self):
+        """Go forward to the numbering state undo left"""
+        self._step_history(self.history.redo, "やり直しました", "これ以上やり直せません")
+    
+    def _step_history(self, step, done_message, empty_message):
+        """Run an undo or redo step and report it in the status label"""
+        if self.recording or self._pending_command is not None:
+            self.status_label.setText("録画中は元に戻せません")
+            self.status_label.setStyleSheet("color: red;")
+            return
+        snapshot = step()
+        if snapshot is None:
+            self.status_label.setText(empty_message)
+            self.status_label.setStyleSheet("color: #aaaaaa;")
+            return
+        filename = generate_filename(snapshot)
+        logger.info("%s: %s", done_message, filename)
+        self.status_label.setText(f"{done_message}: {filename}")
+        self.status_label.setStyleSheet("color: #cccccc;")
+        if self.shot_list is not None:
+            index = self.shot_list.index_of(snapshot.part_name, snapshot.scene_name, snapshot.cut_number)
+            if index is not None:
+                self.shot_list.position = index
+            self.shot_list_panel.update_status()
     
     def _init_ui(self):
         """Initialize the UI components"""
@@ -112,12 +362,13 @@ class MainWindow(QMainWindow):
         main_layout = QVBoxLayout(central_widget)
         
         
-        tabs = QTabWidget()
+        self.tabs = QTabWidget()
         main_tab = QWidget()
-        settings_tab = QWidget()
+        self.settings_tab = QWidget()
         
-        tabs.addTab(main_tab, "メイン")
-        tabs.addTab(settings_tab, "設定")
+        self.tabs.addTab(main_tab, "メイン")
+        self.tabs.addTab(self.settings_tab, "設定")
+        self.tabs.currentChanged.connect(self._on_tab_changed)
         
         main_tab_layout = QHBoxLayout(main_tab)
         main_tab_layout.setContentsMargins(5, 5, 5, 5)
@@ -126,9 +377,15 @@ class MainWindow(QMainWindow):
         left_panel_layout = QVBoxLayout(left_panel)
         left_panel.setMaximumWidth(300)  # 左パネルの幅を制限
         
-        self.cut_info_panel = CutInfoPanel(self.cut_info, self.update_ui)
+        self.cut_info_panel = CutInfoPanel(self.cut_info, self.take_index)
         left_panel_layout.addWidget(self.cut_info_panel)
         
+        self.shot_list_panel = ShotListPanel()
+        self.shot_list_panel.load_requested.connect(self.load_shot_list)
+        self.shot_list_panel.clear_requested.connect(self.clear_shot_list)
+        self.shot_list_panel.jump_requested.connect(self.jump_to_shot)
+        left_panel_layout.addWidget(self.shot_list_panel)
+        
         self.preview_panel = PreviewPanel()
         left_panel_layout.addWidget(self.preview_panel)
         
@@ -136,28 +393,25 @@ class MainWindow(QMainWindow):
         rec_layout = QVBoxLayout()
         
         self.rec_button = QPushButton("REC")
-        self.rec_button.setStyleSheet(
-            "QPushButton {"
-            "   background-color: #ff0000;"
-            "   color: white;"
-            "   font-weight: bold;"
-            "   border-radius: 5px;"
-            "   min-height: 50px;"
-            "   font-size: 16px;"
-            "   border: 2px solid #ffffff;"
-            "}"
-            "QPushButton:pressed {"
-            "   background-color: #aa0000;"
-            "   border: 2px solid #aaaaaa;"
-            "}"
-        )
+        self.rec_button.setStyleSheet(REC_BUTTON_STYLESHEET)
         self.rec_button.clicked.connect(self.toggle_recording)
         
         self.status_label = QLabel("Ready")
         self.status_label.setAlignment(Qt.AlignCenter)
         
+        self.target_status_label = QLabel("")
+        self.target_status_label.setAlignment(Qt.AlignCenter)
+        self.target_status_label.setStyleSheet("color: #aaaaaa; font-size: 11px;")
+        self.target_status_label.hide()
+        
+        self.retake_button = QPushButton("リテイク")
+        self.retake_button.setToolTip("直前のカットに戻り、空いている次のバージョンを設定します")
+        self.retake_button.clicked.connect(self.retake)
+        
         rec_layout.addWidget(self.rec_button)
+        rec_layout.addWidget(self.retake_button)
         rec_layout.addWidget(self.status_label)
+        rec_layout.addWidget(self.target_status_label)
         
         rec_group.setLayout(rec_layout)
         left_panel_layout.addWidget(rec_group)
@@ -171,97 +425,405 @@ class MainWindow(QMainWindow):
         main_tab_layout.addWidget(left_panel, 1)  # 比率1
         main_tab_layout.addWidget(right_panel, 2)  # 比率2（右側を大きく）
         
-        settings_tab_layout = QVBoxLayout(settings_tab)
+        QVBoxLayout(self.settings_tab)
         
-        self.settings_panel = SettingsPanel()
-        self.settings_panel.filename_order_changed.connect(self.update_filename_preview)
-        self.settings_panel.prefix_changed.connect(self.update_filename_preview)
-        settings_tab_layout.addWidget(self.settings_panel)
-        
-        main_layout.addWidget(tabs)
+        main_layout.addWidget(self.tabs)
+    
+    def _on_tab_changed(self, index):
+        """Build tabs the first time they are shown"""
+        if self.tabs.widget(index) is self.settings_tab:
+            self.ensure_settings_panel()
+    
+    def ensure_settings_panel(self):
+        """Build the settings panel on first use"""
+        if self.settings_panel is None:
+            from cut_numbering_manager.ui.components.settings_panel import SettingsPanel
+            
+            self.settings_panel = SettingsPanel(self.cut_info.filename_config, self.osc_settings,
+                                                self.recording_folder, self.collision_guard,
+                                                self.event_log, METRICS, self.osc_worker.queue_depth)
+            self.settings_panel.filename_order_changed.connect(self._on_filename_config_changed)
+            self.settings_panel.prefix_changed.connect(self._on_filename_config_changed)
+            self.settings_panel.osc_targets_changed.connect(self._on_osc_targets_changed)
+            self.settings_panel.transport_changed.connect(self._on_transport_changed)
+            self.settings_panel.recording_folder_changed.connect(self._on_recording_folder_changed)
+            self.settings_tab.layout().addWidget(self.settings_panel)
+        return self.settings_panel
+    
+    def closeEvent(self, event):
+        """Stop the OSC worker and release its sockets when the window is closed"""
+        self.osc_worker.stop()
+        self._scanner_restart_timer.stop()
+        self._stop_folder_scanner()
+        if self.osc_feedback is not None:
+            self.osc_feedback.stop()
+        self.osc_transport.close()
+        if self.websocket_transport is not None:
+            self.websocket_transport.close()
+        if self.take_journal is not None:
+            self.take_journal.close()
+        super().closeEvent(event)
+    
+    def _on_osc_targets_changed(self, targets):
+        """Close sockets of removed targets and re-prepare the next take"""
+        self.osc_transport.retain(targets)
+        if self.websocket_transport is not None:
+            self.websocket_transport.retain(self.osc_settings.get_websocket_targets())
+        self.update_filename_preview()
+        scanner = self.folder_scanner
+        if scanner is not None and scanner.suffixes != self.osc_settings.get_suffixes():
+            self._scanner_restart_timer.start()
+    
+    def _on_transport_changed(self, transport):
+        """Drop obs-websocket connections so the next command uses the new port and password"""
+        if self.websocket_transport is not None:
+            self.websocket_transport.close()
+            self.websocket_transport = None
+    
+    def _uses_websocket(self):
+        """Whether commands go through obs-websocket instead of OSC"""
+        return self.osc_settings.transport == TRANSPORT_OBS_WEBSOCKET
+    
+    def _get_websocket_transport(self):
+        """Create the obs-websocket connection pool on first use"""
+        if self.websocket_transport is None:
+            from cut_numbering_manager.websocket.obs_client import OBSWebSocketTransport
+            
+            self.websocket_transport = OBSWebSocketTransport(self.osc_settings.websocket_password,
+                                                             self.recording_state_confirmed.emit)
+        return self.websocket_transport
+    
+    def _target_snapshots(self):
+        """Snapshots of the enabled targets, addressed for the selected transport"""
+        targets = [target.snapshot() for target in self.osc_settings.enabled_targets()]
+        if self._uses_websocket():
+            port = int(self.osc_settings.websocket_port)
+            targets = [(ip, port, suffix, f"{ip}:{port}") for ip, _, suffix, _ in targets]
+        return targets
     
     def update_filename_preview(self):
         """Update the filename preview based on current inputs"""
-        element_order = self.settings_panel.get_filename_order()
+        element_order = self.cut_info.filename_config.get_element_order()
         filename = generate_filename(self.cut_info, element_order, None)
         self.preview_panel.update_preview(filename)
+        self._prepare_next_take(filename)
+    
+    def _prepare_next_take(self, filename):
+        """Pre-encode the next take's filename message so REC only has to send bytes"""
+        try:
+            for target in self.osc_settings.enabled_targets():
+                ip, port = target.get_target()
+                self.osc_transport.prepare(
+                    ip,
+                    port,
+                    OSC_FILENAME_COMMAND,
+                    target.get_filename(filename)
+                )
+        except Exception as e:
+            logger.error("エラー: %s", e)
     
-    def update_ui(self):
-        """Update all UI components from the model"""
+    def _on_filename_config_changed(self):
+        """Route settings changes to the filename through the model's change bus"""
+        self.cut_info.mark_changed(CutInfo.FILENAME_CONFIG)
+    
+    def _on_cut_info_changed(self, fields):
+        """Refresh the filename preview once per coalesced model change"""
         self.update_filename_preview()
-        self.clapperboard_panel.update_ui_from_model()
+        if CutInfo.FILENAME_CONFIG in fields and self.folder_scanner is not None:
+            self._scanner_restart_timer.start()
     
     def toggle_recording(self):
         """Toggle recording state and send appropriate OSC message"""
+        if self._pending_command is not None:
+            return
+        self._pressed_at = METRICS.start()
         if not self.recording:
             self.start_recording()
         else:
             self.stop_recording()
     
     def start_recording(self):
-        """Start recording and send OSC message"""
+        """Queue the OSC commands that set the filename and start recording"""
         try:
-            ip = self.settings_panel.get_ip()
-            port = self.settings_panel.get_port()
-            
-            element_order = self.settings_panel.get_filename_order()
-            filename = generate_filename(self.cut_info, element_order, None)
-            print(f"録画ファイル名を設定: {filename}")
-            
-            sender = CustomOSCSender(ip, port)
-            filename_success = sender.send_message_standard(OSC_FILENAME_COMMAND, filename)
-            
-            if not filename_success:
-                print("ファイル名設定コマンドの送信に失敗しました。録画は続行します。")
+            targets = self._target_snapshots()
+            if not targets:
+                self.status_label.setText("有効な送信先がありません")
+                self.status_label.setStyleSheet("color: red;")
+                return
             
-            success = sender.send_message_standard(OSC_RECORDING_COMMAND, 1)
+            started = METRICS.start()
+            element_order = self.cut_info.filename_config.get_element_order()
+            filename, collision = self.collision_guard.check(self.cut_info, element_order)
+            METRICS.stop("filename", started)
+            if filename is None:
+                logger.warning("同名のファイルが既にあるため録画を開始しません: %s", collision)
+                self.status_label.setText(f"同名のファイルがあります: {collision}")
+                self.status_label.setStyleSheet("color: red;")
+                return
+            if collision is not None:
+                logger.info("同名のファイルがあるためバージョンを上げました: %s → %s", collision, filename)
+            logger.info("録画ファイル名を設定: %s", filename)
             
-            if success:
-                self.recording = True
-                self.rec_button.setText("STOP")
-                self.status_label.setText(f"録画中: {filename}")
-                self.status_label.setStyleSheet("color: #ffd900; font-weight: bold;")  # 黄色に変更
-                
-                self.clapperboard_panel.set_recording(True)
+            started = METRICS.start()
+            if self._uses_websocket():
+                self._pending_command = self.osc_worker.submit(
+                    "start", self._send_start_websocket, targets, filename,
+                    self._get_websocket_transport(),
+                    context=self._take_context(filename)
+                )
             else:
-                self.status_label.setText("OSCメッセージの送信に失敗しました")
-                self.status_label.setStyleSheet("color: red;")
+                self._pending_command = self.osc_worker.submit(
+                    "start", self._send_start, targets, filename,
+                    self.osc_settings.use_bundle,
+                    context=self._take_context(filename)
+                )
+            METRICS.stop("enqueue", started)
+            self.status_label.setText(f"送信中: {filename}")
+            self.status_label.setStyleSheet("color: #cccccc;")
             
+        except queue.Full:
+            self.status_label.setText("OSC送信キューが満杯です")
+            self.status_label.setStyleSheet("color: red;")
         except Exception as e:
             self.status_label.setText(f"エラー: {str(e)}")
             self.status_label.setStyleSheet("color: red;")
     
     def stop_recording(self):
-        """Stop recording, send OSC message, and update cut/version numbers"""
+        """Queue the OSC command that stops recording"""
         try:
-            ip = self.settings_panel.get_ip()
-            port = self.settings_panel.get_port()
+            targets = self._target_snapshots()
             
-            sender = CustomOSCSender(ip, port)
-            success = sender.send_message_standard(OSC_RECORDING_COMMAND, 0)
+            take = self._current_take
+            if take is None:
+                element_order = self.cut_info.filename_config.get_element_order()
+                take = self._take_context(generate_filename(self.cut_info, element_order, None))
             
-            if success:
-                self.recording = False
-                self.rec_button.setText("REC")
-                
-                self.clapperboard_panel.set_recording(False)
-                
-                self.cut_info.increment_cut()
-                self.cut_info_panel.update_ui_from_model()
-                self.clapperboard_panel.update_ui_from_model()
-                
-                self.update_filename_preview()
-                
-                element_order = self.settings_panel.get_filename_order()
-                next_filename = generate_filename(self.cut_info, element_order, None)
-                print(f"次の録画用ファイル名を設定: {next_filename}")
-                
-                self.status_label.setText(f"録画完了: {next_filename}")
-                self.status_label.setStyleSheet("color: #ffd900;")  # 青から黄色に変更
+            started = METRICS.start()
+            if self._uses_websocket():
+                self._pending_command = self.osc_worker.submit(
+                    "stop", self._send_stop_websocket, targets, self._get_websocket_transport(),
+                    context=take
+                )
             else:
-                self.status_label.setText("OSCメッセージの送信に失敗しました")
-                self.status_label.setStyleSheet("color: red;")
+                self._pending_command = self.osc_worker.submit("stop", self._send_stop, targets, context=take)
+            METRICS.stop("enqueue", started)
             
+        except queue.Full:
+            self.status_label.setText("OSC送信キューが満杯です")
+            self.status_label.setStyleSheet("color: red;")
         except Exception as e:
             self.status_label.setText(f"エラー: {str(e)}")
             self.status_label.setStyleSheet("color: red;")
+    
+    def _send_start(self, targets, filename, use_bundle):
+        """Send the filename and start commands to every target (runs on the OSC worker thread)"""
+        if self.osc_feedback is not None:
+            self.osc_feedback.mark_command_sent(True)
+        if self.osc_settings.sync_roll and len(targets) > 1:
+            return self._send_start_synchronized(targets, filename)
+        # UDP sends never wait on the network, so back-to-back beats a thread hand-off per target
+        return self.osc_transport.fan_out(targets, self._send_start_to, filename, use_bundle,
+                                          concurrent=False)
+    
+    def _send_start_synchronized(self, targets, filename):
+        """Set every target's filename, then start them all at one scheduled instant"""
+        from cut_numbering_manager.osc.sync import SyncRollScheduler
+        
+        self.osc_transport.fan_out(targets, self._send_filename_to, filename, concurrent=False)
+        latencies = {}
+        if self.osc_feedback is not None:
+            latencies = {target[:2]: self.osc_feedback.one_way_latency(target[:2]) for target in targets}
+        scheduler = SyncRollScheduler(use_timetag=SYNC_ROLL_USE_TIMETAG)
+        return scheduler.start(self.osc_transport, targets, latencies)
+    
+    def _send_filename_to(self, target, filename):
+        """Send the filename command to one target"""
+        ip, port, suffix, _ = target
+        filename = OSCTarget.apply_suffix(filename, suffix)
+        return self.osc_transport.get_sender(ip, port).send_message_standard(OSC_FILENAME_COMMAND, filename)
+    
+    def _send_start_to(self, target, filename, use_bundle):
+        """Send the filename and start commands to one target"""
+        ip, port, suffix, _ = target
+        filename = OSCTarget.apply_suffix(filename, suffix)
+        sender = self.osc_transport.get_sender(ip, port)
+        if use_bundle:
+            return sender.send_bundle([
+                (OSC_FILENAME_COMMAND, filename),
+                (OSC_RECORDING_COMMAND, 1)
+            ])
+        
+        filename_success = sender.send_message_standard(OSC_FILENAME_COMMAND, filename)
+        
+        if not filename_success:
+            logger.warning("ファイル名設定コマンドの送信に失敗しました。録画は続行します。")
+        
+        return sender.send_message_standard(OSC_RECORDING_COMMAND, 1)
+    
+    def _send_stop(self, targets):
+        """Send the stop command to every target (runs on the OSC worker thread)"""
+        if self.osc_feedback is not None:
+            self.osc_feedback.mark_command_sent(False)
+        return self.osc_transport.fan_out(targets, self._send_stop_to, concurrent=False)
+    
+    def _send_stop_to(self, target):
+        """Send the stop command to one target"""
+        ip, port, _, _ = target
+        return self.osc_transport.get_sender(ip, port).send_message_standard(OSC_RECORDING_COMMAND, 0)
+    
+    def _send_start_websocket(self, targets, filename, websocket_transport):
+        """Set the filename and start recording over obs-websocket (runs on the OSC worker thread)
+        
+        Each target waits for its server's responses, so several targets are
+        handled in parallel rather than one round trip after another.
+        """
+        return self.osc_transport.fan_out(targets, self._send_start_websocket_to, filename,
+                                          websocket_transport)
+    
+    def _send_start_websocket_to(self, target, filename, websocket_transport):
+        """Set the filename and start recording on one obs-websocket target"""
+        ip, port, suffix, _ = target
+        return websocket_transport.start_recording(ip, port, OSCTarget.apply_suffix(filename, suffix))
+    
+    def _send_stop_websocket(self, targets, websocket_transport):
+        """Stop recording over obs-websocket (runs on the OSC worker thread)"""
+        return self.osc_transport.fan_out(targets, self._send_stop_websocket_to, websocket_transport)
+    
+    def _send_stop_websocket_to(self, target, websocket_transport):
+        """Stop recording on one obs-websocket target"""
+        ip, port, _, _ = target
+        return websocket_transport.stop_recording(ip, port)
+    
+    def _show_target_results(self, result):
+        """Show per-target success and latency under the status line"""
+        results = getattr(result, "results", None)
+        if not results or (len(results) == 1 and results[0].success):
+            self.target_status_label.hide()
+            return
+        lines = []
+        for target_result in results:
+            label = target_result.target[3]
+            if target_result.success:
+                lines.append(f"✓ {label}  {target_result.latency * 1000:.2f} ms")
+            elif target_result.error is not None:
+                lines.append(f"✗ {label}  {str(target_result.error)}")
+            else:
+                lines.append(f"✗ {label}  送信失敗")
+        ok = result.all_succeeded
+        skew = getattr(result, "estimated_skew", None)
+        if skew is not None:
+            lines.append(f"推定同期ずれ {skew * 1000:.2f} ms (1フレーム {result.frame_time * 1000:.1f} ms)")
+            logger.info("シンクロール: 推定同期ずれ %.2f ms", skew * 1000)
+            ok = ok and result.within_frame
+        self.target_status_label.setText("\n".join(lines))
+        self.target_status_label.setStyleSheet(
+            "font-size: 11px; color: %s;" % ("#aaaaaa" if ok else "#ff8c00"))
+        self.target_status_label.show()
+    
+    def _on_osc_command_finished(self, command):
+        """Apply the result of a finished OSC command on the GUI thread"""
+        started = METRICS.start()
+        pressed_at = None
+        if command is self._pending_command:
+            self._pending_command = None
+            pressed_at, self._pressed_at = self._pressed_at, None
+        
+        if self.take_journal is not None:
+            self.take_journal.record(
+                command.kind, command.context, command.sent_at, command.latency,
+                command.success, command.error
+            )
+        
+        self._show_target_results(command.result)
+        
+        if command.error is not None:
+            self.status_label.setText(f"エラー: {str(command.error)}")
+            self.status_label.setStyleSheet("color: red;")
+        elif not command.success:
+            self.status_label.setText("OSCメッセージの送信に失敗しました")
+            self.status_label.setStyleSheet("color: red;")
+        elif command.kind == "start":
+            self._current_take = command.context
+            self._last_take = command.context
+            self.take_index.add_take(command.context)
+            self.collision_guard.add(command.context["filename"])
+            self._on_recording_started(command.context["filename"])
+        elif command.kind == "stop":
+            self._current_take = None
+            self._on_recording_stopped()
+        
+        if self._pending_command is None and self._deferred_confirmation is not None:
+            state, rtt = self._deferred_confirmation
+            self._deferred_confirmation = None
+            self._on_recording_state_confirmed(state, rtt)
+        
+        METRICS.stop("ui_update", started)
+        if pressed_at is not None:
+            # Up to the first target's sendto returning; obs-websocket sends only return after the
+            # server's response, so that time would include a round trip and is left out
+            packet_perf = getattr(command.result, "first_sent_perf", None)
+            if packet_perf is not None and not self._uses_websocket():
+                METRICS.record("press_to_packet", packet_perf - pressed_at)
+            METRICS.stop("press_to_ui", pressed_at)
+    
+    def retake(self):
+        """Go back to the last rolled cut with its next free version"""
+        if self.recording or self._pending_command is not None:
+            return
+        take = self._last_take
+        if take is None:
+            self.cut_info.increment_version(self.take_index.next_version(
+                self.cut_info.part_name, self.cut_info.scene_name, self.cut_info.cut_number))
+            return
+        with self.cut_info.batch():
+            self.cut_info.part_name = take["part_name"]
+            self.cut_info.scene_name = take["scene_name"]
+            self.cut_info.cut_number = take["cut_number"]
+            self.cut_info.version = take["version"]
+            self.cut_info.increment_version(self.take_index.next_version(
+                take["part_name"], take["scene_name"], take["cut_number"]))
+    
+    def _on_recording_state_confirmed(self, state, rtt):
+        """Follow the recording state that OBS reports back"""
+        if self._pending_command is not None:
+            self._deferred_confirmation = (state, rtt)
+            return
+        
+        if state != self.recording:
+            self.recording = state
+            self.rec_button.setText("STOP" if state else "REC")
+            self.clapperboard_panel.set_recording(state)
+        
+        label = "録画開始" if state else "録画停止"
+        if rtt is None:
+            logger.info("OBS確認: %s", label)
+        else:
+            logger.info("OBS確認: %s (往復 %.1f ms)", label, rtt * 1000)
+    
+    def _on_recording_started(self, filename):
+        """Update the UI once the start command has been sent"""
+        self.recording = True
+        self.rec_button.setText("STOP")
+        self.status_label.setText(f"録画中: {filename}")
+        self.status_label.setStyleSheet("color: #ffd900; font-weight: bold;")  # 黄色に変更
+        
+        self.clapperboard_panel.set_recording(True)
+    
+    def _on_recording_stopped(self):
+        """Update the UI and advance the cut once the stop command has been sent"""
+        self.recording = False
+        self.rec_button.setText("REC")
+        
+        self.clapperboard_panel.set_recording(False)
+        
+        if self.shot_list is not None:
+            self._advance_shot_list()
+        else:
+            self.cut_info.increment_cut()
+        
+        element_order = self.cut_info.filename_config.get_element_order()
+        next_filename = generate_filename(self.cut_info, element_order, None)
+        logger.info("次の録画用ファイル名を設定: %s", next_filename)
+        
+        self.status_label.setText(f"録画完了: {next_filename}")
+        self.status_label.setStyleSheet("color: #ffd900;")  # 青から黄色に変更
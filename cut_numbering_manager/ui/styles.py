@@ -0,0 +1,92 @@
+"""
+スタイルシート
+Shared Qt stylesheets for the application, parsed once per window.
+"""
+
+MAIN_STYLESHEET = """
+QMainWindow, QWidget {
+    background-color: #1a1a1a;
+    color: #ffffff;
+    font-family: 'Inter', 'Noto Sans', 'Arial', 'Helvetica', sans-serif;
+}
+QGroupBox {
+    border: 1px solid #3a3a3a;
+    border-radius: 5px;
+    margin-top: 10px;
+    font-weight: bold;
+    color: #ffffff;
+}
+QGroupBox::title {
+    subcontrol-origin: margin;
+    left: 10px;
+    padding: 0 5px 0 5px;
+}
+QTabWidget::pane {
+    border: 1px solid #3a3a3a;
+    border-radius: 5px;
+}
+QTabBar::tab {
+    background-color: #2a2a2a;
+    color: #cccccc;
+    border: 1px solid #3a3a3a;
+    border-bottom: none;
+    border-top-left-radius: 5px;
+    border-top-right-radius: 5px;
+    padding: 5px 10px;
+    min-width: 50px;
+}
+QTabBar::tab:selected {
+    background-color: #1a1a1a;
+    color: #ffd900;
+    border-bottom: none;
+}
+QLineEdit, QSpinBox {
+    background-color: #2a2a2a;
+    color: #ffffff;
+    border: 1px solid #3a3a3a;
+    border-radius: 3px;
+    padding: 5px;
+}
+QPushButton {
+    background-color: #2a2a2a;
+    color: #ffffff;
+    border: 1px solid #3a3a3a;
+    border-radius: 3px;
+    padding: 5px 10px;
+}
+QPushButton:hover {
+    background-color: #3a3a3a;
+}
+QPushButton:pressed {
+    background-color: #4a4a4a;
+}
+QGroupBox#clapperboard {
+    background-color: #1a1a1a;
+    border: 1px solid #3a3a3a;
+    border-radius: 5px;
+    margin-top: 0px;
+}
+QGroupBox#clapperboard[recording="true"] {
+    border: 2px solid #ffd900;
+}
+QGroupBox#clapperboard QLabel {
+    color: #ffffff;
+    font-family: 'Inter', 'Noto Sans', 'Arial', 'Helvetica', sans-serif;
+}
+"""
+
+REC_BUTTON_STYLESHEET = """
+QPushButton {
+    background-color: #ff0000;
+    color: white;
+    font-weight: bold;
+    border-radius: 5px;
+    min-height: 50px;
+    font-size: 16px;
+    border: 2px solid #ffffff;
+}
+QPushButton:pressed {
+    background-color: #aa0000;
+    border: 2px solid #aaaaaa;
+}
+"""
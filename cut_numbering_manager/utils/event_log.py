@@ -0,0 +1,202 @@
+"""
+イベントログ
+Non-blocking application logging: a queue-fed console writer and an in-memory ring buffer of recent events.
+"""
+
+import atexit
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+import time
+from collections import deque
+
+from cut_numbering_manager.config import LOG_LEVEL, LOG_QUEUE_SIZE, LOG_RING_BUFFER_SIZE, LOG_SHUTDOWN_TIMEOUT
+
+LOGGER_NAME = "cut_numbering_manager"
+
+
+def get_logger(name=None):
+    """Logger for a module, under the application's logger"""
+    return logging.getLogger(LOGGER_NAME if name is None else f"{LOGGER_NAME}.{name}")
+
+
+def log_send(logger, label, target, address, payload_size, encode_time, send_time, summary=None):
+    """Log one sent command as a structured record
+    
+    target is "ip:port", payload_size is in bytes, encode_time and send_time
+    are in seconds. The message reads like the console output it replaces.
+    """
+    if not logger.isEnabledFor(logging.INFO):
+        return
+    logger.info("送信 (%s): %s", label, address if summary is None else summary, extra={
+        "target": target,
+        "address": address,
+        "payload_size": payload_size,
+        "encode_time": encode_time,
+        "send_time": send_time
+    })
+
+
+def format_event(record):
+    """One display line for a record, with its send fields when present"""
+    stamp = time.strftime("%H:%M:%S", time.localtime(record.created))
+    line = f"{stamp}.{int(record.msecs):03d} {record.levelname:<7} {record.getMessage()}"
+    if getattr(record, "target", None) is not None:
+        line += (f"  [{record.target} {record.payload_size} B"
+                 f" encode {record.encode_time * 1e6:.1f} µs send {record.send_time * 1e6:.1f} µs]")
+    return line
+
+
+class RingBufferHandler(logging.Handler):
+    """Keeps the last capacity records in memory for the settings tab"""
+    def __init__(self, capacity=LOG_RING_BUFFER_SIZE):
+        super().__init__()
+        self.capacity = capacity
+        self._records = deque(maxlen=capacity)
+        self.total = 0
+    
+    def emit(self, record):
+        """Append a record, dropping the oldest one when full"""
+        self._records.append(record)
+        self.total += 1
+    
+    def records(self):
+        """Snapshot of the buffered records, oldest first"""
+        self.acquire()
+        try:
+            return list(self._records)
+        finally:
+            self.release()
+    
+    def clear(self):
+        """Forget every buffered record"""
+        self.acquire()
+        try:
+            self._records.clear()
+        finally:
+            self.release()
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records instead of blocking or raising when the queue is full"""
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+    
+    def enqueue(self, record):
+        """Queue a record without waiting"""
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class ConsoleHandler(logging.StreamHandler):
+    """StreamHandler that can be abandoned while its writer is stuck in write()
+    
+    logging.shutdown() takes every handler's lock and flushes its stream at
+    exit; an abandoned handler skips both, so a console nobody reads cannot
+    hold the process open.
+    """
+    def __init__(self, stream=None):
+        super().__init__(stream)
+        self.abandoned = False
+    
+    def acquire(self):
+        """Take the handler lock unless abandoned"""
+        if not self.abandoned:
+            super().acquire()
+    
+    def release(self):
+        """Release the handler lock unless abandoned"""
+        if not self.abandoned:
+            super().release()
+    
+    def flush(self):
+        """Flush the stream unless abandoned"""
+        if not self.abandoned:
+            super().flush()
+
+
+class BoundedQueueListener(logging.handlers.QueueListener):
+    """QueueListener whose stop() cannot hang on a full queue or a blocked console
+    
+    With stdout piped to a reader that never reads, the writer thread is
+    stuck in write() and the queue stays full: the stop sentinel is then
+    dropped and the join gives up after timeout seconds. The writer is a
+    daemon thread, so the process still exits.
+    """
+    def enqueue_sentinel(self):
+        """Queue the stop sentinel without waiting"""
+        try:
+            self.queue.put_nowait(self._sentinel)
+        except queue.Full:
+            pass
+    
+    def stop(self, timeout=LOG_SHUTDOWN_TIMEOUT):
+        """Ask the writer thread to finish and wait for it at most timeout seconds
+        
+        Returns False, after abandoning the console handlers, when the
+        writer did not finish in time.
+        """
+        if self._thread is None:
+            return True
+        self.enqueue_sentinel()
+        self._thread.join(timeout)
+        finished = not self._thread.is_alive()
+        self._thread = None
+        if not finished:
+            for handler in self.handlers:
+                if isinstance(handler, ConsoleHandler):
+                    handler.abandoned = True
+        return finished
+
+
+_setup_lock = threading.Lock()
+_listener = None
+_ring_buffer = None
+
+
+def setup_logging(stream=None, level=LOG_LEVEL, capacity=LOG_RING_BUFFER_SIZE):
+    """Attach the ring buffer and the background console writer; returns the ring buffer
+    
+    Records are formatted on the calling thread only as far as QueueHandler
+    needs, then written to stream (stdout by default) by a QueueListener
+    thread, so a slow or unread console never holds up a send. Calling this
+    again returns the existing ring buffer.
+    """
+    global _listener, _ring_buffer
+    with _setup_lock:
+        if _ring_buffer is not None:
+            return _ring_buffer
+        logger = get_logger()
+        logger.setLevel(level)
+        logger.propagate = False
+        
+        _ring_buffer = RingBufferHandler(capacity)
+        logger.addHandler(_ring_buffer)
+        
+        console = ConsoleHandler(sys.stdout if stream is None else stream)
+        console.setFormatter(logging.Formatter("%(message)s"))
+        log_queue = queue.Queue(LOG_QUEUE_SIZE)
+        logger.addHandler(DroppingQueueHandler(log_queue))
+        _listener = BoundedQueueListener(log_queue, console)
+        _listener.start()
+        atexit.register(shutdown_logging)
+        return _ring_buffer
+
+
+def shutdown_logging():
+    """Flush queued console output and stop the writer thread"""
+    global _listener, _ring_buffer
+    with _setup_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+        if _ring_buffer is not None:
+            logger = get_logger()
+            for handler in list(logger.handlers):
+                logger.removeHandler(handler)
+            _ring_buffer = None
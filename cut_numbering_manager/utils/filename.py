@@ -3,29 +3,219 @@
 Utilities for filename generation and handling.
 """
 
+import itertools
+import os
+import re
+import weakref
+from collections import namedtuple
+
 from cut_numbering_manager.models.cut_info import CutInfo
 from cut_numbering_manager.models.filename_config import FilenameConfig
 
 
-def generate_filename(cut_info, element_order=None, prefixes=None):
-    """Generate a filename from cut information"""
-    if prefixes is None:
-        prefixes = cut_info.filename_config.get_all_prefixes()
+class FilenameTemplate:
+    """Filename renderer compiled from an element order and a set of prefixes
+
+    The last rendered value of each field is memoized, so rendering again
+    only re-formats the fields whose source value changed.
+    """
+    def __init__(self, element_order, prefixes, revision=None):
+        self.element_order = tuple(element_order)
+        self.revision = revision
+        self._prefixes = {
+            element: prefixes.get(element, "") for element in FilenameConfig.DEFAULT_ORDER
+        }
+        self._slots = [self.element_order.index(element) if element in self.element_order else None
+                       for element in FilenameConfig.DEFAULT_ORDER]
+        self._sources = [None] * len(FilenameConfig.DEFAULT_ORDER)
+        self._fields = [""] * len(self.element_order)
+        self._filename = None
+
+    def _format(self, element, value):
+        """Format one field exactly like CutInfo's get_formatted_* helpers"""
+        prefix = self._prefixes[element]
+        if element == FilenameConfig.CUT:
+            return f"{prefix}{str(value).zfill(3)}"
+        if element == FilenameConfig.VERSION:
+            return f"{prefix}{str(value).zfill(2)}"
+        return CutInfo.sanitize_filename(f"{prefix}{value}")
+
+    def render(self, part_name, scene_name, cut_number, version):
+        """Render a filename from raw part, scene, cut and version values"""
+        changed = self._filename is None
+        values = (part_name, scene_name, cut_number, version)
+        for i, element in enumerate(FilenameConfig.DEFAULT_ORDER):
+            value = values[i]
+            if value == self._sources[i] and self._filename is not None:
+                continue
+            self._sources[i] = value
+            slot = self._slots[i]
+            if slot is not None:
+                self._fields[slot] = self._format(element, value)
+                changed = True
+        if changed:
+            self._filename = "_".join(self._fields)
+        return self._filename
+
+    def render_cut_info(self, cut_info):
+        """Render a filename from a CutInfo model"""
+        return self.render(cut_info.part_name, cut_info.scene_name,
+                           cut_info.cut_number, cut_info.version)
+
+
+ParsedTake = namedtuple("ParsedTake", ["part_name", "scene_name", "cut_number", "version", "filename"])
+
+
+class FilenameParser:
+    """Reverse of FilenameTemplate: one regex compiled from an element order and prefixes
+    
+    Cut and version accept the zero-padded widths produced by
+    get_formatted_cut_number (3+ digits) and get_formatted_version (2+
+    digits). Part and scene are free text and may contain "_", so a name
+    can sometimes be split more than one way ("Part_A_S1_005_v02" reads as
+    part "Part" and scene "A_S1", or as "Part_A" and "S1"). Such a name is
+    not guessed at: parse returns None for it. Names whose part and scene
+    have no "_" round-trip through generate_filename. One of the
+    per-target suffixes (e.g. "_camA") and a trailing file extension are
+    ignored.
+    """
+    def __init__(self, element_order, prefixes, revision=None, suffixes=()):
+        self.element_order = tuple(element_order)
+        self.revision = revision
+        patterns = {
+            FilenameConfig.PART: r"(?P<part>.+?)",
+            FilenameConfig.SCENE: r"(?P<scene>.+?)",
+            FilenameConfig.CUT: r"(?P<cut>\d{3,})",
+            FilenameConfig.VERSION: r"(?P<version>\d{2,})",
+        }
+        fields = []
+        for element in self.element_order:
+            prefix = prefixes.get(element, "")
+            if element in (FilenameConfig.PART, FilenameConfig.SCENE):
+                prefix = CutInfo.sanitize_filename(prefix)
+            fields.append(re.escape(prefix) + patterns[element])
+        # Longest first, so "_camA2" is not read as "_camA" plus a stray "2"
+        suffixes = sorted({CutInfo.sanitize_filename(suffix) for suffix in suffixes if suffix},
+                          key=len, reverse=True)
+        suffix_pattern = "(?:%s)?" % "|".join(map(re.escape, suffixes)) if suffixes else ""
+        pattern = "^" + "_".join(fields) + suffix_pattern + r"(?:\.[A-Za-z0-9]+)?$"
+        self.pattern = re.compile(pattern)
+        # The same pattern with greedy free-text fields finds the other end of
+        # the possible splits; when both agree the split is unique
+        self._greedy_pattern = re.compile(pattern.replace(".+?)", ".+)"))
     
-    part = CutInfo.sanitize_filename(cut_info.get_formatted_part(prefixes.get(FilenameConfig.PART, "")))
-    scene = CutInfo.sanitize_filename(cut_info.get_formatted_scene(prefixes.get(FilenameConfig.SCENE, "")))
-    cut = cut_info.get_formatted_cut_number(prefixes.get(FilenameConfig.CUT, ""))
-    version = cut_info.get_formatted_version(prefixes.get(FilenameConfig.VERSION, ""))
+    def _take(self, match, filename):
+        """ParsedTake from a lazy match, or None when the split is ambiguous"""
+        part_name, scene_name, cut_number, version = match.group("part", "scene", "cut", "version")
+        # A name without "_" in the free-text fields has only one split
+        if "_" in part_name or "_" in scene_name:
+            greedy = self._greedy_pattern.match(filename)
+            if greedy.group("part", "scene", "cut", "version") != (part_name, scene_name, cut_number, version):
+                return None
+        return ParsedTake(part_name, scene_name, int(cut_number), int(version), filename)
     
-    elements = {
-        FilenameConfig.PART: part,
-        FilenameConfig.SCENE: scene,
-        FilenameConfig.CUT: cut,
-        FilenameConfig.VERSION: version
-    }
+    def parse(self, filename):
+        """Parse a filename into a ParsedTake, or None when it does not match or is ambiguous"""
+        match = self.pattern.match(filename)
+        if match is None:
+            return None
+        return self._take(match, filename)
     
+    def iter_parse(self, filenames):
+        """Yield a ParsedTake for every filename that parses unambiguously, skipping the rest"""
+        match = self.pattern.match
+        for filename in filenames:
+            found = match(filename)
+            if found is not None:
+                take = self._take(found, filename)
+                if take is not None:
+                    yield take
+
+
+_templates = weakref.WeakKeyDictionary()
+_parsers = weakref.WeakKeyDictionary()
+
+
+def get_template(filename_config, element_order=None):
+    """Get the compiled template for a config, rebuilding it when the config's revision changes"""
     if element_order is None:
         element_order = FilenameConfig.DEFAULT_ORDER
-    
-    filename_parts = [elements[element] for element in element_order]
-    return "_".join(filename_parts)
+    order = tuple(element_order)
+    templates = _templates.get(filename_config)
+    if templates is None:
+        templates = _templates[filename_config] = {}
+    template = templates.get(order)
+    if template is None or template.revision != filename_config.revision:
+        template = FilenameTemplate(order, filename_config.get_all_prefixes(), filename_config.revision)
+        templates[order] = template
+    return template
+
+
+def get_parser(filename_config, element_order=None):
+    """Get the compiled parser for a config, rebuilding it when the config's revision changes"""
+    if element_order is None:
+        element_order = FilenameConfig.DEFAULT_ORDER
+    order = tuple(element_order)
+    parsers = _parsers.get(filename_config)
+    if parsers is None:
+        parsers = _parsers[filename_config] = {}
+    parser = parsers.get(order)
+    if parser is None or parser.revision != filename_config.revision:
+        parser = FilenameParser(order, filename_config.get_all_prefixes(), filename_config.revision)
+        parsers[order] = parser
+    return parser
+
+
+def parse_filename(filename, filename_config=None, element_order=None):
+    """Parse one filename back into part, scene, cut and version"""
+    if filename_config is None:
+        filename_config = FilenameConfig()
+    return get_parser(filename_config, element_order).parse(filename)
+
+
+def iter_parse_filenames(filenames, filename_config=None, element_order=None):
+    """Yield a ParsedTake for every matching name in an iterable of filenames"""
+    if filename_config is None:
+        filename_config = FilenameConfig()
+    return get_parser(filename_config, element_order).iter_parse(filenames)
+
+
+def iter_parse_directory(path, filename_config=None, element_order=None):
+    """Yield a ParsedTake for every matching file in a directory listing"""
+    with os.scandir(path) as entries:
+        names = (entry.name for entry in entries if entry.is_file())
+        yield from iter_parse_filenames(names, filename_config, element_order)
+
+
+def generate_filename(cut_info, element_order=None, prefixes=None):
+    """Generate a filename from cut information"""
+    if prefixes is None:
+        template = get_template(cut_info.filename_config, element_order)
+    else:
+        if element_order is None:
+            element_order = FilenameConfig.DEFAULT_ORDER
+        template = FilenameTemplate(element_order, prefixes)
+    return template.render_cut_info(cut_info)
+
+
+def iter_filenames(rows, filename_config=None, element_order=None):
+    """Yield filenames for (part, scene, cut, version) rows using a config's order and prefixes"""
+    if filename_config is None:
+        filename_config = FilenameConfig()
+    if element_order is None:
+        element_order = filename_config.get_element_order()
+    template = FilenameTemplate(element_order, filename_config.get_all_prefixes())
+    render = template.render
+    for part_name, scene_name, cut_number, version in rows:
+        yield render(part_name, scene_name, int(cut_number), int(version))
+
+
+def iter_filename_ranges(parts, scenes, cuts, versions=(1,), filename_config=None, element_order=None):
+    """Yield filenames for every combination of parts, scenes, cuts and versions"""
+    rows = itertools.product(parts, scenes, cuts, versions)
+    return iter_filenames(rows, filename_config, element_order)
+
+
+def generate_filenames(rows, filename_config=None, element_order=None):
+    """Generate a list of filenames for (part, scene, cut, version) rows"""
+    return list(iter_filenames(rows, filename_config, element_order))
@@ -0,0 +1,235 @@
+"""
+レイテンシ計測
+Hot-path latency spans kept in log-linear (HDR-style) histograms, with JSON and Prometheus text export.
+"""
+
+import json
+import os
+import threading
+import time
+
+from cut_numbering_manager.config import METRICS_ENABLED, METRICS_SIGNIFICANT_BITS
+
+# Hot-path stages in the order a REC press goes through them
+STAGES = (
+    "filename",
+    "enqueue",
+    "queue_wait",
+    "sender_lookup",
+    "encode",
+    "sendto",
+    "dispatch",
+    "ui_update",
+    "press_to_packet",
+    "press_to_ui"
+)
+
+
+class LatencyHistogram:
+    """Log-linear histogram of nanosecond values with bounded relative error
+    
+    Values below 2 ** significant_bits are counted exactly; above that each
+    power of two is split into 2 ** (significant_bits - 1) buckets, so a
+    reported percentile is within about 2 ** -(significant_bits - 1) of the
+    true value. Recording is O(1) and memory grows only with the range of
+    values seen, as in HdrHistogram.
+    """
+    def __init__(self, significant_bits=METRICS_SIGNIFICANT_BITS):
+        self.significant_bits = significant_bits
+        self._half = 1 << (significant_bits - 1)
+        self._counts = {}
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+    
+    def _index(self, value):
+        """Bucket index of a value"""
+        shift = value.bit_length() - self.significant_bits
+        if shift <= 0:
+            return value
+        return shift * self._half + (value >> shift)
+    
+    def _highest_equivalent(self, index):
+        """Largest value that falls into a bucket"""
+        shift = max(0, index // self._half - 1)
+        return ((index - shift * self._half + 1) << shift) - 1
+    
+    def record(self, value):
+        """Count one value in nanoseconds"""
+        value = max(0, int(value))
+        index = self._index(value)
+        with self._lock:
+            self._counts[index] = self._counts.get(index, 0) + 1
+            self.count += 1
+            self.total += value
+            if self.max is None or value > self.max:
+                self.max = value
+            if self.min is None or value < self.min:
+                self.min = value
+    
+    def percentile(self, percent):
+        """Value in nanoseconds at or below which percent of the values fall"""
+        with self._lock:
+            if not self.count:
+                return None
+            target = max(1, int(round(self.count * percent / 100.0)))
+            seen = 0
+            for index in sorted(self._counts):
+                seen += self._counts[index]
+                if seen >= target:
+                    return min(self._highest_equivalent(index), self.max)
+            return self.max
+    
+    def mean(self):
+        """Mean value in nanoseconds"""
+        return self.total / self.count if self.count else None
+    
+    def reset(self):
+        """Forget every recorded value"""
+        with self._lock:
+            self._counts.clear()
+            self.count = 0
+            self.total = 0
+            self.min = None
+            self.max = None
+    
+    def summary(self):
+        """count, p50, p99, max, min and mean in seconds"""
+        def seconds(value):
+            return None if value is None else value / 1e9
+        return {
+            "count": self.count,
+            "p50": seconds(self.percentile(50)),
+            "p99": seconds(self.percentile(99)),
+            "max": seconds(self.max),
+            "min": seconds(self.min),
+            "mean": seconds(self.mean())
+        }
+
+
+class LatencyMetrics:
+    """Named latency histograms for the press-to-packet path
+    
+    Spans are taken with start() and stop(name, started) on perf_counter.
+    While disabled, start() returns None and stop() and record() return
+    at once, so instrumented code pays for one attribute check per span.
+    """
+    def __init__(self, enabled=METRICS_ENABLED):
+        self.enabled = enabled
+        self._histograms = {}
+        self._lock = threading.Lock()
+    
+    def set_enabled(self, enabled):
+        """Turn recording on or off"""
+        self.enabled = bool(enabled)
+    
+    def start(self):
+        """Start a span; returns a token for stop()"""
+        return time.perf_counter() if self.enabled else None
+    
+    def stop(self, name, started):
+        """End a span started with start()"""
+        if started is not None and self.enabled:
+            self.record(name, time.perf_counter() - started)
+    
+    def record(self, name, seconds):
+        """Record an already measured duration in seconds"""
+        if not self.enabled:
+            return
+        histogram = self._histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(name, LatencyHistogram())
+        histogram.record(seconds * 1e9)
+    
+    def histogram(self, name):
+        """Histogram for a stage, or None if nothing was recorded"""
+        return self._histograms.get(name)
+    
+    def names(self):
+        """Recorded stage names, known stages first in path order"""
+        names = list(self._histograms)
+        known = [name for name in STAGES if name in self._histograms]
+        return known + sorted(name for name in names if name not in STAGES)
+    
+    def reset(self):
+        """Forget every recorded span"""
+        with self._lock:
+            self._histograms.clear()
+    
+    def snapshot(self):
+        """Summary of every stage in seconds, keyed by stage name"""
+        return {name: self._histograms[name].summary() for name in self.names()}
+    
+    def to_json(self):
+        """JSON document with every stage summary"""
+        return json.dumps({
+            "generated_at": time.time(),
+            "unit": "seconds",
+            "stages": self.snapshot()
+        }, indent=2)
+    
+    def to_prometheus(self, prefix="cut_numbering_manager"):
+        """Prometheus text exposition of every stage as a summary plus a max gauge"""
+        name = f"{prefix}_stage_latency_seconds"
+        lines = [
+            f"# HELP {name} Latency of each stage of the REC/STOP hot path.",
+            f"# TYPE {name} summary"
+        ]
+        max_lines = [
+            f"# HELP {name}_max Largest observed latency of each stage.",
+            f"# TYPE {name}_max gauge"
+        ]
+        for stage, summary in self.snapshot().items():
+            if not summary["count"]:
+                continue
+            for quantile, key in (("0.5", "p50"), ("0.99", "p99")):
+                lines.append(f'{name}{{stage="{stage}",quantile="{quantile}"}} {summary[key]:.9f}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {summary["mean"] * summary["count"]:.9f}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {summary["count"]}')
+            max_lines.append(f'{name}_max{{stage="{stage}"}} {summary["max"]:.9f}')
+        return "\n".join(lines + max_lines) + "\n"
+    
+    def export_json(self, path):
+        """Write the JSON document to path"""
+        _write_atomic(path, self.to_json())
+    
+    def export_prometheus(self, path):
+        """Write the Prometheus text file to path, replacing it atomically for the textfile collector"""
+        _write_atomic(path, self.to_prometheus())
+    
+    def readout(self):
+        """Compact text table of p50 / p99 / max per stage"""
+        lines = [f"{'stage':<16}{'p50':>10}{'p99':>10}{'max':>10}{'n':>8}"]
+        for stage, summary in self.snapshot().items():
+            lines.append(f"{stage:<16}{format_duration(summary['p50']):>10}"
+                         f"{format_duration(summary['p99']):>10}{format_duration(summary['max']):>10}"
+                         f"{summary['count']:>8}")
+        return "\n".join(lines)
+
+
+def format_duration(seconds):
+    """Short human-readable duration"""
+    if seconds is None:
+        return "-"
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.1f}µs"
+    if seconds < 1:
+        return f"{seconds * 1e3:.2f}ms"
+    return f"{seconds:.2f}s"
+
+
+def _write_atomic(path, text):
+    """Write text through a temporary file and rename it into place"""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(temp_path, path)
+
+
+# Process-wide registry shared by the GUI, the OSC worker and the senders
+METRICS = LatencyMetrics()
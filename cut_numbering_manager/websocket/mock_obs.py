@@ -0,0 +1,246 @@
+"""
+OBS WebSocket代替サーバー
+Local stand-in for the obs-websocket 4.9.1 server, used for tests and latency benchmarks.
+"""
+
+import base64
+import json
+import os
+import queue
+import socket
+import socketserver
+import threading
+import time
+
+from cut_numbering_manager.config import DEFAULT_IP
+from cut_numbering_manager.websocket.obs_client import (
+    EVENT_RECORDING_STARTED,
+    EVENT_RECORDING_STOPPED,
+    authentication_response
+)
+from cut_numbering_manager.websocket.protocol import (
+    OP_CLOSE,
+    OP_PING,
+    OP_PONG,
+    OP_TEXT,
+    encode_frame,
+    read_message,
+    server_handshake
+)
+
+
+class _MockOBSHandler(socketserver.StreamRequestHandler):
+    """One WebSocket connection to the mock server"""
+    def setup(self):
+        super().setup()
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.authenticated = not self.server.mock.password
+        self.challenge = base64.b64encode(os.urandom(32)).decode("ascii")
+        self.write_lock = threading.Lock()
+    
+    def handle(self):
+        """Read requests and queue their responses for the writer thread"""
+        try:
+            server_handshake(self.rfile, self.wfile)
+        except OSError:
+            return
+        mock = self.server.mock
+        mock.add_connection(self)
+        responses = queue.Queue()
+        writer = threading.Thread(target=self._write_responses, args=(responses,),
+                                  name="mock-obs-websocket-writer", daemon=True)
+        writer.start()
+        try:
+            while True:
+                opcode, payload = read_message(self.rfile, self._on_control)
+                if opcode == OP_CLOSE:
+                    self.send_frame(OP_CLOSE, b"")
+                    break
+                if opcode != OP_TEXT:
+                    continue
+                send_at = time.monotonic() + mock.response_delay
+                request = json.loads(payload.decode("utf-8"))
+                responses.put((send_at, request, mock.handle_request(self, request)))
+        except (OSError, ValueError):
+            pass
+        finally:
+            responses.put(None)
+            writer.join(1.0)
+            mock.remove_connection(self)
+    
+    def _write_responses(self, responses):
+        """Send each response once its delay has passed, in request order"""
+        mock = self.server.mock
+        while True:
+            item = responses.get()
+            if item is None:
+                return
+            send_at, request, response = item
+            delay = send_at - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            try:
+                self.send_json(response)
+            except OSError:
+                return
+            mock.after_response(request, response)
+    
+    def _on_control(self, opcode, payload):
+        """Answer pings from the client"""
+        if opcode == OP_PING:
+            self.send_frame(OP_PONG, payload)
+    
+    def send_frame(self, opcode, payload):
+        """Write one unmasked frame"""
+        with self.write_lock:
+            self.wfile.write(encode_frame(opcode, payload, mask=False))
+            self.wfile.flush()
+    
+    def send_json(self, message):
+        """Write a JSON text message"""
+        self.send_frame(OP_TEXT, json.dumps(message).encode("utf-8"))
+
+
+class _MockOBSServer(socketserver.ThreadingTCPServer):
+    """TCP server bound to a MockOBSWebSocket"""
+    daemon_threads = True
+    allow_reuse_address = True
+    
+    def __init__(self, address, mock):
+        self.mock = mock
+        super().__init__(address, _MockOBSHandler)
+
+
+class MockOBSWebSocket:
+    """Answers the obs-websocket 4.9.1 requests the app uses and emits recording events
+    
+    Supports GetVersion, GetAuthRequired, Authenticate, SetFilenameFormatting,
+    GetFilenameFormatting, StartRecording, StopRecording and
+    GetRecordingStatus. Every request is logged in requests as
+    (monotonic time, request-type). response_delay holds each response
+    until that many seconds after its request arrived, to model the round
+    trip to a remote machine; pipelined requests wait out the delay together.
+    on_recording(state, filename) is called whenever recording starts or stops.
+    """
+    def __init__(self, ip=DEFAULT_IP, port=0, password="", response_delay=0.0, on_recording=None):
+        self.ip = ip
+        self.port = port
+        self.password = password
+        self.response_delay = response_delay
+        self.on_recording = on_recording
+        self.salt = base64.b64encode(os.urandom(32)).decode("ascii")
+        self.recording = False
+        self.filename_formatting = "%CCYY-%MM-%DD %hh-%mm-%ss"
+        self.requests = []
+        self._connections = []
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+    
+    def start(self):
+        """Bind the listening socket and serve on a background thread"""
+        self._server = _MockOBSServer((self.ip, self.port), self)
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        name="mock-obs-websocket", daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        """Stop serving and drop every connection"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        with self._lock:
+            connections = list(self._connections)
+        for connection in connections:
+            try:
+                connection.send_frame(OP_CLOSE, b"")
+            except OSError:
+                pass
+        if self._thread is not None:
+            self._thread.join(1.0)
+            self._thread = None
+    
+    def add_connection(self, connection):
+        """Track an open connection for event broadcasts"""
+        with self._lock:
+            self._connections.append(connection)
+    
+    def remove_connection(self, connection):
+        """Forget a closed connection"""
+        with self._lock:
+            if connection in self._connections:
+                self._connections.remove(connection)
+    
+    def connection_count(self):
+        """Number of open client connections"""
+        with self._lock:
+            return len(self._connections)
+    
+    def broadcast(self, update_type, **fields):
+        """Send an update event to every authenticated connection"""
+        event = {"update-type": update_type}
+        event.update(fields)
+        with self._lock:
+            connections = [connection for connection in self._connections if connection.authenticated]
+        for connection in connections:
+            try:
+                connection.send_json(event)
+            except OSError:
+                pass
+    
+    def handle_request(self, connection, request):
+        """Build the response for one request"""
+        request_type = request.get("request-type")
+        self.requests.append((time.monotonic(), request_type))
+        response = {"message-id": request.get("message-id"), "status": "ok"}
+        
+        if request_type == "GetVersion":
+            response.update({"obs-websocket-version": "4.9.1", "obs-studio-version": "27.2.4"})
+        elif request_type == "GetAuthRequired":
+            response["authRequired"] = bool(self.password)
+            if self.password:
+                response.update({"challenge": connection.challenge, "salt": self.salt})
+        elif request_type == "Authenticate":
+            expected = authentication_response(self.password, self.salt, connection.challenge)
+            if request.get("auth") == expected:
+                connection.authenticated = True
+            else:
+                response.update({"status": "error", "error": "Authentication Failed."})
+        elif not connection.authenticated:
+            response.update({"status": "error", "error": "Not Authenticated"})
+        elif request_type == "SetFilenameFormatting":
+            self.filename_formatting = request.get("filename-formatting", "")
+        elif request_type == "GetFilenameFormatting":
+            response["filename-formatting"] = self.filename_formatting
+        elif request_type == "StartRecording":
+            if self.recording:
+                response.update({"status": "error", "error": "recording already active"})
+            else:
+                self.recording = True
+                if self.on_recording:
+                    self.on_recording(True, self.filename_formatting)
+        elif request_type == "StopRecording":
+            if not self.recording:
+                response.update({"status": "error", "error": "recording not active"})
+            else:
+                self.recording = False
+                if self.on_recording:
+                    self.on_recording(False, self.filename_formatting)
+        elif request_type == "GetRecordingStatus":
+            response.update({"isRecording": self.recording, "isRecordingPaused": False})
+        else:
+            response.update({"status": "error", "error": "invalid request type"})
+        return response
+    
+    def after_response(self, request, response):
+        """Emit the recording events that follow a successful start or stop"""
+        if response.get("status") != "ok":
+            return
+        request_type = request.get("request-type")
+        if request_type == "StartRecording":
+            self.broadcast(EVENT_RECORDING_STARTED, **{"recordingFilename": self.filename_formatting})
+        elif request_type == "StopRecording":
+            self.broadcast(EVENT_RECORDING_STOPPED, **{"recordingFilename": self.filename_formatting})
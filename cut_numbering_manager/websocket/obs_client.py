@@ -0,0 +1,313 @@
+"""
+OBS WebSocketクライアント
+Persistent obs-websocket 4.x client and a transport that pools one connection per target.
+"""
+
+import base64
+import hashlib
+import itertools
+import json
+import socket
+import threading
+import time
+
+from cut_numbering_manager.config import (
+    OBS_WEBSOCKET_PASSWORD,
+    OBS_WEBSOCKET_TIMEOUT
+)
+from cut_numbering_manager.utils.event_log import get_logger, log_send
+from cut_numbering_manager.websocket.protocol import (
+    OP_CLOSE,
+    OP_PING,
+    OP_PONG,
+    OP_TEXT,
+    WebSocketError,
+    client_handshake,
+    encode_frame,
+    read_message
+)
+
+logger = get_logger("websocket")
+
+EVENT_RECORDING_STARTED = "RecordingStarted"
+EVENT_RECORDING_STOPPED = "RecordingStopped"
+
+
+def authentication_response(password, salt, challenge):
+    """obs-websocket 4.x auth string: base64(sha256(base64(sha256(password + salt)) + challenge))"""
+    secret = base64.b64encode(hashlib.sha256((password + salt).encode("utf-8")).digest())
+    return base64.b64encode(hashlib.sha256(secret + challenge.encode("utf-8")).digest()).decode("ascii")
+
+
+class PendingRequest:
+    """A request whose response has not arrived yet"""
+    def __init__(self, message_id, request_type):
+        self.message_id = message_id
+        self.request_type = request_type
+        self.sent_at = time.perf_counter()
+        self.response = None
+        self.latency = None
+        self._event = threading.Event()
+    
+    def resolve(self, response):
+        """Store the response and wake waiters"""
+        self.response = response
+        self.latency = time.perf_counter() - self.sent_at
+        self._event.set()
+    
+    def wait(self, timeout):
+        """Wait for the response; returns it or None on timeout"""
+        self._event.wait(timeout)
+        return self.response
+    
+    @property
+    def ok(self):
+        """Whether the server answered with status ok"""
+        return self.response is not None and self.response.get("status") == "ok"
+
+
+class OBSWebSocketClient:
+    """One authenticated obs-websocket 4.x connection with request pipelining
+    
+    Requests are tagged with a message-id and written without waiting for
+    earlier answers; a reader thread matches responses to requests and
+    passes update events to on_event.
+    """
+    def __init__(self, host, port, password=OBS_WEBSOCKET_PASSWORD, on_event=None,
+                 timeout=OBS_WEBSOCKET_TIMEOUT):
+        self.host = host
+        self.port = port
+        self.password = password
+        self.on_event = on_event
+        self.timeout = timeout
+        self._sock = None
+        self._stream = None
+        self._thread = None
+        self._ids = itertools.count(1)
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self._closed = True
+    
+    @property
+    def connected(self):
+        """Whether the connection is open"""
+        return not self._closed
+    
+    def connect(self):
+        """Open the connection, start the reader and authenticate if the server asks for it"""
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        stream = sock.makefile("rb")
+        try:
+            client_handshake(sock, stream, self.host, self.port)
+        except OSError:
+            stream.close()
+            sock.close()
+            raise
+        sock.settimeout(None)
+        self._sock = sock
+        self._stream = stream
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="obs-websocket-reader", daemon=True)
+        self._thread.start()
+        self._authenticate()
+        return self
+    
+    def _authenticate(self):
+        """Run the GetAuthRequired / Authenticate exchange"""
+        auth = self.call("GetAuthRequired")
+        if not auth.get("authRequired"):
+            return
+        response = self.call("Authenticate", auth=authentication_response(
+            self.password, auth.get("salt", ""), auth.get("challenge", "")))
+        if response.get("status") != "ok":
+            self.close()
+            raise WebSocketError(f"authentication failed: {response.get('error')}")
+    
+    def send_requests(self, requests):
+        """Write several (request_type, fields) requests in one go; returns PendingRequest objects"""
+        if self._closed:
+            raise WebSocketError("not connected")
+        started = time.perf_counter()
+        pendings = []
+        frames = []
+        with self._lock:
+            for request_type, fields in requests:
+                message_id = str(next(self._ids))
+                pending = PendingRequest(message_id, request_type)
+                self._pending[message_id] = pending
+                pendings.append(pending)
+                message = {"request-type": request_type, "message-id": message_id}
+                message.update(fields)
+                frames.append(encode_frame(OP_TEXT, json.dumps(message).encode("utf-8")))
+        payload = b"".join(frames)
+        encoded = time.perf_counter()
+        try:
+            with self._send_lock:
+                self._sock.sendall(payload)
+        except OSError:
+            self.close()
+            raise
+        summary = ", ".join(request_type for request_type, _ in requests)
+        log_send(logger, "OBS WebSocket", f"{self.host}:{self.port}", requests[-1][0], len(payload),
+                 encoded - started, time.perf_counter() - encoded, summary)
+        return pendings
+    
+    def wait_all(self, pendings, timeout=None):
+        """Wait for every pending request; returns their responses (None where timed out)"""
+        deadline = time.perf_counter() + (self.timeout if timeout is None else timeout)
+        return [pending.wait(max(0.0, deadline - time.perf_counter())) for pending in pendings]
+    
+    def call(self, request_type, **fields):
+        """Send one request and wait for its response"""
+        pending = self.send_requests([(request_type, fields)])[0]
+        response = pending.wait(self.timeout)
+        if response is None:
+            raise WebSocketError(f"{request_type} timed out")
+        return response
+    
+    def close(self):
+        """Close the connection and fail pending requests"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            pendings = list(self._pending.values())
+            self._pending.clear()
+        try:
+            with self._send_lock:
+                self._sock.sendall(encode_frame(OP_CLOSE, b""))
+        except OSError:
+            pass
+        try:
+            self._sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._sock.close()
+        for pending in pendings:
+            pending.resolve({"status": "error", "error": "connection closed"})
+    
+    def _on_control(self, opcode, payload):
+        """Answer pings from the server"""
+        if opcode == OP_PING:
+            with self._send_lock:
+                self._sock.sendall(encode_frame(OP_PONG, payload))
+    
+    def _run(self):
+        """Reader loop: resolve responses and deliver events"""
+        try:
+            while True:
+                opcode, payload = read_message(self._stream, self._on_control)
+                if opcode == OP_CLOSE:
+                    break
+                if opcode != OP_TEXT:
+                    continue
+                message = json.loads(payload.decode("utf-8"))
+                message_id = message.get("message-id")
+                if message_id is not None:
+                    with self._lock:
+                        pending = self._pending.pop(message_id, None)
+                    if pending is not None:
+                        pending.resolve(message)
+                elif "update-type" in message and self.on_event:
+                    self.on_event(self, message)
+        except (OSError, ValueError):
+            pass
+        finally:
+            self._stream.close()
+            self.close()
+
+
+class OBSWebSocketTransport:
+    """Pool of persistent obs-websocket connections keyed by (host, port)
+    
+    Each command is one pipelined write: SetFilenameFormatting and
+    StartRecording go out together and the server's responses are the
+    success signal. RecordingStarted / RecordingStopped events are passed
+    to on_state(state, rtt) with the time since the matching command.
+    """
+    def __init__(self, password=OBS_WEBSOCKET_PASSWORD, on_state=None, timeout=OBS_WEBSOCKET_TIMEOUT):
+        self.password = password
+        self.on_state = on_state
+        self.timeout = timeout
+        self._clients = {}
+        self._requested_at = {}
+        self._lock = threading.Lock()
+    
+    def get_client(self, host, port):
+        """Get the connection for a target, (re)connecting when needed"""
+        key = (host, int(port))
+        with self._lock:
+            client = self._clients.get(key)
+            if client is not None and client.connected:
+                return client
+            client = OBSWebSocketClient(host, int(port), self.password, self._on_event, self.timeout)
+            self._clients[key] = client
+        return client.connect()
+    
+    def start_recording(self, host, port, filename):
+        """Set the filename and start recording with one pipelined write"""
+        return self._send(host, port, True, [
+            ("SetFilenameFormatting", {"filename-formatting": filename}),
+            ("StartRecording", {})
+        ])
+    
+    def stop_recording(self, host, port):
+        """Stop recording"""
+        return self._send(host, port, False, [("StopRecording", {})])
+    
+    def _send(self, host, port, state, requests):
+        """Send pipelined requests and report whether every response was ok"""
+        client = self.get_client(host, port)
+        # Keyed by target rather than client, so a replaced connection leaves nothing behind
+        key = (client.host, client.port, state)
+        self._requested_at[key] = time.monotonic()
+        try:
+            pendings = client.send_requests(requests)
+        except OSError:
+            self._requested_at.pop(key, None)
+            raise
+        responses = client.wait_all(pendings)
+        for pending, response in zip(pendings, responses):
+            if response is None:
+                logger.error("エラー: %s の応答がありません", pending.request_type)
+                self._requested_at.pop(key, None)
+                return False
+            if response.get("status") != "ok":
+                logger.error("エラー: %s: %s", pending.request_type, response.get("error"))
+                self._requested_at.pop(key, None)
+                return False
+        return True
+    
+    def _on_event(self, client, message):
+        """Turn recording events into on_state calls (runs on a reader thread)"""
+        update_type = message.get("update-type")
+        if update_type not in (EVENT_RECORDING_STARTED, EVENT_RECORDING_STOPPED):
+            return
+        state = update_type == EVENT_RECORDING_STARTED
+        requested_at = self._requested_at.pop((client.host, client.port, state), None)
+        rtt = None if requested_at is None else time.monotonic() - requested_at
+        if self.on_state:
+            self.on_state(state, rtt)
+    
+    def retain(self, targets):
+        """Close every connection whose (host, port) is not in targets"""
+        keep = {(host, int(port)) for host, port in targets}
+        with self._lock:
+            stale = [key for key in self._clients if key not in keep]
+            clients = [self._clients.pop(key) for key in stale]
+        for key in list(self._requested_at):
+            if key[:2] not in keep:
+                self._requested_at.pop(key, None)
+        for client in clients:
+            client.close()
+    
+    def close(self):
+        """Close every connection"""
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+        self._requested_at.clear()
+        for client in clients:
+            client.close()
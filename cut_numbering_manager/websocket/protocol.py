@@ -0,0 +1,162 @@
+"""
+WebSocketプロトコル
+Minimal RFC 6455 framing and handshake helpers shared by the client and the mock server.
+"""
+
+import base64
+import hashlib
+import os
+import struct
+
+WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+OP_CONTINUATION = 0x0
+OP_TEXT = 0x1
+OP_BINARY = 0x2
+OP_CLOSE = 0x8
+OP_PING = 0x9
+OP_PONG = 0xA
+
+MAX_PAYLOAD = 16 * 1024 * 1024
+
+
+class WebSocketError(OSError):
+    """Protocol violation or closed WebSocket connection"""
+
+
+def accept_key(key):
+    """Sec-WebSocket-Accept value for a Sec-WebSocket-Key"""
+    digest = hashlib.sha1((key + WEBSOCKET_GUID).encode("ascii")).digest()
+    return base64.b64encode(digest).decode("ascii")
+
+
+def apply_mask(payload, mask):
+    """XOR a payload with a 4-byte masking key"""
+    if not payload:
+        return payload
+    length = len(payload)
+    key = (mask * (length // 4 + 1))[:length]
+    return (int.from_bytes(payload, "big") ^ int.from_bytes(key, "big")).to_bytes(length, "big")
+
+
+def encode_frame(opcode, payload, mask=True):
+    """Encode one final frame; clients must mask, servers must not"""
+    length = len(payload)
+    header = bytearray([0x80 | opcode])
+    mask_bit = 0x80 if mask else 0
+    if length < 126:
+        header.append(mask_bit | length)
+    elif length < 1 << 16:
+        header.append(mask_bit | 126)
+        header += struct.pack("!H", length)
+    else:
+        header.append(mask_bit | 127)
+        header += struct.pack("!Q", length)
+    if mask:
+        key = os.urandom(4)
+        return bytes(header) + key + apply_mask(payload, key)
+    return bytes(header) + payload
+
+
+def read_exact(stream, count):
+    """Read exactly count bytes from a buffered stream"""
+    data = stream.read(count)
+    if data is None or len(data) < count:
+        raise WebSocketError("connection closed")
+    return data
+
+
+def read_frame(stream):
+    """Read one frame and return (fin, opcode, unmasked payload)"""
+    first, second = read_exact(stream, 2)
+    fin = bool(first & 0x80)
+    opcode = first & 0x0F
+    length = second & 0x7F
+    if length == 126:
+        length = struct.unpack("!H", read_exact(stream, 2))[0]
+    elif length == 127:
+        length = struct.unpack("!Q", read_exact(stream, 8))[0]
+    if length > MAX_PAYLOAD:
+        raise WebSocketError(f"frame too large: {length} bytes")
+    mask = read_exact(stream, 4) if second & 0x80 else None
+    payload = read_exact(stream, length) if length else b""
+    if mask is not None:
+        payload = apply_mask(payload, mask)
+    return fin, opcode, payload
+
+
+def read_message(stream, on_control=None):
+    """Read frames until a complete data message; returns (opcode, payload)
+    
+    Control frames met on the way are handed to on_control(opcode, payload);
+    a close frame ends the read with (OP_CLOSE, payload).
+    """
+    parts = []
+    message_opcode = None
+    while True:
+        fin, opcode, payload = read_frame(stream)
+        if opcode >= OP_CLOSE:
+            if opcode == OP_CLOSE:
+                return OP_CLOSE, payload
+            if on_control:
+                on_control(opcode, payload)
+            continue
+        if opcode != OP_CONTINUATION:
+            message_opcode = opcode
+        parts.append(payload)
+        if fin:
+            return message_opcode, b"".join(parts)
+
+
+def read_http_head(stream):
+    """Read an HTTP request or response head; returns (start line, headers dict)"""
+    start_line = stream.readline(8192).decode("latin-1").strip()
+    if not start_line:
+        raise WebSocketError("connection closed during handshake")
+    headers = {}
+    while True:
+        line = stream.readline(8192).decode("latin-1")
+        if line in ("\r\n", "\n", ""):
+            break
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+    return start_line, headers
+
+
+def client_handshake(sock, stream, host, port, path="/"):
+    """Send the opening handshake and check the server's answer"""
+    key = base64.b64encode(os.urandom(16)).decode("ascii")
+    request = (
+        f"GET {path} HTTP/1.1\r\n"
+        f"Host: {host}:{port}\r\n"
+        "Upgrade: websocket\r\n"
+        "Connection: Upgrade\r\n"
+        f"Sec-WebSocket-Key: {key}\r\n"
+        "Sec-WebSocket-Version: 13\r\n"
+        "\r\n"
+    )
+    sock.sendall(request.encode("ascii"))
+    status_line, headers = read_http_head(stream)
+    if " 101 " not in f"{status_line} ":
+        raise WebSocketError(f"handshake rejected: {status_line}")
+    if headers.get("sec-websocket-accept") != accept_key(key):
+        raise WebSocketError("handshake failed: bad Sec-WebSocket-Accept")
+
+
+def server_handshake(stream, wfile):
+    """Answer a client's opening handshake; returns the request headers"""
+    _, headers = read_http_head(stream)
+    key = headers.get("sec-websocket-key")
+    if headers.get("upgrade", "").lower() != "websocket" or not key:
+        wfile.write(b"HTTP/1.1 400 Bad Request\r\n\r\n")
+        raise WebSocketError("not a WebSocket upgrade request")
+    response = (
+        "HTTP/1.1 101 Switching Protocols\r\n"
+        "Upgrade: websocket\r\n"
+        "Connection: Upgrade\r\n"
+        f"Sec-WebSocket-Accept: {accept_key(key)}\r\n"
+        "\r\n"
+    )
+    wfile.write(response.encode("ascii"))
+    wfile.flush()
+    return headers
@@ -3,21 +3,55 @@
 Entry point for the application.
 """
 
+import time
+
+STARTED_AT = time.perf_counter()
+
+import argparse
 import sys
 import os
 
 os.environ["QT_LOGGING_RULES"] = "qt5ct.debug=false"
 
-from PyQt5.QtWidgets import QApplication
-from cut_numbering_manager.ui.main_window import MainWindow
 
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="カット番号管理システム")
+    parser.add_argument("--headless", action="store_true",
+                        help="GUIを使わず標準入力またはコントロールソケットから操作します")
+    parser.add_argument("--control-port", type=int,
+                        help="ヘッドレスモードで使うTCPコントロールポート")
+    parser.add_argument("--ip", help="OSC送信先IPアドレス")
+    parser.add_argument("--port", type=int, help="OSC送信先ポート")
+    args, _ = parser.parse_known_args(argv)
+    return args
 
-def main():
-    """Main entry point for the application"""
+
+def run_gui():
+    """Run the desktop application"""
+    from PyQt5.QtWidgets import QApplication
+    from cut_numbering_manager.ui.main_window import MainWindow
+    
     app = QApplication(sys.argv)
     window = MainWindow()
     window.show()
-    sys.exit(app.exec_())
+    return app.exec_()
+
+
+def main():
+    """Main entry point for the application"""
+    args = parse_args()
+    if args.headless:
+        from cut_numbering_manager.config import DEFAULT_IP, DEFAULT_PORT
+        from cut_numbering_manager.headless import run_headless
+        
+        sys.exit(run_headless(
+            args.ip or DEFAULT_IP,
+            args.port or DEFAULT_PORT,
+            args.control_port,
+            STARTED_AT
+        ))
+    sys.exit(run_gui())
 
 
 if __name__ == "__main__":
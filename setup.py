@@ -8,9 +8,13 @@ setup(
         "PyQt5>=5.15.0",
         "python-osc>=1.8.0",
     ],
+    extras_require={
+        "xlsx": ["openpyxl"],
+    },
     entry_points={
         "console_scripts": [
             "cut-numbering-manager=main:main",
+            "cut-numbering-tools=cut_numbering_manager.cli:main",
         ],
     },
     python_requires=">=3.6",
@@ -0,0 +1,17 @@
+"""
+テスト設定
+Keep tests away from the user's journal, settings and display.
+"""
+
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Set before any cut_numbering_manager module reads them at import time
+_HOME = tempfile.mkdtemp(prefix="cut_numbering_tests_")
+os.environ["HOME"] = _HOME
+os.environ["CUT_NUMBERING_JOURNAL"] = os.path.join(_HOME, "takes.sqlite3")
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
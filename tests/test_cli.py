@@ -0,0 +1,27 @@
+"""
+コマンドラインツールのテスト
+cut-numbering-tools table input.
+"""
+
+import io
+
+from cut_numbering_manager import cli
+
+
+def test_table_rows_default_the_version():
+    stream = io.StringIO("part,scene,cut,version\nP1,S1,5\nP1,S1,5,3\n")
+    assert list(cli.iter_table_rows(stream)) == [("P1", "S1", "5", 1), ("P1", "S1", "5", "3")]
+
+
+def test_only_the_first_row_is_a_header():
+    stream = io.StringIO("part,scene,cut\nPart,S1,1,1\nP2,S1,2,1\n")
+    assert [row[0] for row in cli.iter_table_rows(stream)] == ["Part", "P2"]
+
+
+def test_short_table_row_reports_its_line(tmp_path, capsys):
+    table = tmp_path / "shots.csv"
+    table.write_text("part,scene,cut\nP1,S1,1\na,b\n", encoding="utf-8")
+    assert cli.main(["filenames", "--table", str(table)]) == 1
+    out, err = capsys.readouterr()
+    assert out == "P1_S1_001_v01\n"
+    assert err.startswith("エラー: 3行目")
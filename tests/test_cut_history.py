@@ -0,0 +1,94 @@
+"""
+カット情報履歴のテスト
+CutInfoHistory steps, merging, redo and the history cap.
+"""
+
+import pytest
+
+from cut_numbering_manager.models import cut_history
+from cut_numbering_manager.models.cut_history import CutInfoHistory
+from cut_numbering_manager.models.cut_info import CutInfo
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A monotonic clock the test moves by hand"""
+    now = [1000.0]
+    monkeypatch.setattr(cut_history.time, "monotonic", lambda: now[0])
+    return now
+
+
+def state(cut_info):
+    """Numbering fields of a CutInfo"""
+    return cut_info.part_name, cut_info.scene_name, cut_info.cut_number, cut_info.version
+
+
+def test_each_stop_is_one_step(clock):
+    cut_info = CutInfo()
+    history = CutInfoHistory(cut_info)
+    start = state(cut_info)
+    cut_info.increment_cut()
+    cut_info.increment_cut()
+    assert len(history) == 2
+    history.undo()
+    assert cut_info.cut_number == start[2] + 1
+    history.undo()
+    assert state(cut_info) == start
+    assert history.undo() is None
+
+
+def test_text_edits_within_merge_interval_are_one_step(clock):
+    cut_info = CutInfo()
+    history = CutInfoHistory(cut_info, merge_interval=1.0)
+    start = state(cut_info)
+    for name in ("P", "Pa", "Par"):
+        cut_info.part_name = name
+        clock[0] += 0.5
+    assert len(history) == 1
+    clock[0] += 1.0
+    cut_info.part_name = "Part"
+    assert len(history) == 2
+    # A different field is a new step even within the interval
+    cut_info.scene_name = "S"
+    assert len(history) == 3
+    history.undo()
+    history.undo()
+    assert cut_info.part_name == "Par"
+    history.undo()
+    assert state(cut_info) == start
+
+
+def test_new_edit_clears_redo(clock):
+    cut_info = CutInfo()
+    history = CutInfoHistory(cut_info)
+    cut_info.increment_cut()
+    history.undo()
+    assert history.can_redo()
+    cut_info.increment_version()
+    assert not history.can_redo()
+    assert history.redo() is None
+
+
+def test_restore_is_not_recorded_as_a_step(clock):
+    cut_info = CutInfo()
+    history = CutInfoHistory(cut_info)
+    cut_info.increment_cut()
+    cut_info.increment_cut()
+    after = state(cut_info)
+    history.undo()
+    assert len(history) == 1
+    history.redo()
+    assert len(history) == 2 and not history.can_redo()
+    assert state(cut_info) == after
+    assert history.current == cut_info.snapshot()
+
+
+def test_history_is_capped_at_limit(clock):
+    cut_info = CutInfo()
+    history = CutInfoHistory(cut_info, limit=5)
+    for _ in range(20):
+        cut_info.increment_cut()
+    assert len(history) == 5
+    while history.undo() is not None:
+        pass
+    assert cut_info.cut_number == 16
@@ -0,0 +1,47 @@
+"""
+カット情報モデルのテスト
+CutInfo change notifications and their coalescing under a scheduler.
+"""
+
+from cut_numbering_manager.models.cut_info import CutInfo
+
+
+def deferred():
+    """A CutInfo whose notifications wait in a list until run() is called"""
+    cut_info = CutInfo()
+    pending = []
+    cut_info.set_notify_scheduler(pending.append)
+    
+    def run():
+        while pending:
+            pending.pop(0)()
+    
+    return cut_info, run
+
+
+def test_one_stop_is_one_notification():
+    cut_info, run = deferred()
+    received = []
+    cut_info.subscribe(received.append)
+    cut_info.increment_cut()
+    run()
+    assert cut_info.notification_count == 1
+    assert received == [frozenset((CutInfo.CUT_NUMBER,))]
+
+
+def test_changes_before_the_scheduled_call_are_coalesced():
+    cut_info, run = deferred()
+    cut_info.part_name = "Part2"
+    cut_info.scene_name = "S2"
+    cut_info.increment_cut()
+    run()
+    assert cut_info.notification_count == 1
+    run()
+    assert cut_info.notification_count == 1
+
+
+def test_without_a_scheduler_each_change_notifies():
+    cut_info = CutInfo()
+    cut_info.part_name = "Part2"
+    cut_info.increment_cut()
+    assert cut_info.notification_count == 2
@@ -0,0 +1,169 @@
+"""
+OSCフィードバックのテスト
+OSCFeedbackListener and MainWindow recording confirmation against a FakeOBS peer.
+"""
+
+import threading
+import time
+
+import pytest
+
+from cut_numbering_manager.osc.fake_obs import FakeOBS
+from cut_numbering_manager.osc.feedback import OSCFeedbackListener
+from cut_numbering_manager.osc.sender import CustomOSCSender
+from cut_numbering_manager.config import OSC_PING_TIMEOUT, OSC_RECORDING_COMMAND
+
+TIMEOUT = 2.0
+
+
+def wait_for(condition, timeout=TIMEOUT):
+    """Poll condition() until it holds or timeout seconds pass"""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.001)
+    return True
+
+
+@pytest.fixture
+def peer():
+    """A feedback listener on a free port and a FakeOBS reporting to it"""
+    states = []
+    listener = OSCFeedbackListener(lambda state, rtt: states.append((state, rtt)), ip="127.0.0.1", port=0)
+    listener.start()
+    obs = FakeOBS(feedback_port=listener.port, delay=0.02).start()
+    sender = CustomOSCSender("127.0.0.1", obs.port)
+    yield listener, obs, sender, states
+    sender.close()
+    obs.stop()
+    listener.stop()
+
+
+def test_start_and_stop_are_confirmed(peer):
+    listener, obs, sender, states = peer
+    listener.mark_command_sent(True)
+    assert sender.send_message_standard(OSC_RECORDING_COMMAND, 1)
+    assert wait_for(lambda: len(states) == 1)
+    assert states[0][0] is True
+    assert obs.recording
+    
+    listener.mark_command_sent(False)
+    assert sender.send_message_standard(OSC_RECORDING_COMMAND, 0)
+    assert wait_for(lambda: len(states) == 2)
+    assert states[1][0] is False
+    assert not obs.recording
+
+
+def test_round_trip_time_includes_peer_delay(peer):
+    listener, obs, sender, states = peer
+    listener.mark_command_sent(True)
+    sender.send_message_standard(OSC_RECORDING_COMMAND, 1)
+    assert wait_for(lambda: states)
+    rtt = states[0][1]
+    assert rtt is not None and obs.delay <= rtt < TIMEOUT
+    assert listener.round_trip_times() == [rtt]
+
+
+def test_unrequested_state_has_no_round_trip_time(peer):
+    listener, obs, sender, states = peer
+    sender.send_message_standard(OSC_RECORDING_COMMAND, 1)
+    assert wait_for(lambda: states)
+    assert states[0] == (True, None)
+    assert listener.round_trip_times() == []
+
+
+def test_ping_measures_one_way_latency(peer):
+    listener, obs, sender, states = peer
+    key = ("127.0.0.1", obs.port)
+    assert listener.one_way_latency(key) is None
+    assert listener.ping(sender, key)
+    assert wait_for(lambda: listener.one_way_latency(key) is not None)
+    assert obs.delay / 2 <= listener.one_way_latency(key) < TIMEOUT
+
+
+@pytest.fixture
+def window():
+    """An offscreen MainWindow whose feedback listener and OSC target are a FakeOBS"""
+    QApplication = pytest.importorskip("PyQt5.QtWidgets").QApplication
+    from cut_numbering_manager.ui.main_window import MainWindow
+    
+    app = QApplication.instance() or QApplication([])
+    window = MainWindow()
+    app.processEvents()
+    if window.osc_feedback is not None:
+        window.osc_feedback.stop()
+    window.osc_feedback = OSCFeedbackListener(window.recording_state_confirmed.emit, ip="127.0.0.1", port=0)
+    window.osc_feedback.start()
+    obs = FakeOBS(feedback_port=window.osc_feedback.port).start()
+    window.osc_settings.port = obs.port
+    window._on_transport_changed(window.osc_settings.transport)
+    
+    def pump(condition):
+        deadline = time.monotonic() + TIMEOUT
+        while not condition():
+            assert time.monotonic() < deadline, "timed out waiting for the UI"
+            app.processEvents()
+    
+    yield window, obs, pump
+    window.close()
+    app.processEvents()
+    obs.stop()
+
+
+def test_confirmation_before_send_completes_is_deferred(window):
+    window, obs, pump = window
+    send_start = window._send_start
+    deferred = threading.Event()
+    
+    def slow_send_start(*args):
+        # Hold the worker until OBS's confirmation has reached the GUI thread
+        result = send_start(*args)
+        if wait_for(lambda: window._deferred_confirmation is not None):
+            deferred.set()
+        return result
+    
+    window._send_start = slow_send_start
+    window.start_recording()
+    pump(lambda: window._pending_command is None)
+    assert deferred.is_set()
+    assert window._deferred_confirmation is None
+    assert window.recording
+    assert window.rec_button.text() == "STOP"
+    assert obs.recording
+    
+    window.stop_recording()
+    pump(lambda: window._pending_command is None and not obs.recording)
+    pump(lambda: not window.recording)
+    assert window.rec_button.text() == "REC"
+
+
+def test_unanswered_pings_expire(peer, monkeypatch):
+    listener, obs, sender, states = peer
+    silent = CustomOSCSender("127.0.0.1", 9)
+    clock = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: clock[0])
+    for _ in range(100):
+        listener.ping(silent, ("127.0.0.1", 9))
+        clock[0] += 1.0
+    silent.close()
+    assert listener.pending_pings() <= OSC_PING_TIMEOUT + 1
+
+
+def test_websocket_default_format_falls_back_to_dated_name():
+    obs = FakeOBS(feedback_port=9)
+    obs._on_websocket_recording(True, "%CCYY-%MM-%DD %hh-%mm-%ss")
+    assert obs.filename is None
+    assert "%" not in obs.recordings[0][1]
+
+
+def test_one_take_is_one_update_pass(window):
+    window, obs, pump = window
+    window.start_recording()
+    pump(lambda: window._pending_command is None and window.recording)
+    pump(lambda: not window.cut_info._notify_scheduled)
+    count = window.cut_info.notification_count
+    window.stop_recording()
+    pump(lambda: window._pending_command is None and not window.recording)
+    pump(lambda: not window.cut_info._notify_scheduled)
+    assert window.cut_info.notification_count == count + 1
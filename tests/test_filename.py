@@ -0,0 +1,66 @@
+"""
+ファイル名解析のテスト
+FilenameParser round trips through FilenameTemplate and refuses ambiguous splits.
+"""
+
+import itertools
+import random
+import string
+
+import pytest
+
+from cut_numbering_manager.models.filename_config import FilenameConfig
+from cut_numbering_manager.utils.filename import FilenameParser, FilenameTemplate
+
+PREFIXES = FilenameConfig.DEFAULT_PREFIXES
+ORDERS = list(itertools.permutations(FilenameConfig.DEFAULT_ORDER))
+
+
+def random_name(rng, alphabet=string.ascii_letters + string.digits + "-"):
+    """A random free-text part or scene name"""
+    return "".join(rng.choice(alphabet) for _ in range(rng.randint(1, 8)))
+
+
+@pytest.mark.parametrize("order", ORDERS)
+def test_round_trip(order):
+    rng = random.Random("_".join(order))
+    template = FilenameTemplate(order, PREFIXES)
+    parser = FilenameParser(order, PREFIXES)
+    for _ in range(500):
+        row = (random_name(rng), random_name(rng), rng.randint(1, 5000), rng.randint(1, 200))
+        filename = template.render(*row)
+        assert parser.parse(filename)[:4] == row, filename
+        assert parser.parse(filename + ".mkv")[:4] == row
+
+
+@pytest.mark.parametrize("order", ORDERS)
+def test_underscores_never_parse_to_a_different_take(order):
+    rng = random.Random("_".join(order))
+    template = FilenameTemplate(order, PREFIXES)
+    parser = FilenameParser(order, PREFIXES)
+    alphabet = "ab1_"
+    for _ in range(500):
+        row = (random_name(rng, alphabet), random_name(rng, alphabet), rng.randint(1, 5000), rng.randint(1, 200))
+        filename = template.render(*row)
+        take = parser.parse(filename)
+        assert take is None or take[:4] == row, filename
+
+
+def test_ambiguous_split_is_rejected():
+    parser = FilenameParser(FilenameConfig.DEFAULT_ORDER, PREFIXES)
+    assert parser.parse("Part_A_S1_005_v02") is None
+    assert list(parser.iter_parse(["Part_A_S1_005_v02", "Part_S1_005_v02"])) == [
+        ("Part", "S1", 5, 2, "Part_S1_005_v02")]
+
+
+def test_underscores_between_numbered_fields_are_unambiguous():
+    order = [FilenameConfig.PART, FilenameConfig.CUT, FilenameConfig.SCENE, FilenameConfig.VERSION]
+    parser = FilenameParser(order, PREFIXES)
+    assert parser.parse("Part_A_005_S_1_v02")[:4] == ("Part_A", "S_1", 5, 2)
+
+
+def test_suffixes_are_stripped():
+    parser = FilenameParser(FilenameConfig.DEFAULT_ORDER, PREFIXES, suffixes=("_camA", "_camA2"))
+    assert parser.parse("P1_S1_005_v02_camA.mkv")[:4] == ("P1", "S1", 5, 2)
+    assert parser.parse("P1_S1_005_v02_camA2.mkv")[:4] == ("P1", "S1", 5, 2)
+    assert parser.parse("P1_S1_005_v02_camB.mkv") is None
@@ -0,0 +1,55 @@
+"""
+OBS WebSocketクライアントのテスト
+OBSWebSocketTransport against FakeOBS's obs-websocket server.
+"""
+
+import time
+
+import pytest
+
+from cut_numbering_manager.osc.fake_obs import FakeOBS
+from cut_numbering_manager.websocket.obs_client import OBSWebSocketTransport
+
+TIMEOUT = 2.0
+
+
+def wait_for(condition, timeout=TIMEOUT):
+    """Poll condition() until it holds or timeout seconds pass"""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.001)
+    return True
+
+
+@pytest.fixture
+def transport():
+    """A transport and a FakeOBS serving obs-websocket on a free port"""
+    states = []
+    obs = FakeOBS(feedback_port=9, websocket_port=0).start()
+    transport = OBSWebSocketTransport(password="", on_state=lambda state, rtt: states.append((state, rtt)))
+    yield transport, obs, states
+    transport.close()
+    obs.stop()
+
+
+def test_recording_events_carry_round_trip_time(transport):
+    transport, obs, states = transport
+    assert transport.start_recording(obs.ip, obs.websocket_port, "P1_S1_001_v01")
+    assert wait_for(lambda: states)
+    assert states[0][0] is True and states[0][1] is not None
+    assert transport.stop_recording(obs.ip, obs.websocket_port)
+    assert wait_for(lambda: len(states) == 2)
+    assert states[1][0] is False and states[1][1] is not None
+    assert transport._requested_at == {}
+
+
+def test_replaced_clients_leave_no_pending_requests(transport):
+    transport, obs, states = transport
+    for _ in range(3):
+        transport.start_recording(obs.ip, obs.websocket_port, "P1_S1_001_v01")
+        transport.get_client(obs.ip, obs.websocket_port).close()
+    assert len(transport._requested_at) <= 1
+    transport.retain([])
+    assert transport._requested_at == {}
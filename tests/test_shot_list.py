@@ -0,0 +1,84 @@
+"""
+ショットリストのテスト
+ShotList advancing and jump queries, and read_shot_list's row handling.
+"""
+
+import pytest
+
+from cut_numbering_manager.models.shot_list import ShotList
+from cut_numbering_manager.storage.shot_list_reader import read_shot_list
+
+
+@pytest.fixture
+def shot_list():
+    """Two scenes of Part1 and one of Part2, with an out-of-order cut"""
+    shot_list = ShotList()
+    for row in [("Part1", "S1", 1), ("Part1", "S1", 2), ("Part1", "S1", 3),
+                ("Part1", "S3", 1), ("Part1", "S3", 12), ("Part2", "S1", 2), ("Part2", "S1", 1)]:
+        shot_list.append(*row)
+    return shot_list
+
+
+def test_advance_moves_to_the_next_unshot_row(shot_list):
+    assert shot_list.advance("Part1", "S1", 1) == 1
+    shot_list.mark_shot(2)
+    assert shot_list.advance("part1", "s1", 2) == 3
+    assert shot_list.shot_count() == 3
+
+
+def test_advance_wraps_to_rows_jumped_over(shot_list):
+    # Jump to the last scene, shoot to the end, then pick up the rows before it
+    assert shot_list.advance("Part2", "S1", 2) == 6
+    assert shot_list.advance("Part2", "S1", 1) == 0
+    assert shot_list.position == 0
+
+
+def test_advance_reports_rows_shot_outside_the_list(shot_list):
+    journal = {("Part1", "S1", 2)}
+    assert shot_list.advance("Part1", "S1", 1, lambda *take: take in journal) == 2
+    assert shot_list.is_shot(1)
+
+
+def test_advance_returns_none_when_every_row_is_shot(shot_list):
+    for index in range(len(shot_list) - 1):
+        shot_list.mark_shot(index)
+    assert shot_list.advance("Part2", "S1", 1) is None
+    assert shot_list.position == len(shot_list) - 1
+
+
+def test_find_by_cut_scene_and_part(shot_list):
+    assert shot_list.find("2") == [1, 5]
+    assert shot_list.find("S3 12") == [4]
+    assert shot_list.find("Part2_S1_1") == [6]
+    assert shot_list.find("part1/s1/3") == [2]
+    assert shot_list.find("S1 9") == []
+    assert shot_list.find("a b c 1") == []
+
+
+def test_find_tells_names_from_trailing_numbers(shot_list):
+    # "S3" names a scene, so it matches the first row of that run; "C12" is a cut
+    assert shot_list.find("S3") == [3]
+    assert shot_list.find("S1") == [0, 5]
+    assert shot_list.find("Part2 S1") == [5]
+    assert shot_list.find("C12") == [4]
+
+
+def test_find_rotates_matches_after_near(shot_list):
+    assert shot_list.find("1", near=3) == [6, 0, 3]
+    assert shot_list.find("1", near=6) == [0, 3, 6]
+
+
+def test_read_shot_list_skips_only_a_first_row_header(tmp_path):
+    path = tmp_path / "shots.csv"
+    path.write_text("part,scene,cut\nPart1,S1,C012\n\npart,S1,3\nPart1,S1,12A\nPart1,S1\nPart1,S2,カット7,memo\n",
+                    encoding="utf-8-sig")
+    shot_list = read_shot_list(str(path))
+    assert [shot_list.row(index) for index in range(len(shot_list))] == [
+        ("Part1", "S1", 12), ("part", "S1", 3), ("Part1", "S2", 7)]
+    assert shot_list.skipped == 2
+
+
+def test_read_shot_list_uses_tabs_for_tsv(tmp_path):
+    path = tmp_path / "shots.tsv"
+    path.write_text("パート\tシーン\tカット\nPart1\tS 1\t5\n", encoding="utf-8")
+    assert read_shot_list(str(path)).row(0) == ("Part1", "S 1", 5)